@@ -0,0 +1,60 @@
+"""baseline schema
+
+The users and products tables exactly as the original
+Base.metadata.create_all startup built them (no SKU, a plain category
+index). Databases from before migrations existed are stamped at this
+revision and then upgraded like any other.
+
+Revision ID: 0000
+Revises:
+Create Date: 2026-10-18 12:04:02.868319
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0000'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('email', sa.String(length=255), nullable=False),
+        sa.Column('hashed_password', sa.String(length=255), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('full_name', sa.String(length=255), nullable=True),
+        *_timestamps(),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+    op.create_index('ix_users_id', 'users', ['id'])
+
+    op.create_table(
+        'products',
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('stock', sa.Integer(), nullable=False),
+        sa.Column('image_url', sa.String(length=500), nullable=True),
+        sa.Column('category', sa.String(length=100), nullable=True),
+        *_timestamps(),
+    )
+    op.create_index('ix_products_id', 'products', ['id'])
+    op.create_index('ix_products_name', 'products', ['name'])
+    op.create_index('ix_products_category', 'products', ['category'])
+
+
+def downgrade() -> None:
+    op.drop_table('products')
+    op.drop_table('users')
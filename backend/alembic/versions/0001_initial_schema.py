@@ -0,0 +1,110 @@
+"""initial schema
+
+SKUs, the listing/export indexes, the FTS5 search index and its sync
+triggers, orders, order items and carts: everything
+Base.metadata.create_all built before migrations existed, on top of the
+0000 baseline.
+
+Databases created by create_all at any point before then already have
+some of this, so each step is skipped when its table, column or index
+exists. The search index is backfilled from existing products.
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-18 12:04:02.868319
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.db.fts import ensure_product_search_index
+
+
+revision = '0001'
+down_revision = '0000'
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    ]
+
+
+def _create_table(name, *columns):
+    if not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *columns)
+
+
+def _create_index(name, table, columns, unique=False):
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+    if name not in existing:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    product_columns = {column['name'] for column in sa.inspect(bind).get_columns('products')}
+    if 'sku' not in product_columns:
+        op.add_column('products', sa.Column('sku', sa.String(length=64), nullable=True))
+    # Replaced by (category, id), which also serves category filters
+    if 'ix_products_category' in {index['name'] for index in sa.inspect(bind).get_indexes('products')}:
+        op.drop_index('ix_products_category', table_name='products')
+    _create_index('ix_products_sku', 'products', ['sku'], unique=True)
+    _create_index('ix_products_category_id', 'products', ['category', 'id'])
+    _create_index('ix_products_updated_at', 'products', ['updated_at'])
+
+    ensure_product_search_index(bind)
+
+    _create_table(
+        'orders',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=32), nullable=False),
+        sa.Column('total', sa.Float(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    )
+    _create_index('ix_orders_id', 'orders', ['id'])
+    _create_index('ix_orders_user_id', 'orders', ['user_id'])
+
+    _create_table(
+        'order_items',
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Float(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id']),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+    )
+    _create_index('ix_order_items_id', 'order_items', ['id'])
+    _create_index('ix_order_items_order_id', 'order_items', ['order_id'])
+
+    _create_table(
+        'carts',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('items', sa.Text(), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    )
+    _create_index('ix_carts_id', 'carts', ['id'])
+    _create_index('ix_carts_user_id', 'carts', ['user_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table('carts')
+    op.drop_table('order_items')
+    op.drop_table('orders')
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('products_fts_ai', 'products_fts_ad', 'products_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS products_fts')
+    op.drop_index('ix_products_updated_at', table_name='products')
+    op.drop_index('ix_products_category_id', table_name='products')
+    op.drop_index('ix_products_sku', table_name='products')
+    op.create_index('ix_products_category', 'products', ['category'])
+    with op.batch_alter_table('products') as batch_op:
+        batch_op.drop_column('sku')
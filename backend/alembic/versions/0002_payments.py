@@ -0,0 +1,69 @@
+"""payments
+
+Gateway payments per order and the webhook event log whose unique
+event_id de-duplicates redelivered events.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 15:20:41.502113
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def _timestamps():
+    return [
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        'payments',
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('gateway_ref', sa.String(length=64), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('status', sa.String(length=32), nullable=False),
+        sa.Column('last_sequence', sa.Integer(), nullable=False),
+        sa.Column('captured_at', sa.DateTime(), nullable=True),
+        *_timestamps(),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    )
+    op.create_index('ix_payments_id', 'payments', ['id'])
+    op.create_index('ix_payments_order_id', 'payments', ['order_id'])
+    op.create_index('ix_payments_user_id', 'payments', ['user_id'])
+    op.create_index('ix_payments_gateway_ref', 'payments', ['gateway_ref'], unique=True)
+    op.create_index(
+        'ix_payments_order_id_open', 'payments', ['order_id'], unique=True,
+        sqlite_where=sa.text("status IN ('pending', 'authorized', 'captured')"),
+    )
+
+    op.create_table(
+        'payment_events',
+        sa.Column('event_id', sa.String(length=64), nullable=False),
+        sa.Column('gateway_ref', sa.String(length=64), nullable=False),
+        sa.Column('event_type', sa.String(length=32), nullable=False),
+        sa.Column('sequence', sa.Integer(), nullable=False),
+        sa.Column('applied', sa.Boolean(), nullable=False),
+        *_timestamps(),
+    )
+    op.create_index('ix_payment_events_id', 'payment_events', ['id'])
+    op.create_index('ix_payment_events_event_id', 'payment_events', ['event_id'], unique=True)
+    op.create_index('ix_payment_events_gateway_ref', 'payment_events', ['gateway_ref'])
+
+
+def downgrade() -> None:
+    op.drop_table('payment_events')
+    op.drop_table('payments')
@@ -0,0 +1,39 @@
+"""outbox
+
+Transactional outbox for post-commit side effects.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 16:02:13.774530
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbox_events',
+        sa.Column('topic', sa.String(length=64), nullable=False),
+        sa.Column('payload', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('available_at', sa.DateTime(), nullable=False),
+        sa.Column('claimed_by', sa.String(length=64), nullable=True),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_outbox_events_id', 'outbox_events', ['id'])
+    op.create_index('ix_outbox_events_due', 'outbox_events', ['status', 'available_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('outbox_events')
@@ -0,0 +1,43 @@
+"""category facets
+
+Trigger-maintained per-category counts and price ranges, plus the
+(category, price) index the triggers use to re-read a category's bounds.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:48:05.219871
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.db.facets import CATEGORY_FACETS_TRIGGERS, CATEGORY_FACETS_REBUILD, FACET_TRIGGER_NAMES
+
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'category_facets',
+        sa.Column('category', sa.String(length=100), nullable=False),
+        sa.Column('product_count', sa.Integer(), nullable=False),
+        sa.Column('in_stock_count', sa.Integer(), nullable=False),
+        sa.Column('min_price', sa.Float(), nullable=False),
+        sa.Column('max_price', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('category'),
+    )
+    op.create_index('ix_products_category_price', 'products', ['category', 'price'])
+
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in CATEGORY_FACETS_TRIGGERS + CATEGORY_FACETS_REBUILD:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in FACET_TRIGGER_NAMES:
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    op.drop_index('ix_products_category_price', table_name='products')
+    op.drop_table('category_facets')
@@ -0,0 +1,30 @@
+"""product listing indexes
+
+Indexes behind the price/newest/name sorts of the product list, so every
+filter and sort combination walks an index in order (no temp B-tree).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 18:12:40.511093
+"""
+from alembic import op
+
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_products_price', 'products', ['price'])
+    op.create_index('ix_products_created_at', 'products', ['created_at'])
+    op.create_index('ix_products_category_created_at', 'products', ['category', 'created_at'])
+    op.create_index('ix_products_category_name', 'products', ['category', 'name'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_category_name', table_name='products')
+    op.drop_index('ix_products_category_created_at', table_name='products')
+    op.drop_index('ix_products_created_at', table_name='products')
+    op.drop_index('ix_products_price', table_name='products')
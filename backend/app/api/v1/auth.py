@@ -1,11 +1,12 @@
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
 from app.db.session import get_db
 from app.services.auth_service import AuthService
 from app.utils.cookies import set_auth_cookie, delete_auth_cookie
 from app.core.dependencies import get_current_user
+from app.core.login_throttle import check_login_allowed
 from app.db.models.user import User
 
 router = APIRouter()
@@ -41,12 +42,17 @@ class AuthResponse(BaseModel):
 @router.post("/login", response_model=AuthResponse)
 async def login(
     credentials: UserLogin,
+    request: Request,
     response: Response,
     db: AsyncSession = Depends(get_db)
 ):
     """
     Authenticate user and set auth cookie.
+    
+    Attempts are throttled per client IP and per email (429 when exceeded).
     """
+    check_login_allowed(request, credentials.email)
+    
     user = await AuthService.authenticate_user(db, credentials.email, credentials.password)
     
     if not user:
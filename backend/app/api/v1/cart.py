@@ -0,0 +1,111 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from app.db.session import get_db, get_read_db
+from app.core.dependencies import require_current_user
+from app.db.models.user import User
+from app.services.cart_service import CartService, MAX_CART_LINES, MAX_LINE_QUANTITY
+
+router = APIRouter()
+
+
+# Pydantic schemas
+class CartLine(BaseModel):
+    product_id: int
+    quantity: int = Field(..., ge=1, le=MAX_LINE_QUANTITY)
+
+
+class CartItemsRequest(BaseModel):
+    items: List[CartLine] = Field(..., max_length=MAX_CART_LINES)
+
+
+class CartQuantity(BaseModel):
+    quantity: int = Field(..., ge=0, le=MAX_LINE_QUANTITY)
+
+
+class CartItemResponse(BaseModel):
+    product_id: int
+    name: str
+    price: float
+    stock: int
+    image_url: Optional[str]
+    quantity: int
+    line_total: float
+    in_stock: bool
+
+
+class CartResponse(BaseModel):
+    items: List[CartItemResponse]
+    item_count: int
+    subtotal: float
+
+
+class CartCountResponse(BaseModel):
+    item_count: int
+
+
+def _lines(request: CartItemsRequest):
+    return [(line.product_id, line.quantity) for line in request.items]
+
+
+@router.get("/", response_model=CartResponse)
+async def get_cart(
+    current_user: User = Depends(require_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the current user's cart priced with current product data."""
+    return await CartService.get_priced_cart(db, current_user.id)
+
+
+@router.get("/count", response_model=CartCountResponse)
+async def get_cart_count(
+    current_user: User = Depends(require_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the number of items in the cart (cheap enough for badge polling)."""
+    return {"item_count": await CartService.get_item_count(db, current_user.id)}
+
+
+@router.put("/", response_model=CartResponse)
+async def replace_cart(
+    cart_data: CartItemsRequest,
+    current_user: User = Depends(require_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Replace the whole cart."""
+    await CartService.replace_items(db, current_user.id, _lines(cart_data))
+    return await CartService.get_priced_cart(db, current_user.id)
+
+
+@router.put("/items/{product_id}", response_model=CartResponse)
+async def set_cart_item(
+    product_id: int,
+    item: CartQuantity,
+    current_user: User = Depends(require_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Set the quantity of one product in the cart (0 removes it)."""
+    await CartService.set_item(db, current_user.id, product_id, item.quantity)
+    return await CartService.get_priced_cart(db, current_user.id)
+
+
+@router.post("/merge", response_model=CartResponse)
+async def merge_cart(
+    cart_data: CartItemsRequest,
+    current_user: User = Depends(require_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Merge an anonymous (browser) cart into the user's cart after login."""
+    await CartService.merge_items(db, current_user.id, _lines(cart_data))
+    return await CartService.get_priced_cart(db, current_user.id)
+
+
+@router.delete("/", status_code=status.HTTP_204_NO_CONTENT)
+async def clear_cart(
+    current_user: User = Depends(require_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Empty the cart."""
+    await CartService.clear(db, current_user.id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,49 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
+from fastapi.responses import FileResponse
+from app.services.image_service import (
+    image_pipeline, ImageNotFoundError, ImagePipelineBusyError, MEDIA_TYPES
+)
+from app.utils.http_cache import make_etag, is_not_modified
+
+router = APIRouter()
+
+# Derivative URLs are content-addressed, so they never change
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@router.get("/{digest}")
+async def get_image(
+    request: Request,
+    digest: str = Path(..., pattern="^[0-9a-f]{32}$"),
+    w: Optional[int] = Query(None, ge=1),
+    format: Optional[str] = Query(None, pattern="^(webp|jpg)$")
+):
+    """
+    Serve a product image resized to width `w` (public endpoint).
+    
+    - **w**: Wanted width in pixels; rounded up to the nearest configured
+      width (IMAGE_WIDTHS), the largest one when omitted or above them all
+    - **format**: `webp` or `jpg`; by default WebP when the `Accept` header
+      allows it, else JPEG
+    
+    Derivatives are rendered once and then streamed from the disk cache.
+    """
+    headers = {"Cache-Control": IMMUTABLE}
+    if format is None:
+        format = "webp" if "image/webp" in request.headers.get("accept", "") else "jpg"
+        headers["Vary"] = "Accept"
+    width = image_pipeline.snap_width(w)
+    
+    headers["ETag"] = make_etag("image", digest, width, format, image_pipeline.quality[format])
+    if is_not_modified(request, headers["ETag"], None):
+        return Response(status_code=304, headers=headers)
+    
+    try:
+        path = await image_pipeline.derivative(digest, width, format)
+    except ImageNotFoundError:
+        raise HTTPException(status_code=404, detail="Image not found")
+    except ImagePipelineBusyError:
+        raise HTTPException(status_code=503, detail="Image service busy", headers={"Retry-After": "1"})
+    
+    return FileResponse(path, media_type=MEDIA_TYPES[format], headers=headers)
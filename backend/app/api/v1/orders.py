@@ -0,0 +1,116 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import OperationalError
+from pydantic import BaseModel, Field
+from datetime import datetime
+from app.db.session import get_db, get_read_db
+from app.core.session import is_database_locked
+from app.core.dependencies import require_current_user
+from app.db.models.user import User
+from app.services.order_service import (
+    OrderService,
+    ProductNotFoundError,
+    InsufficientStockError,
+)
+
+router = APIRouter()
+
+
+# Pydantic schemas
+class OrderLine(BaseModel):
+    product_id: int
+    quantity: int = Field(..., ge=1, le=1000)
+
+
+class OrderCreate(BaseModel):
+    items: List[OrderLine] = Field(..., min_length=1, max_length=100)
+
+
+class OrderItemResponse(BaseModel):
+    product_id: int
+    quantity: int
+    unit_price: float
+    
+    class Config:
+        from_attributes = True
+
+
+class OrderResponse(BaseModel):
+    id: int
+    status: str
+    total: float
+    items: List[OrderItemResponse]
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+@router.post("/", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
+async def place_order(
+    order_data: OrderCreate,
+    current_user: User = Depends(require_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Place an order for the current user.
+    
+    Stock for every line is decremented in one transaction; if any line is
+    short, nothing is reserved and a 409 is returned. If the database stays
+    locked by other writers for SQLITE_BUSY_TIMEOUT_MS, nothing is reserved
+    either and a 503 with Retry-After is returned.
+    """
+    try:
+        order = await OrderService.place_order(
+            db,
+            user_id=current_user.id,
+            lines=[(line.product_id, line.quantity) for line in order_data.items]
+        )
+    except ProductNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except InsufficientStockError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": str(e),
+                "product_id": e.product_id,
+                "available": e.available
+            }
+        )
+    except OperationalError as e:
+        if not is_database_locked(e):
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent orders, please retry",
+            headers={"Retry-After": "1"}
+        )
+    
+    return order
+
+
+@router.get("/", response_model=List[OrderResponse])
+async def get_orders(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    current_user: User = Depends(require_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the current user's orders, newest first."""
+    return await OrderService.get_orders_for_user(db, current_user.id, skip, limit)
+
+
+@router.get("/{order_id}", response_model=OrderResponse)
+async def get_order(
+    order_id: int,
+    current_user: User = Depends(require_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get one of the current user's orders."""
+    order = await OrderService.get_order(db, current_user.id, order_id)
+    
+    if not order:
+        raise HTTPException(status_code=404, detail="Order not found")
+    
+    return order
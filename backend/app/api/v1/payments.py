@@ -0,0 +1,135 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field, ValidationError
+from datetime import datetime
+from app.db.session import get_db, get_read_db
+from app.core.config import settings
+from app.core.dependencies import require_current_user
+from app.db.models.user import User
+from app.services.payment_gateway import gateway, SIGNATURE_HEADER
+from app.services.payment_service import (
+    PaymentService,
+    GatewayEvent,
+    OrderNotFoundError,
+    OrderNotPayableError,
+    PaymentQueueFullError,
+    payment_worker,
+)
+from app.utils.webhooks import verify_signature
+
+router = APIRouter()
+
+
+# Pydantic schemas
+class PaymentCreate(BaseModel):
+    order_id: int
+
+
+class PaymentResponse(BaseModel):
+    gateway_ref: str
+    order_id: int
+    amount: float
+    currency: str
+    status: str
+    captured_at: Optional[datetime] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class CheckoutResponse(PaymentResponse):
+    checkout_url: str
+
+
+class WebhookEventPayload(BaseModel):
+    id: str = Field(..., min_length=1, max_length=64)
+    type: str = Field(..., min_length=1, max_length=32)
+    payment_id: str = Field(..., min_length=1, max_length=64)
+    # SQLite INTEGER is 64-bit signed
+    sequence: int = Field(..., ge=0, le=2**63 - 1)
+    created: int
+
+
+class WebhookAck(BaseModel):
+    status: str
+
+
+@router.post("/", response_model=CheckoutResponse, status_code=status.HTTP_201_CREATED)
+async def create_payment(
+    payment_data: PaymentCreate,
+    current_user: User = Depends(require_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Start paying one of the current user's orders.
+    
+    Returns the gateway checkout URL; repeating the call for the same order
+    returns the payment already in progress.
+    """
+    try:
+        payment = await PaymentService.create_payment(db, current_user.id, payment_data.order_id)
+    except OrderNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except OrderNotPayableError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    
+    return {
+        **PaymentResponse.model_validate(payment).model_dump(),
+        "checkout_url": gateway.checkout_url(payment.gateway_ref)
+    }
+
+
+@router.post("/webhook", response_model=WebhookAck, status_code=status.HTTP_202_ACCEPTED)
+async def payment_webhook(request: Request, response: Response):
+    """
+    Receive a gateway event.
+    
+    Only the signature check and de-duplication happen here; the event is
+    applied by the background payment worker. Duplicates are acknowledged
+    with 200 so the gateway stops retrying them.
+    """
+    body = await request.body()
+    if not verify_signature(
+        settings.PAYMENT_WEBHOOK_SECRET,
+        body,
+        request.headers.get(SIGNATURE_HEADER),
+        settings.PAYMENT_WEBHOOK_TOLERANCE_SECONDS
+    ):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid signature")
+    
+    try:
+        payload = WebhookEventPayload.model_validate_json(body)
+    except ValidationError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Malformed event")
+    
+    event = GatewayEvent(payload.id, payload.type, payload.payment_id, payload.sequence)
+    try:
+        accepted = payment_worker.offer(event)
+    except PaymentQueueFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Event queue full, please retry",
+            headers={"Retry-After": "1"}
+        )
+    
+    if not accepted:
+        response.status_code = status.HTTP_200_OK
+        return {"status": "duplicate"}
+    return {"status": "accepted"}
+
+
+@router.get("/{gateway_ref}", response_model=PaymentResponse)
+async def get_payment(
+    gateway_ref: str,
+    current_user: User = Depends(require_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the status of one of the current user's payments."""
+    payment = await PaymentService.get_payment(db, gateway_ref, current_user.id)
+    
+    if not payment:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    
+    return payment
@@ -1,10 +1,24 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+import csv
+import io
+import json
+from typing import AsyncIterator, List, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi import status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import BaseModel
-from datetime import datetime
-from app.db.session import get_db
-from app.services.product_service import ProductService
+from pydantic import BaseModel, Field
+from datetime import datetime, timezone
+from app.db.session import get_db, get_read_db
+from app.services.product_service import ProductService, EXPORT_COLUMNS, PRODUCT_SORTS
+from app.services.import_service import ProductImportService, iter_byte_lines
+from app.services.image_service import image_pipeline, ImagePipelineBusyError
+from app.utils.images import InvalidImageError
+from app.services.product_fragments import (
+    product_fragment, product_list_json, product_batch_json, json_bytes_response
+)
+from app.core.config import settings
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.http_cache import make_etag, is_not_modified, not_modified, set_validators
 
 router = APIRouter()
 
@@ -12,6 +26,7 @@ router = APIRouter()
 # Pydantic schemas
 class ProductResponse(BaseModel):
     id: int
+    sku: Optional[str] = None
     name: str
     description: Optional[str]
     price: float
@@ -24,7 +39,33 @@ class ProductResponse(BaseModel):
         from_attributes = True
 
 
+class ProductBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=100)
+
+
+class ProductBatchResponse(BaseModel):
+    products: List[ProductResponse]
+    missing: List[int]
+
+
+class CategoryFacetResponse(BaseModel):
+    category: Optional[str]
+    product_count: int
+    in_stock_count: int
+    min_price: float
+    max_price: float
+
+
+class FacetsResponse(BaseModel):
+    categories: List[CategoryFacetResponse]
+    product_count: int
+    in_stock_count: int
+    min_price: Optional[float]
+    max_price: Optional[float]
+
+
 class ProductCreate(BaseModel):
+    sku: Optional[str] = None
     name: str
     description: Optional[str] = None
     price: float
@@ -33,36 +74,287 @@ class ProductCreate(BaseModel):
     category: Optional[str] = None
 
 
+def _decode_listing_cursor(cursor: str, listing: dict, attribute: Optional[str]) -> tuple:
+    """Return (after_id, after_key) from a product list cursor, or raise 400."""
+    position = decode_cursor(cursor)
+    # Cursors issued before sorting existed carry no "sort"
+    if position is not None:
+        position.setdefault("sort", "id")
+    if (
+        position is None
+        or not isinstance(position.get("id"), int)
+        or any(position.get(name) != value for name, value in listing.items())
+    ):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if attribute is None:
+        return position["id"], None
+    
+    key = position.get("key")
+    try:
+        if attribute == "created_at":
+            key = datetime.fromisoformat(key)
+        elif attribute == "price" and not isinstance(key, bool):
+            key = float(key)
+        elif not isinstance(key, str):
+            raise TypeError
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position["id"], key
+
+
 @router.get("/", response_model=List[ProductResponse])
 async def get_products(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     category: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    in_stock: Optional[bool] = Query(None),
+    sort: str = Query("id", pattern="^(id|price|newest|name)$"),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get all products (public endpoint).
     
-    - **skip**: Number of products to skip
+    - **skip**: Number of products to skip (prefer `cursor` for deep pages)
     - **limit**: Maximum number of products to return
     - **category**: Filter by category (optional)
+    - **min_price** / **max_price**: Inclusive price bounds (optional)
+    - **in_stock**: true for products in stock, false for sold out (optional)
+    - **sort**: `id` (default), `price` (low to high), `newest` or `name`
+    - **cursor**: Opaque cursor from the previous page's `X-Next-Cursor` header
+    
+    When more products follow, the response carries an `X-Next-Cursor` header.
+    Supports conditional requests via `If-None-Match` / `If-Modified-Since`.
+    """
+    # The cursor is only valid for the filters and sort that produced it
+    listing = {
+        "category": category,
+        "min_price": min_price,
+        "max_price": max_price,
+        "in_stock": in_stock,
+        "sort": sort,
+    }
+    attribute, _ = PRODUCT_SORTS[sort]
+    after_id = after_key = None
+    if cursor:
+        after_id, after_key = _decode_listing_cursor(cursor, listing, attribute)
+    
+    # Validators come from the catalog version, so a 304 never loads products
+    count, last_modified = await ProductService.get_catalog_version(db)
+    etag = make_etag("catalog", count, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    set_validators(response, etag, last_modified)
+    
+    # Fetch one extra row to learn whether another page exists
+    products = await ProductService.get_all_products(
+        db, skip, limit + 1, category, after_id,
+        min_price=min_price,
+        max_price=max_price,
+        in_stock=in_stock,
+        sort=sort,
+        after_key=after_key
+    )
+    
+    if len(products) > limit:
+        products = products[:limit]
+        position = {**listing, "id": products[-1].id}
+        if attribute is not None:
+            key = getattr(products[-1], attribute)
+            position["key"] = key.isoformat() if isinstance(key, datetime) else key
+        response.headers["X-Next-Cursor"] = encode_cursor(position)
+    
+    return json_bytes_response(product_list_json(products), response)
+
+
+@router.get("/facets", response_model=FacetsResponse)
+async def get_facets(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Categories with their product count, in-stock count and price range,
+    plus catalog-wide totals (uncategorized products have category null).
+    
+    Served from a summary table kept current by triggers, so the cost grows
+    with the number of categories, not products. The ETag is built from the
+    facet rows themselves, so it only changes when the facets do (not on
+    every stock decrement).
+    """
+    facets = await ProductService.get_category_facets(db)
+    last_modified = await ProductService.get_catalog_last_modified(db)
+    etag = make_etag("facets", *(
+        (facet.category, facet.product_count, facet.in_stock_count, facet.min_price, facet.max_price)
+        for facet in facets
+    ))
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    set_validators(response, etag, last_modified)
+    
+    return {
+        "categories": [
+            {
+                "category": facet.category or None,
+                "product_count": facet.product_count,
+                "in_stock_count": facet.in_stock_count,
+                "min_price": facet.min_price,
+                "max_price": facet.max_price,
+            }
+            for facet in facets
+        ],
+        "product_count": sum(facet.product_count for facet in facets),
+        "in_stock_count": sum(facet.in_stock_count for facet in facets),
+        "min_price": min((facet.min_price for facet in facets), default=None),
+        "max_price": max((facet.max_price for facet in facets), default=None),
+    }
+
+
+@router.get("/search", response_model=List[ProductResponse])
+async def search_products(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Full-text search over product name, description and category.
+    
+    - **q**: Search text; all words must match, the last one as a prefix
+    - **limit**: Maximum number of products to return
+    - **cursor**: Opaque cursor from the previous page's `X-Next-Cursor` header
+    
+    Results are ranked by relevance (bm25).
+    """
+    after = None
+    if cursor:
+        position = decode_cursor(cursor)
+        if (
+            position is None
+            or not isinstance(position.get("id"), int)
+            or not isinstance(position.get("rank"), (int, float))
+            or position.get("q") != q
+        ):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        after = (position["rank"], position["id"])
+    
+    results = await ProductService.search_products(db, q, limit + 1, after)
+    
+    if len(results) > limit:
+        results = results[:limit]
+        last_product, last_rank = results[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            {"q": q, "rank": last_rank, "id": last_product.id}
+        )
+    
+    return json_bytes_response(product_list_json(product for product, _ in results), response)
+
+
+@router.post("/batch", response_model=ProductBatchResponse)
+async def get_products_batch(
+    batch: ProductBatchRequest,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Look up to 100 products by ID in one request (e.g. to refresh a cart).
+    
+    Products are returned in request order; unknown IDs are listed in `missing`.
     """
-    products = await ProductService.get_all_products(db, skip, limit, category)
-    return products
+    products, missing = await ProductService.get_products_by_ids(db, batch.ids)
+    
+    return json_bytes_response(product_batch_json(products, missing), response)
+
+
+def _export_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+async def _export_ndjson(updated_since: Optional[datetime]) -> AsyncIterator[bytes]:
+    async for batch in ProductService.stream_products(updated_since):
+        lines = [
+            json.dumps(
+                {name: _export_value(value) for name, value in zip(EXPORT_COLUMNS, row)},
+                separators=(",", ":")
+            )
+            for row in batch
+        ]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def _export_csv(updated_since: Optional[datetime]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    
+    async for batch in ProductService.stream_products(updated_since):
+        writer.writerows([_export_value(value) for value in row] for row in batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+@router.get("/export")
+async def export_products(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    updated_since: Optional[datetime] = Query(None)
+):
+    """
+    Stream the whole catalog as NDJSON or CSV.
+    
+    - **format**: `ndjson` (one JSON object per line) or `csv` (with header row)
+    - **updated_since**: Only products updated at or after this ISO timestamp
+    
+    Rows are read in batches from a server-side cursor, so memory use is
+    constant regardless of catalog size.
+    """
+    if updated_since is not None and updated_since.tzinfo is not None:
+        # Timestamps are stored as naive UTC
+        updated_since = updated_since.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    if format == "csv":
+        body, media_type = _export_csv(updated_since), "text/csv"
+    else:
+        body, media_type = _export_ndjson(updated_since), "application/x-ndjson"
+    
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'}
+    )
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
 async def get_product(
     product_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get a single product by ID."""
+    """Get a single product by ID (supports conditional requests)."""
+    last_modified = await ProductService.get_product_last_modified(db, product_id)
+    if last_modified is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    etag = make_etag("product", product_id, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    set_validators(response, etag, last_modified)
+    
     product = await ProductService.get_product_by_id(db, product_id)
     
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
-    return product
+    return json_bytes_response(product_fragment(product), response)
 
 
 @router.post("/", response_model=ProductResponse, status_code=201)
@@ -74,6 +366,12 @@ async def create_product(
     Create a new product.
     Note: In production, this should require authentication and admin privileges.
     """
+    if product_data.sku and await ProductService.get_product_by_sku(db, product_data.sku):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="SKU already exists"
+        )
+    
     product = await ProductService.create_product(
         db=db,
         name=product_data.name,
@@ -81,7 +379,71 @@ async def create_product(
         price=product_data.price,
         stock=product_data.stock,
         image_url=product_data.image_url,
-        category=product_data.category
+        category=product_data.category,
+        sku=product_data.sku
+    )
+    
+    return product
+
+
+@router.put("/{product_id}/image", response_model=ProductResponse)
+async def upload_product_image(
+    product_id: int,
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Upload a product's image (JPEG, PNG, WebP or GIF).
+    
+    The original is stored by content hash and the product's `image_url`
+    points at the resizing endpoint; append `?w=320` for grid thumbnails.
+    Note: In production, this should require authentication and admin privileges.
+    """
+    if await ProductService.get_product_by_id(db, product_id) is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    
+    data = await file.read(settings.IMAGE_MAX_UPLOAD_BYTES + 1)
+    if len(data) > settings.IMAGE_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Image too large")
+    
+    try:
+        digest = await image_pipeline.ingest(data)
+    except InvalidImageError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ImagePipelineBusyError:
+        raise HTTPException(status_code=503, detail="Image service busy", headers={"Retry-After": "1"})
+    
+    product = await ProductService.set_product_image(db, product_id, image_pipeline.url(digest))
+    if product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
+
+
+@router.post("/import")
+async def import_products(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    upsert: bool = Query(True),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk import products from a streamed CSV or NDJSON request body.
+    
+    - **format**: `ndjson` (one JSON object per line) or `csv` (with header row)
+    - **upsert**: Update existing products matched by `sku` (otherwise they are
+      left alone and counted as `skipped`)
+    
+    Rows are validated and written in chunks; invalid rows are counted as
+    `failed` and reported with their line numbers. `written` counts rows
+    actually inserted or updated.
+    Note: In production, this should require authentication and admin privileges.
+    """
+    report = await ProductImportService.import_products(
+        db,
+        iter_byte_lines(request.stream()),
+        fmt=format,
+        chunk_size=settings.IMPORT_CHUNK_SIZE,
+        upsert=upsert
     )
     
-    return product
\ No newline at end of file
+    return report.as_dict()
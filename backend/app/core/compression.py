@@ -0,0 +1,175 @@
+"""
+Negotiated response compression (Brotli or gzip).
+
+- CompressionMiddleware picks a content coding from Accept-Encoding
+  (q-values honoured, Brotli preferred on ties) and compresses complete
+  bodies of text-like media types of at least COMPRESSION_MIN_BYTES.
+  Streaming responses (exports, image files) pass through untouched.
+- Bodies that are the same for every client, i.e. those carrying an ETag
+  (catalog pages, facets, product details, the cached UI pages), are
+  compressed once per content version: the compressed bytes are cached by
+  (coding, body digest) in a bounded LRU, so repeats skip the compressor.
+- Compressed responses get a weak ETag, as their bytes differ from the
+  identity representation; is_not_modified compares weakly, so conditional
+  requests still get 304s.
+"""
+import gzip
+import hashlib
+import time
+from functools import lru_cache
+from typing import Dict, Optional
+import brotli
+from starlette.datastructures import MutableHeaders
+from app.core.config import settings
+from app.utils.lru import LRUCache
+
+# Server preference when the client weighs codings equally
+CODINGS = ("br", "gzip")
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/json", "application/x-ndjson", "application/javascript", "image/svg+xml",
+)
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """The coding to use for an Accept-Encoding value (None for identity)."""
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip()] = weight
+
+    best, best_weight = None, 0.0
+    for coding in CODINGS:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+class ResponseCompressor:
+    """Compresses bodies, reusing cached bytes for shared payloads."""
+
+    def __init__(self, min_bytes: int, brotli_quality: int, gzip_level: int, cache_size: int):
+        self.min_bytes = min_bytes
+        self.brotli_quality = brotli_quality
+        self.gzip_level = gzip_level
+        self.cache = LRUCache(maxsize=cache_size)
+        self.responses = {coding: 0 for coding in CODINGS}
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_seconds = 0.0
+
+    def _compress(self, body: bytes, coding: str) -> bytes:
+        started = time.perf_counter()
+        if coding == "br":
+            data = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            data = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        self.compress_seconds += time.perf_counter() - started
+        return data
+
+    def compress(self, body: bytes, coding: str, shared: bool) -> bytes:
+        """Compress `body`; shared bodies are compressed once and cached."""
+        if not shared:
+            data = self._compress(body, coding)
+        else:
+            key = (coding, hashlib.blake2b(body, digest_size=16).digest())
+            data = self.cache.get(key)
+            if data is None:
+                data = self._compress(body, coding)
+                self.cache.set(key, data)
+
+        self.responses[coding] += 1
+        self.bytes_in += len(body)
+        self.bytes_out += len(data)
+        return data
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "brotli_responses": self.responses["br"],
+            "gzip_responses": self.responses["gzip"],
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "compress_seconds_total": round(self.compress_seconds, 6),
+        }
+
+
+compressor = ResponseCompressor(
+    min_bytes=settings.COMPRESSION_MIN_BYTES,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    cache_size=settings.COMPRESSION_CACHE_SIZE,
+)
+
+
+def _is_shared(headers: MutableHeaders) -> bool:
+    cache_control = headers.get("cache-control", "")
+    return "etag" in headers and "private" not in cache_control and "no-store" not in cache_control
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware; buffers only the start message of a response."""
+
+    def __init__(self, app, compressor: ResponseCompressor = compressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        coding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                coding = negotiate(value.decode("latin-1"))
+                break
+
+        start_message = None
+        started_body = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, started_body
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or started_body:
+                await send(message)
+                return
+
+            started_body = True
+            headers = MutableHeaders(scope=start_message)
+            body = message.get("body", b"")
+            compressible = (
+                start_message["status"] not in (204, 304)
+                and "content-encoding" not in headers
+                and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            )
+            # Streamed bodies (more_body) are passed through as they come
+            if not compressible or message.get("more_body", False):
+                await send(start_message)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if coding is not None and len(body) >= self.compressor.min_bytes:
+                data = self.compressor.compress(body, coding, _is_shared(headers))
+                if len(data) < len(body):
+                    body = data
+                    headers["Content-Encoding"] = coding
+                    headers["Content-Length"] = str(len(body))
+                    etag = headers.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        headers["ETag"] = f"W/{etag}"
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_wrapper)
@@ -13,6 +13,24 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 43200  # 30 days
     
+    # Auth caches (avoid a users-table lookup and JWT verify per request)
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    TOKEN_CACHE_SIZE: int = 10000
+    
+    # Password hashing pool (keeps bcrypt off the event loop)
+    HASH_POOL_WORKERS: int = 4
+    HASH_QUEUE_LIMIT: int = 32
+    
+    # Login throttle (token buckets per client IP and per email, checked
+    # before any DB query or bcrypt work)
+    LOGIN_THROTTLE_ENABLED: bool = True
+    LOGIN_IP_RATE_PER_MINUTE: float = 20
+    LOGIN_IP_BURST: int = 10
+    LOGIN_EMAIL_RATE_PER_MINUTE: float = 5
+    LOGIN_EMAIL_BURST: int = 5
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000
+    
     # Cookie Settings
     COOKIE_NAME: str = "honey_session"
     COOKIE_SECURE: bool = False
@@ -26,6 +44,94 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///./dev.db"
+    # Run pending Alembic migrations on startup (otherwise refuse to start)
+    DB_AUTO_MIGRATE: bool = True
+    
+    # SQLite engine profile: "default" or "production" (WAL + tuned pragmas,
+    # read-only reader pool, single-writer queue with group commit)
+    DB_ENGINE_PROFILE: str = "default"
+    DB_READ_POOL_SIZE: int = 8
+    DB_WRITE_BATCH_SIZE: int = 32
+    DB_WRITE_BATCH_WINDOW_MS: float = 2.0
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    SQLITE_CACHE_SIZE_KB: int = 65536  # 64 MB
+    
+    # Catalog snapshot (serve product reads from memory)
+    CATALOG_SNAPSHOT_ENABLED: bool = False
+    CATALOG_SNAPSHOT_TTL_SECONDS: int = 300
+    
+    # Single-flight catalog reads: concurrent identical product queries share
+    # one DB query; followers wait at most this long, then query themselves
+    SINGLE_FLIGHT_ENABLED: bool = True
+    SINGLE_FLIGHT_MAX_WAIT_SECONDS: float = 2.0
+    
+    # Cached pre-serialized product JSON, keyed by (id, updated_at)
+    PRODUCT_FRAGMENT_CACHE_SIZE: int = 50000
+    
+    # Bulk product import
+    IMPORT_CHUNK_SIZE: int = 5000
+    
+    # Server-rendered UI: Jinja bytecode cache dir (defaults to the system
+    # temp dir) and cached fully rendered static pages
+    TEMPLATE_CACHE_DIR: str = ""
+    RENDERED_PAGE_CACHE_SIZE: int = 64
+    
+    # Payments (local stand-in gateway). Webhooks are signature-checked,
+    # de-duplicated and acknowledged; a background worker applies them to
+    # the database in batches
+    PAYMENT_WEBHOOK_SECRET: str = "local-gateway-webhook-secret"
+    PAYMENT_WEBHOOK_TOLERANCE_SECONDS: int = 300
+    PAYMENT_WEBHOOK_URL: str = "http://localhost:8000/api/v1/payments/webhook"
+    PAYMENT_CURRENCY: str = "USD"
+    PAYMENT_EVENT_QUEUE_SIZE: int = 10000
+    PAYMENT_EVENT_BATCH_SIZE: int = 256
+    PAYMENT_EVENT_BATCH_WINDOW_MS: float = 20.0
+    PAYMENT_EVENT_RETRY_BASE_SECONDS: float = 0.5
+    PAYMENT_EVENT_RETRY_MAX_SECONDS: float = 30.0
+    PAYMENT_EVENT_MAX_ATTEMPTS: int = 5
+    PAYMENT_EVENT_STOP_TIMEOUT_SECONDS: float = 10.0
+    # Events that could not be persisted (JSON lines, relative to backend/)
+    PAYMENT_DEAD_LETTER_FILE: str = "data/payment_dead_letters.jsonl"
+    PAYMENT_DEDUP_CACHE_SIZE: int = 100000
+    
+    # Transactional outbox: side effects written with the business change
+    # and run after commit by a pool of background workers
+    OUTBOX_WORKERS: int = 2
+    OUTBOX_BATCH_SIZE: int = 50
+    OUTBOX_LEASE_SECONDS: float = 60.0
+    OUTBOX_HANDLER_TIMEOUT_SECONDS: float = 30.0
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETRY_BASE_SECONDS: float = 2.0
+    OUTBOX_RETRY_MAX_SECONDS: float = 600.0
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 1.0
+    
+    # Product images: originals stored by content hash under IMAGE_DIR
+    # (relative to backend/), resized WebP/JPEG derivatives rendered on
+    # first request in a process pool and kept in a size-bounded LRU cache
+    IMAGE_DIR: str = "static/images"
+    IMAGE_WIDTHS: str = "160,320,640,1024,1600"
+    IMAGE_MAX_UPLOAD_BYTES: int = 10485760  # 10 MB
+    IMAGE_MAX_PIXELS: int = 40000000
+    IMAGE_CACHE_MAX_BYTES: int = 536870912  # 512 MB
+    IMAGE_POOL_WORKERS: int = 2
+    IMAGE_QUEUE_LIMIT: int = 64
+    IMAGE_WEBP_QUALITY: int = 80
+    IMAGE_JPEG_QUALITY: int = 82
+    
+    # Response compression (Brotli or gzip, negotiated per request); bodies
+    # shared by all clients are compressed once per content version
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_CACHE_SIZE: int = 1024
+    
+    # Outgoing email: "console" prints messages, "null" discards them
+    EMAIL_BACKEND: str = "console"
+    
+    # Prometheus metrics at /metrics (request, DB and bcrypt timings)
+    METRICS_ENABLED: bool = True
     
     # Server
     HOST: str = "0.0.0.0"
@@ -35,6 +141,10 @@ class Settings(BaseSettings):
     def origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
     
+    @property
+    def image_widths_list(self) -> List[int]:
+        return sorted(int(width) for width in self.IMAGE_WIDTHS.split(","))
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
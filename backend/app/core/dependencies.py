@@ -1,18 +1,19 @@
 from typing import Optional
 from fastapi import Depends, HTTPException, status, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.db.models.user import User
 from app.services.auth_service import AuthService
 from app.utils.cookies import get_token_from_cookie
 from app.core.security import decode_access_token
+from app.core.principal_cache import get_cached_user, cache_user
 
 
 async def get_current_user(
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> Optional[User]:
-    """Get current user from cookie token (optional)."""
+    """Get current user from cookie token (optional, served from the principal cache)."""
     token = get_token_from_cookie(request)
     
     if not token:
@@ -26,13 +27,20 @@ async def get_current_user(
     if not user_id:
         return None
     
-    user = await AuthService.get_user_by_id(db, int(user_id))
+    user_id = int(user_id)
+    user = get_cached_user(user_id)
+    if user is not None:
+        return user
+    
+    user = await AuthService.get_user_by_id(db, user_id)
+    if user is not None:
+        cache_user(user)
     return user
 
 
 async def require_current_user(
     request: Request,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ) -> User:
     """Require authenticated user (raises exception if not authenticated)."""
     user = await get_current_user(request, db)
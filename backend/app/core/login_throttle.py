@@ -0,0 +1,54 @@
+"""
+Login throttle.
+
+Every login attempt costs a bcrypt verify, so attempts are budgeted per
+client IP and per email before any database or hashing work happens.
+Over-budget attempts raise LoginThrottledError (429 with Retry-After).
+"""
+import math
+from typing import Optional
+from fastapi import Request
+from app.core.config import settings
+from app.utils.rate_limit import TokenBucketLimiter
+
+
+class LoginThrottledError(Exception):
+    """Raised when a login attempt exceeds the IP or email budget."""
+
+    def __init__(self, retry_after: float):
+        super().__init__("Too many login attempts")
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+ip_limiter = TokenBucketLimiter(
+    rate_per_second=settings.LOGIN_IP_RATE_PER_MINUTE / 60,
+    burst=settings.LOGIN_IP_BURST,
+    max_keys=settings.LOGIN_THROTTLE_MAX_KEYS,
+)
+
+email_limiter = TokenBucketLimiter(
+    rate_per_second=settings.LOGIN_EMAIL_RATE_PER_MINUTE / 60,
+    burst=settings.LOGIN_EMAIL_BURST,
+    max_keys=settings.LOGIN_THROTTLE_MAX_KEYS,
+)
+
+
+def client_ip(request: Request) -> Optional[str]:
+    """Peer address (run uvicorn with --proxy-headers behind a proxy)."""
+    return request.client.host if request.client else None
+
+
+def check_login_allowed(request: Request, email: str) -> None:
+    """Spend one token from the IP and email buckets, or raise LoginThrottledError."""
+    if not settings.LOGIN_THROTTLE_ENABLED:
+        return
+
+    ip = client_ip(request)
+    if ip is not None:
+        allowed, retry_after = ip_limiter.acquire(ip)
+        if not allowed:
+            raise LoginThrottledError(retry_after)
+
+    allowed, retry_after = email_limiter.acquire(email.strip().lower())
+    if not allowed:
+        raise LoginThrottledError(retry_after)
@@ -0,0 +1,182 @@
+"""
+Application metrics, exposed in Prometheus text format at /metrics.
+
+- MetricsMiddleware records per-route request counts, status codes and
+  latency. Routes are labelled by their path template ("/api/v1/products/
+  {product_id}"), never the raw path, so label cardinality stays bounded.
+- instrument_engine() hooks SQLAlchemy cursor events to count statements and
+  DB time, both globally and per request (via a context variable).
+- observe_hash() is the HashingPool callback for bcrypt timings.
+- register_stats() folds the existing stats() dicts (caches, hashing pool,
+  write queue) in as gauges read at scrape time.
+"""
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.routing import Mount
+from app.utils.metrics import MetricsRegistry
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code.",
+    ["method", "route", "status"],
+)
+http_latency = registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by method and route template.",
+    ["method", "route"],
+)
+http_db_statements = registry.histogram(
+    "http_request_db_statements",
+    "SQL statements executed per HTTP request.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 25, 50, 100),
+)
+http_db_time = registry.histogram(
+    "http_request_db_seconds",
+    "Time spent executing SQL per HTTP request.",
+    ["route"],
+)
+db_statements = registry.counter(
+    "db_statements_total",
+    "SQL statements executed, by engine.",
+    ["engine"],
+)
+db_latency = registry.histogram(
+    "db_statement_duration_seconds",
+    "SQL statement execution time, by engine.",
+    ["engine"],
+)
+hash_latency = registry.histogram(
+    "password_hash_seconds",
+    "bcrypt time per call, by operation.",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5),
+)
+hash_queue_wait = registry.histogram(
+    "password_hash_queue_wait_seconds",
+    "Time a bcrypt call waited for a hashing pool worker.",
+)
+
+_in_progress = 0
+registry.gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled.",
+    [],
+    lambda: {(): _in_progress},
+)
+
+# [statement count, seconds] for the request being handled, if any
+_request_db: ContextVar[Optional[list]] = ContextVar("request_db", default=None)
+
+
+def register_stats(prefix: str, sources: Dict[str, Callable[[], dict]], label: str = "") -> None:
+    """
+    Expose the numeric fields of stats() dicts as gauges named
+    `{prefix}_{field}`, one series per source (labelled `label`).
+    """
+    first = next(iter(sources.values()))()
+    for field, value in first.items():
+        if not isinstance(value, (int, float)):
+            continue
+
+        def collect(field=field):
+            return {
+                ((name,) if label else ()): float(stats()[field])
+                for name, stats in sources.items()
+            }
+
+        registry.gauge(
+            f"{prefix}_{field}",
+            f"{prefix.replace('_', ' ').capitalize()} {field.replace('_', ' ')}.",
+            [label] if label else [],
+            collect,
+        )
+
+
+def observe_hash(operation: str, queue_wait: float, seconds: float) -> None:
+    """HashingPool callback: record one bcrypt call."""
+    hash_latency.observe(seconds, operation)
+    hash_queue_wait.observe(queue_wait)
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Count statements and DB time on an engine."""
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        db_statements.inc(name)
+        db_latency.observe(elapsed, name)
+
+        current = _request_db.get()
+        if current is not None:
+            current[0] += 1
+            current[1] += elapsed
+
+    def handle_error(exception_context):
+        started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+        if started:
+            started.pop()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware overhead or body buffering)."""
+
+    def __init__(self, app):
+        self.app = app
+        self._route_templates: Optional[Dict[Callable, str]] = None
+
+    def _route_label(self, scope) -> str:
+        if self._route_templates is None:
+            self._route_templates = {}
+            for route in scope["app"].routes:
+                if hasattr(route, "endpoint"):
+                    self._route_templates[route.endpoint] = route.path
+                elif isinstance(route, Mount):
+                    # Mounted apps (static files) are matched with endpoint = route.app
+                    self._route_templates[route.app] = f"{route.path}/{{path:path}}"
+        endpoint = scope.get("endpoint")
+        return self._route_templates.get(endpoint, "unmatched") if endpoint else "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _in_progress
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        db_usage = [0, 0.0]
+        token = _request_db.set(db_usage)
+        _in_progress += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _in_progress -= 1
+            _request_db.reset(token)
+
+            route = self._route_label(scope)
+            method = scope["method"]
+            http_requests.inc(method, route, str(status_code))
+            http_latency.observe(elapsed, method, route)
+            http_db_statements.observe(db_usage[0], route)
+            http_db_time.observe(db_usage[1], route)
@@ -0,0 +1,68 @@
+"""
+Cache of authenticated principals keyed by user id.
+
+get_current_user serves users from here instead of querying the users table
+on every request. Entries hold plain column values; each hit gets its own
+detached User instance, so request handlers never share ORM state.
+
+Any ORM update or delete of a User evicts that user, both at flush time and
+again after commit, so a deactivation is visible on the very next request.
+"""
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session
+from app.core.config import settings
+from app.db.models.user import User
+from app.utils.lru import LRUCache
+
+_COLUMNS = [column.key for column in User.__table__.columns]
+_PENDING_KEY = "principal_cache_invalidate"
+
+principal_cache = LRUCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+
+def get_cached_user(user_id: int) -> Optional[User]:
+    """Return a fresh detached User for a cached principal, if present."""
+    values = principal_cache.get(user_id)
+    if values is None:
+        return None
+    
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+def cache_user(user: User) -> None:
+    """Store a loaded user's column values."""
+    principal_cache.set(user.id, {key: getattr(user, key) for key in _COLUMNS})
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a user from the cache."""
+    principal_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_on_write(mapper, connection, target: User) -> None:
+    invalidate_user(target.id)
+    
+    # A concurrent request may re-cache the old row before we commit, so
+    # evict once more after the transaction is durable.
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_after_commit(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -1,11 +1,25 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.utils.lru import LRUCache
+from app.utils.hashing import HashingPool
+from app.core.metrics import observe_hash
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Dedicated, bounded pool so bcrypt never runs on the event loop
+hashing_pool = HashingPool(
+    max_workers=settings.HASH_POOL_WORKERS,
+    max_queue=settings.HASH_QUEUE_LIMIT,
+    on_complete=observe_hash,
+)
+
+# Tokens whose signature has already been verified, until they expire
+token_cache = LRUCache(maxsize=settings.TOKEN_CACHE_SIZE)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
@@ -17,6 +31,16 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the hashing pool (raises HashingBusyError when saturated)."""
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password in the hashing pool (raises HashingBusyError when saturated)."""
+    return await hashing_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -33,9 +57,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_access_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token."""
+    """Decode and verify a JWT token (verified tokens are cached until expiry)."""
+    payload = token_cache.get(token)
+    if payload is not None:
+        return dict(payload)
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    
+    remaining = payload.get("exp", 0) - time.time()
+    if remaining > 0:
+        token_cache.set(token, payload, ttl=remaining)
+    
+    return dict(payload)
\ No newline at end of file
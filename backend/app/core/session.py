@@ -1,14 +1,114 @@
+from typing import Awaitable, Callable, TypeVar
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
+from app.db.write_queue import WriteQueue
+from app.core.metrics import instrument_engine
 
-# Create async engine
+T = TypeVar("T")
+
+IS_SQLITE = "sqlite" in settings.DATABASE_URL
+PRODUCTION_PROFILE = IS_SQLITE and settings.DB_ENGINE_PROFILE == "production"
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Tune every new SQLite connection for concurrent readers plus one writer."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _set_busy_timeout(dbapi_connection, connection_record) -> None:
+    # Default profile: wait this long for the write lock before "database is locked"
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+def _set_query_only(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA query_only=ON")
+    cursor.close()
+
+
+def _disable_pysqlite_transactions(dbapi_connection, connection_record) -> None:
+    # Let SQLAlchemy emit BEGIN itself so SAVEPOINTs work (see _emit_begin)
+    dbapi_connection.isolation_level = None
+
+
+def _emit_begin(conn) -> None:
+    conn.exec_driver_sql("BEGIN")
+
+
+_connect_args = {"check_same_thread": False} if IS_SQLITE else {}
+
+# Keep connections (and their pragmas/page cache) alive in production
+# instead of aiosqlite's default of one new connection per session.
+_pool_args = {"poolclass": AsyncAdaptedQueuePool} if PRODUCTION_PROFILE else {}
+
+# Create async engine (all writes, and reads in the default profile)
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
     future=True,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    connect_args=_connect_args,
+    **_pool_args
 )
 
+if PRODUCTION_PROFILE:
+    event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    event.listen(engine.sync_engine, "connect", _disable_pysqlite_transactions)
+    event.listen(engine.sync_engine, "begin", _emit_begin)
+    
+    # Separate pool of query-only connections for GET traffic; with WAL they
+    # read a consistent snapshot without waiting on the writer.
+    read_engine = create_async_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        future=True,
+        connect_args=_connect_args,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.DB_READ_POOL_SIZE,
+        max_overflow=0,
+    )
+    event.listen(read_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    event.listen(read_engine.sync_engine, "connect", _set_query_only)
+    
+    # The write queue's own connection. Handlers often read on their request
+    # session and keep its pooled connection while they wait on the queue,
+    # so a queue drawing from `engine` could be starved by its own callers.
+    write_queue_engine = create_async_engine(
+        settings.DATABASE_URL,
+        echo=settings.DEBUG,
+        future=True,
+        connect_args=_connect_args,
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+    )
+    event.listen(write_queue_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    event.listen(write_queue_engine.sync_engine, "connect", _disable_pysqlite_transactions)
+    event.listen(write_queue_engine.sync_engine, "begin", _emit_begin)
+else:
+    read_engine = engine
+    write_queue_engine = engine
+    if IS_SQLITE:
+        event.listen(engine.sync_engine, "connect", _set_busy_timeout)
+
+if settings.METRICS_ENABLED:
+    instrument_engine(engine, "writer")
+    if read_engine is not engine:
+        instrument_engine(read_engine, "reader")
+    if write_queue_engine is not engine:
+        instrument_engine(write_queue_engine, "write_queue")
+
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -18,6 +118,29 @@ AsyncSessionLocal = async_sessionmaker(
     autoflush=False,
 )
 
+ReadSessionLocal = async_sessionmaker(
+    read_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+WriteQueueSessionLocal = async_sessionmaker(
+    write_queue_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+    autocommit=False,
+    autoflush=False,
+)
+
+# Single-writer queue; only started in the production profile
+write_queue = WriteQueue(
+    WriteQueueSessionLocal,
+    max_batch=settings.DB_WRITE_BATCH_SIZE,
+    batch_window=settings.DB_WRITE_BATCH_WINDOW_MS / 1000,
+)
+
 
 async def get_db():
     """Dependency for getting async database sessions."""
@@ -28,11 +151,53 @@ async def get_db():
             await session.close()
 
 
-async def init_db():
-    """Initialize database - create all tables."""
-    from app.db.base import Base
-    from app.db.models.user import User
-    from app.db.models.product import Product
+async def get_read_db():
+    """Dependency for read-only sessions (the reader pool in production)."""
+    async with ReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+
+def is_database_locked(error: OperationalError) -> bool:
+    """Whether SQLite gave up waiting for the write lock (busy_timeout ran out)."""
+    return "database is locked" in str(error.orig)
+
+
+async def run_write(db: AsyncSession, work: Callable[[AsyncSession], Awaitable[T]]) -> T:
+    """
+    Run a unit of write work and commit it.
+    
+    `work(session)` stages changes without committing. In the production
+    profile it runs on the single-writer queue (possibly group-committed with
+    other writes), and `db` gives its pooled connection back first;
+    otherwise it runs on `db` and is committed directly.
+    """
+    if write_queue.running:
+        # Hand the request session's connection back to the pool while
+        # waiting; expire_on_commit=False keeps loaded objects usable
+        if db.in_transaction():
+            await db.commit()
+        return await write_queue.submit(work)
+    
+    try:
+        result = await work(db)
+        await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+    return result
+
+
+async def init_db() -> str:
+    """
+    Make sure the schema is at the migration head.
+    
+    A current database costs one version lookup; migrations run only when
+    it is behind (see app.db.migrations). Returns "current", "migrated" or
+    "adopted".
+    """
+    from app.db.migrations import ensure_schema
     
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+    return await ensure_schema(engine, migrate=settings.DB_AUTO_MIGRATE)
@@ -0,0 +1,90 @@
+"""
+Shared Jinja environment for the server-rendered UI.
+
+- Compiled templates persist in a filesystem bytecode cache, so new workers
+  load bytecode instead of re-parsing template sources.
+- Templates are only re-checked for changes (auto_reload) in DEBUG.
+- Pages whose output depends only on the template and a small, static
+  context (the anonymous GET login/register pages) are rendered once and
+  served from memory with an ETag, so browsers revalidate with a 304 and
+  the compression middleware can reuse its compressed bytes. Anything with
+  per-request data, such as form errors, goes through Jinja as usual.
+"""
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional
+from fastapi import Request
+from fastapi.responses import HTMLResponse
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+from app.core.config import settings
+from app.utils.lru import LRUCache
+from app.utils.http_cache import make_etag, is_not_modified, not_modified, set_validators
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "ui" / "templates"
+
+
+def _bytecode_cache() -> FileSystemBytecodeCache:
+    directory = settings.TEMPLATE_CACHE_DIR or os.path.join(tempfile.gettempdir(), "honey-jinja-cache")
+    os.makedirs(directory, exist_ok=True)
+    return FileSystemBytecodeCache(directory)
+
+
+jinja_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(),
+    auto_reload=settings.DEBUG,
+    bytecode_cache=_bytecode_cache(),
+)
+
+templates = Jinja2Templates(env=jinja_env)
+
+# Fully rendered pages: (template name, context hash) -> (HTML bytes, ETag)
+page_cache = LRUCache(maxsize=settings.RENDERED_PAGE_CACHE_SIZE)
+
+
+def _context_key(context: Dict[str, Any]) -> str:
+    return hashlib.sha1(repr(sorted(context.items())).encode()).hexdigest()
+
+
+def render_page(
+    name: str,
+    context: Optional[Dict[str, Any]] = None,
+    request: Optional[Request] = None
+) -> HTMLResponse:
+    """
+    Render a page whose output depends only on `name` and `context`,
+    serving repeat renders from the page cache (bypassed in DEBUG so
+    template edits show up immediately). Pass `request` to answer
+    conditional requests with a 304.
+
+    Do not pass per-request or per-user data here; use
+    templates.TemplateResponse for those renders.
+    """
+    context = context or {}
+    if settings.DEBUG:
+        return HTMLResponse(jinja_env.get_template(name).render(context))
+
+    key = (name, _context_key(context))
+    entry = page_cache.get(key)
+    if entry is None:
+        body = jinja_env.get_template(name).render(context).encode("utf-8")
+        entry = (body, make_etag("page", hashlib.sha1(body).hexdigest()))
+        page_cache.set(key, entry)
+
+    body, etag = entry
+    if request is not None and is_not_modified(request, etag, None):
+        return not_modified(etag, None)
+    response = HTMLResponse(body)
+    set_validators(response, etag, None)
+    return response
+
+
+def warm_templates() -> int:
+    """Compile every template into the bytecode cache; returns how many."""
+    names = jinja_env.list_templates(extensions=["html"])
+    for name in names:
+        jinja_env.get_template(name)
+    return len(names)
@@ -0,0 +1,90 @@
+"""
+Category facets (counts and price ranges) maintained by triggers.
+
+`category_facets` holds one row per category and is updated inside the
+same transaction as every write to `products` (ORM, Core, bulk imports and
+upserts), so reading all facets costs O(#categories) however large the
+catalog is. Each trigger only touches the affected categories:
+
+- insert: upsert the category row, widening the price range.
+- delete, or a price/category change: adjust counts; only when the removed
+  price was the category's min or max is that bound re-read, with an index
+  seek on (category, price).
+- stock change: only when it crosses zero, and then just the in-stock
+  count. Ordinary stock decrements from orders fire nothing.
+"""
+
+
+def _add(row: str) -> str:
+    return f"""
+        INSERT INTO category_facets(category, product_count, in_stock_count, min_price, max_price)
+        VALUES (COALESCE({row}.category, ''), 1, {row}.stock > 0, {row}.price, {row}.price)
+        ON CONFLICT(category) DO UPDATE SET
+            product_count = product_count + 1,
+            in_stock_count = in_stock_count + ({row}.stock > 0),
+            min_price = MIN(min_price, {row}.price),
+            max_price = MAX(max_price, {row}.price);
+    """
+
+
+def _remove(row: str) -> str:
+    # Runs after the row left `products` (or changed), so the re-read bound
+    # already reflects it
+    return f"""
+        UPDATE category_facets SET
+            product_count = product_count - 1,
+            in_stock_count = in_stock_count - ({row}.stock > 0),
+            min_price = CASE WHEN {row}.price <= min_price
+                THEN COALESCE((SELECT MIN(price) FROM products WHERE category IS {row}.category), min_price)
+                ELSE min_price END,
+            max_price = CASE WHEN {row}.price >= max_price
+                THEN COALESCE((SELECT MAX(price) FROM products WHERE category IS {row}.category), max_price)
+                ELSE max_price END
+        WHERE category = COALESCE({row}.category, '');
+        DELETE FROM category_facets
+        WHERE category = COALESCE({row}.category, '') AND product_count <= 0;
+    """
+
+
+CATEGORY_FACETS_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_facets_ai AFTER INSERT ON products BEGIN
+        {_add("new")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_facets_ad AFTER DELETE ON products BEGIN
+        {_remove("old")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS products_facets_au
+    AFTER UPDATE OF price, category ON products
+    WHEN old.price IS NOT new.price OR old.category IS NOT new.category BEGIN
+        {_remove("old")}
+        {_add("new")}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_facets_au_stock
+    AFTER UPDATE OF stock ON products
+    WHEN old.price IS new.price AND old.category IS new.category
+        AND (old.stock > 0) != (new.stock > 0) BEGIN
+        UPDATE category_facets
+        SET in_stock_count = in_stock_count + (new.stock > 0) - (old.stock > 0)
+        WHERE category = COALESCE(new.category, '');
+    END
+    """,
+]
+
+CATEGORY_FACETS_REBUILD = [
+    "DELETE FROM category_facets",
+    """
+    INSERT INTO category_facets(category, product_count, in_stock_count, min_price, max_price)
+    SELECT COALESCE(category, ''), COUNT(*), SUM(stock > 0), MIN(price), MAX(price)
+    FROM products GROUP BY COALESCE(category, '')
+    """,
+]
+
+FACET_TRIGGER_NAMES = ("products_facets_ai", "products_facets_ad", "products_facets_au", "products_facets_au_stock")
+
@@ -0,0 +1,62 @@
+"""
+SQLite FTS5 index over products.name / description / category.
+
+The index is an external-content FTS5 table kept in sync by triggers, so
+every write path (ORM, Core, bulk loads) updates it incrementally inside
+the same transaction. Stock/price updates don't touch indexed columns and
+so don't fire the update trigger.
+"""
+from sqlalchemy import Integer, column, table, text
+from sqlalchemy.engine import Connection
+
+products_fts = table("products_fts", column("rowid", Integer))
+
+# Column weights for bm25(): name, description, category
+BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+PRODUCT_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+        name, description, category,
+        content='products', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ai AFTER INSERT ON products BEGIN
+        INSERT INTO products_fts(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_ad AFTER DELETE ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS products_fts_au
+    AFTER UPDATE OF name, description, category ON products BEGIN
+        INSERT INTO products_fts(products_fts, rowid, name, description, category)
+        VALUES ('delete', old.id, old.name, old.description, old.category);
+        INSERT INTO products_fts(rowid, name, description, category)
+        VALUES (new.id, new.name, new.description, new.category);
+    END
+    """,
+]
+
+
+def ensure_product_search_index(conn: Connection) -> None:
+    """Create the FTS table and triggers if missing; backfill on first creation."""
+    if conn.dialect.name != "sqlite":
+        return
+    
+    exists = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'products_fts'")
+    ).first()
+    
+    for statement in PRODUCT_FTS_DDL:
+        conn.execute(text(statement))
+    
+    if not exists:
+        conn.execute(text("INSERT INTO products_fts(products_fts) VALUES ('rebuild')"))
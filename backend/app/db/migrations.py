@@ -0,0 +1,120 @@
+"""
+Schema versioning on startup.
+
+The schema is owned by Alembic migrations (backend/alembic). On startup
+each worker reads the stored revision from `alembic_version` (one indexed
+row) and compares it with the migration head; when they match, no DDL or
+reflection runs at all. Migrations only run when the database is behind.
+
+Databases created before migrations existed (by Base.metadata.create_all)
+are stamped at the 0000 baseline revision, the schema that startup built,
+and then upgraded like any other: 0001 skips whatever a later create_all
+had already added.
+"""
+import re
+from pathlib import Path
+from typing import Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+VERSIONS_DIR = BACKEND_DIR / "alembic" / "versions"
+
+# The schema Base.metadata.create_all built before migrations existed
+BASELINE_REVISION = "0000"
+
+_REVISION_RE = re.compile(r"^revision\s*=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+_DOWN_REVISION_RE = re.compile(r"^down_revision\s*=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+
+
+def load_models() -> None:
+    """Import every model so Base.metadata knows all tables."""
+    from app.db.models.user import User  # noqa: F401
+    from app.db.models.product import Product  # noqa: F401
+    from app.db.models.order import Order, OrderItem  # noqa: F401
+    from app.db.models.cart import Cart  # noqa: F401
+    from app.db.models.payment import Payment, PaymentEvent  # noqa: F401
+    from app.db.models.outbox import OutboxEvent  # noqa: F401
+    from app.db.models.category_facet import CategoryFacet  # noqa: F401
+
+
+def alembic_config():
+    from alembic.config import Config
+    
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    # Leave the application's logging configuration alone
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def head_revision() -> Optional[str]:
+    """
+    The newest migration revision, read straight from the version files.
+    
+    Importing Alembic costs more than the whole version check, so the fast
+    path scans `revision` / `down_revision` assignments instead; Alembic is
+    only imported when migrations actually need to run.
+    """
+    revisions, parents = set(), set()
+    for path in VERSIONS_DIR.glob("*.py"):
+        source = path.read_text()
+        revision = _REVISION_RE.search(source)
+        if revision:
+            revisions.add(revision.group(1))
+        parents.update(_DOWN_REVISION_RE.findall(source))
+    heads = revisions - parents
+    if len(heads) > 1:
+        raise RuntimeError(f"Multiple migration heads: {', '.join(sorted(heads))}")
+    return heads.pop() if heads else None
+
+
+def _current_revision(conn: Connection) -> Optional[str]:
+    if not inspect(conn).has_table("alembic_version"):
+        return None
+    return conn.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def _has_legacy_schema(conn: Connection) -> bool:
+    return inspect(conn).has_table("products")
+
+
+def _upgrade(conn: Connection, legacy: bool) -> None:
+    from alembic import command
+    
+    config = alembic_config()
+    config.attributes["connection"] = conn
+    if legacy:
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
+class SchemaOutOfDateError(RuntimeError):
+    """Raised when the database is behind and auto-migration is disabled."""
+
+
+async def ensure_schema(engine: AsyncEngine, migrate: bool = True) -> str:
+    """
+    Bring the database to the migration head if needed.
+    
+    Returns "current", "migrated" or "adopted" (a legacy create_all
+    database, stamped at the baseline and migrated).
+    """
+    head = head_revision()
+    
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_current_revision)
+        if current == head:
+            return "current"
+        legacy = current is None and await conn.run_sync(_has_legacy_schema)
+    
+    if not migrate:
+        raise SchemaOutOfDateError(
+            f"Database schema is at {current or 'no revision'}, expected {head}; "
+            "run `alembic upgrade head`"
+        )
+    
+    async with engine.begin() as conn:
+        await conn.run_sync(_upgrade, legacy)
+    return "adopted" if legacy else "migrated"
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Text, ForeignKey
+from app.db.base import BaseModel
+
+
+class Cart(BaseModel):
+    """
+    One row per user; line items are packed as a JSON array of
+    [product_id, quantity] pairs so reads and writes touch a single row.
+    """
+    __tablename__ = "carts"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True, index=True)
+    items = Column(Text, default="[]", nullable=False)
+    item_count = Column(Integer, default=0, nullable=False)
+    
+    def __repr__(self):
+        return f"<Cart(user_id={self.user_id}, item_count={self.item_count})>"
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Float, Integer
+from app.db.base import Base
+
+
+class CategoryFacet(Base):
+    """
+    Per-category product count, in-stock count and price range.
+    
+    Maintained incrementally by triggers on `products` (app/db/facets.py);
+    never written by application code. Uncategorized products are counted
+    under the empty string.
+    """
+    __tablename__ = "category_facets"
+    
+    category = Column(String(100), primary_key=True)
+    product_count = Column(Integer, nullable=False)
+    in_stock_count = Column(Integer, nullable=False)
+    min_price = Column(Float, nullable=False)
+    max_price = Column(Float, nullable=False)
+    
+    def __repr__(self):
+        return f"<CategoryFacet(category={self.category}, product_count={self.product_count})>"
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, String, Float, Integer, ForeignKey
+from sqlalchemy.orm import relationship
+from app.db.base import BaseModel
+
+
+class Order(BaseModel):
+    __tablename__ = "orders"
+    
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    status = Column(String(32), default="pending", nullable=False)
+    total = Column(Float, nullable=False)
+    
+    items = relationship("OrderItem", back_populates="order", lazy="selectin")
+    
+    def __repr__(self):
+        return f"<Order(id={self.id}, user_id={self.user_id}, total={self.total})>"
+
+
+class OrderItem(BaseModel):
+    __tablename__ = "order_items"
+    
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(Float, nullable=False)
+    
+    order = relationship("Order", back_populates="items")
+    
+    def __repr__(self):
+        return f"<OrderItem(order_id={self.order_id}, product_id={self.product_id}, quantity={self.quantity})>"
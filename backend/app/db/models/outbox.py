@@ -0,0 +1,29 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Text, DateTime, Index
+from app.db.base import BaseModel
+
+
+class OutboxEvent(BaseModel):
+    """
+    A side effect to run after the transaction that wrote it commits.
+    
+    Rows are due once `available_at` passes; claiming one pushes
+    `available_at` out by the lease, so an event whose worker died becomes
+    due again on its own. Handled events are deleted; events out of
+    attempts stay behind with status "dead".
+    """
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        Index("ix_outbox_events_due", "status", "available_at"),
+    )
+    
+    topic = Column(String(64), nullable=False)
+    payload = Column(Text, default="{}", nullable=False)
+    status = Column(String(16), default="pending", nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    available_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    claimed_by = Column(String(64), nullable=True)
+    last_error = Column(Text, nullable=True)
+    
+    def __repr__(self):
+        return f"<OutboxEvent(id={self.id}, topic={self.topic}, attempts={self.attempts})>"
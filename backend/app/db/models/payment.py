@@ -0,0 +1,52 @@
+from sqlalchemy import Column, String, Float, Integer, Boolean, DateTime, ForeignKey, Index, text
+from app.db.base import BaseModel
+
+
+class Payment(BaseModel):
+    """
+    A payment for an order at the gateway, identified by the gateway's
+    reference. Status only moves forward (see PaymentService.TRANSITIONS).
+    
+    At most one payment per order can be open or captured, so concurrent
+    checkouts of the same order cannot both be charged.
+    """
+    __tablename__ = "payments"
+    __table_args__ = (
+        Index(
+            "ix_payments_order_id_open",
+            "order_id",
+            unique=True,
+            sqlite_where=text("status IN ('pending', 'authorized', 'captured')"),
+        ),
+    )
+    
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    gateway_ref = Column(String(64), nullable=False, unique=True, index=True)
+    amount = Column(Float, nullable=False)
+    currency = Column(String(3), default="USD", nullable=False)
+    status = Column(String(32), default="pending", nullable=False)
+    # Highest gateway event sequence applied so far
+    last_sequence = Column(Integer, default=0, nullable=False)
+    captured_at = Column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<Payment(gateway_ref={self.gateway_ref}, order_id={self.order_id}, status={self.status})>"
+
+
+class PaymentEvent(BaseModel):
+    """
+    Every gateway webhook event received, once. The unique event_id is the
+    idempotency key: redelivered events never insert a second row.
+    """
+    __tablename__ = "payment_events"
+    
+    event_id = Column(String(64), nullable=False, unique=True, index=True)
+    gateway_ref = Column(String(64), nullable=False, index=True)
+    event_type = Column(String(32), nullable=False)
+    sequence = Column(Integer, nullable=False)
+    # Whether the event changed the payment (False for stale or unknown)
+    applied = Column(Boolean, default=False, nullable=False)
+    
+    def __repr__(self):
+        return f"<PaymentEvent(event_id={self.event_id}, type={self.event_type})>"
@@ -1,16 +1,32 @@
-from sqlalchemy import Column, String, Float, Integer, Text
+from sqlalchemy import Column, String, Float, Integer, Text, Index
 from app.db.base import BaseModel
 
 
 class Product(BaseModel):
     __tablename__ = "products"
+    __table_args__ = (
+        # Keyset pagination: WHERE category = ? AND id > ? ORDER BY id
+        Index("ix_products_category_id", "category", "id"),
+        # Catalog version (MAX(updated_at)) and incremental exports
+        Index("ix_products_updated_at", "updated_at"),
+        # Category min/max price seeks for the facet triggers, and
+        # WHERE category = ? ORDER BY price, id listings
+        Index("ix_products_category_price", "category", "price"),
+        # Sorted listings. SQLite appends the rowid (id) to every index, so
+        # (x) also serves ORDER BY x, id and keyset seeks on (x, id).
+        Index("ix_products_price", "price"),
+        Index("ix_products_created_at", "created_at"),
+        Index("ix_products_category_created_at", "category", "created_at"),
+        Index("ix_products_category_name", "category", "name"),
+    )
     
+    sku = Column(String(64), nullable=True, unique=True, index=True)
     name = Column(String(255), nullable=False, index=True)
     description = Column(Text, nullable=True)
     price = Column(Float, nullable=False)
     stock = Column(Integer, default=0, nullable=False)
     image_url = Column(String(500), nullable=True)
-    category = Column(String(100), nullable=True, index=True)
+    category = Column(String(100), nullable=True)
     
     def __repr__(self):
         return f"<Product(id={self.id}, name={self.name}, price={self.price})>"
\ No newline at end of file
@@ -0,0 +1,11 @@
+from app.core.session import (
+    engine,
+    read_engine,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    write_queue,
+    get_db,
+    get_read_db,
+    run_write,
+    init_db,
+)
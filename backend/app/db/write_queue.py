@@ -0,0 +1,129 @@
+"""
+Single-writer queue with group commit.
+
+SQLite allows one writer at a time; letting every request open its own write
+transaction just moves the queueing into `database is locked` retries. In
+the production engine profile, writes are instead submitted here as work
+functions and run by one task on one connection. Jobs that arrive together
+are run in a single transaction, each inside its own SAVEPOINT, and
+committed once, so a burst of small writes costs one fsync. A failing job
+only rolls back its savepoint; the others still commit.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+T = TypeVar("T")
+WriteWork = Callable[[AsyncSession], Awaitable[Any]]
+
+
+class WriteQueue:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        max_batch: int = 32,
+        batch_window: float = 0.002
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        
+        self.jobs = 0
+        self.commits = 0
+        self.failed_jobs = 0
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def stop(self) -> None:
+        """Drain queued jobs, then stop the writer task."""
+        if not self.running:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+    async def submit(self, work: Callable[[AsyncSession], Awaitable[T]]) -> T:
+        """
+        Run `work(session)` in the writer transaction and return its result.
+        
+        The work function must not commit; it resolves once the group commit
+        that included it is durable.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((work, future))
+        return await future
+    
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            
+            # Give concurrent writers a moment to join this commit
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            try:
+                await self._run_batch(batch)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _run_batch(self, batch: List[Tuple[WriteWork, asyncio.Future]]) -> None:
+        outcomes = []
+        async with self.session_factory() as session:
+            try:
+                for work, future in batch:
+                    if future.cancelled():
+                        continue
+                    try:
+                        async with session.begin_nested():
+                            result = await work(session)
+                    except Exception as e:
+                        self.failed_jobs += 1
+                        outcomes.append((future, None, e))
+                    else:
+                        outcomes.append((future, result, None))
+                
+                await session.commit()
+            except Exception as e:
+                # Commit failed: nothing in this batch is durable
+                await session.rollback()
+                outcomes = [(future, None, error or e) for future, _, error in outcomes]
+        
+        self.jobs += len(batch)
+        self.commits += 1
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+    
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "jobs": self.jobs,
+            "commits": self.commits,
+            "failed_jobs": self.failed_jobs,
+        }
@@ -1,21 +1,65 @@
-from fastapi import FastAPI
+import time
+
+# Measured from here so worker cold-start time includes app imports
+_started = time.perf_counter()
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 from app.core.config import settings
-from app.db.session import init_db
-from app.api.v1 import products, auth
+from app.db.session import init_db, write_queue
+from app.core.session import PRODUCTION_PROFILE
+from app.api.v1 import products, auth, orders, cart, payments, images
+from app.services.catalog_snapshot import catalog
+from app.core.principal_cache import principal_cache
+from app.core.security import token_cache, hashing_pool
+from app.core.templates import warm_templates, page_cache
+from app.utils.hashing import HashingBusyError
+from app.core.login_throttle import LoginThrottledError, ip_limiter, email_limiter
+from app.services.payment_service import payment_worker
+from app.services.outbox import outbox
+from app.services.image_service import image_pipeline, BACKEND_DIR
+from app.services.product_service import read_flights
+from app.services import notification_service  # noqa: F401  (registers outbox handlers)
+from app.core.compression import CompressionMiddleware, compressor
+from app.core.metrics import MetricsMiddleware, register_stats, registry as metrics_registry
 from app.ui.auth import routes as ui_auth_routes
+from app.ui.payment import routes as ui_payment_routes
+
+
+# Cold-start timings for /health and /metrics
+startup_stats = {"schema_seconds": 0.0, "ready_seconds": 0.0}
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
-    # Startup: Initialize database
-    await init_db()
-    print("✅ Database initialized")
+    # Startup: check the schema version (migrates only when behind)
+    schema_started = time.perf_counter()
+    schema_state = await init_db()
+    startup_stats["schema_seconds"] = time.perf_counter() - schema_started
+    print(f"✅ Database schema {schema_state} ({startup_stats['schema_seconds'] * 1000:.1f} ms)")
+    print(f"✅ Templates compiled ({warm_templates()})")
+    if PRODUCTION_PROFILE:
+        write_queue.start()
+        print("✅ Production SQLite profile (WAL, reader pool, single-writer queue)")
+    payment_worker.start()
+    outbox.start()
+    print(f"✅ Outbox workers started ({outbox.workers})")
+    if catalog.enabled:
+        await catalog.reload()
+        print(f"✅ Catalog snapshot loaded ({len(catalog.snapshot.products)} products)")
+    startup_stats["ready_seconds"] = time.perf_counter() - _started
+    print(f"✅ Worker ready in {startup_stats['ready_seconds'] * 1000:.0f} ms")
     yield
-    # Shutdown: Cleanup if needed
+    # Shutdown: persist acknowledged payment events before the writer stops
+    await payment_worker.stop()
+    await outbox.stop()
+    await write_queue.stop()
+    hashing_pool.shutdown()
+    image_pipeline.shutdown()
     print("👋 Application shutting down")
 
 
@@ -26,6 +70,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Compress responses (innermost, so metrics include compression time)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -33,10 +81,52 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
-# Mount static files (if needed)
-# app.mount("/static", StaticFiles(directory="static"), name="static")
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    register_stats(
+        "cache",
+        {
+            "principal": principal_cache.stats,
+            "token": token_cache.stats,
+            "rendered_page": page_cache.stats,
+            "compressed_body": compressor.cache.stats,
+        },
+        "cache"
+    )
+    register_stats("hashing_pool", {"": hashing_pool.stats})
+    register_stats("login_throttle", {"ip": ip_limiter.stats, "email": email_limiter.stats}, "key")
+    register_stats("write_queue", {"": write_queue.stats})
+    register_stats("payment_events", {"": payment_worker.stats})
+    register_stats("outbox", {"": outbox.stats})
+    register_stats("images", {"": image_pipeline.stats})
+    register_stats("compression", {"": compressor.stats})
+    register_stats("single_flight", {"": read_flights.stats})
+    register_stats("image_cache", {"": image_pipeline.cache.stats})
+    register_stats("startup", {"": lambda: startup_stats})
+
+@app.exception_handler(HashingBusyError)
+async def hashing_busy_handler(request: Request, exc: HashingBusyError):
+    """Shed login/register load instead of queueing behind bcrypt."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"}
+    )
+
+@app.exception_handler(LoginThrottledError)
+async def login_throttled_handler(request: Request, exc: LoginThrottledError):
+    """Reject over-budget login attempts before any DB or bcrypt work."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many login attempts, please retry later"},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
+
+# Mount static files (stylesheets; uploaded image originals under images/originals)
+app.mount("/static", StaticFiles(directory=BACKEND_DIR / "static"), name="static")
 
 # Include API routers
 app.include_router(
@@ -51,6 +141,30 @@ app.include_router(
     tags=["Products"]
 )
 
+app.include_router(
+    orders.router,
+    prefix="/api/v1/orders",
+    tags=["Orders"]
+)
+
+app.include_router(
+    cart.router,
+    prefix="/api/v1/cart",
+    tags=["Cart"]
+)
+
+app.include_router(
+    payments.router,
+    prefix="/api/v1/payments",
+    tags=["Payments"]
+)
+
+app.include_router(
+    images.router,
+    prefix="/api/v1/images",
+    tags=["Images"]
+)
+
 # Include UI routers
 app.include_router(
     ui_auth_routes.router,
@@ -58,6 +172,12 @@ app.include_router(
     tags=["UI - Authentication"]
 )
 
+app.include_router(
+    ui_payment_routes.router,
+    prefix="/ui/payment",
+    tags=["UI - Payment"]
+)
+
 
 @app.get("/")
 async def root():
@@ -75,10 +195,33 @@ async def health_check():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "environment": settings.ENVIRONMENT
+        "environment": settings.ENVIRONMENT,
+        "caches": {
+            "principal": principal_cache.stats(),
+            "token": token_cache.stats()
+        },
+        "hashing": hashing_pool.stats(),
+        "login_throttle": {"ip": ip_limiter.stats(), "email": email_limiter.stats()},
+        "write_queue": write_queue.stats(),
+        "payment_events": payment_worker.stats(),
+        "outbox": outbox.stats(),
+        "images": image_pipeline.stats(),
+        "single_flight": read_flights.stats(),
+        "startup": {name: round(value, 4) for name, value in startup_stats.items()}
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(
+        metrics_registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -2,7 +2,9 @@ from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.db.models.user import User
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.session import run_write
+from app.services.outbox import enqueue
+from app.core.security import verify_password_async, get_password_hash_async, create_access_token
 
 
 class AuthService:
@@ -15,7 +17,7 @@ class AuthService:
         if not user:
             return None
         
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return None
         
         if not user.is_active:
@@ -43,20 +45,32 @@ class AuthService:
         full_name: Optional[str] = None
     ) -> User:
         """Create a new user."""
-        hashed_password = get_password_hash(password)
+        hashed_password = await get_password_hash_async(password)
         
-        user = User(
-            email=email,
-            hashed_password=hashed_password,
-            full_name=full_name,
-            is_active=True
-        )
+        async def work(session: AsyncSession) -> User:
+            user = User(
+                email=email,
+                hashed_password=hashed_password,
+                full_name=full_name,
+                is_active=True
+            )
+            session.add(user)
+            await session.flush()
+            enqueue(session, "user.registered", {"user_id": user.id, "email": email, "full_name": full_name})
+            return user
         
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
+        return await run_write(db, work)
+    
+    @staticmethod
+    async def deactivate_user(db: AsyncSession, user_id: int) -> Optional[User]:
+        """Deactivate a user; the principal cache is evicted on commit."""
+        async def work(session: AsyncSession) -> Optional[User]:
+            user = await session.get(User, user_id)
+            if user:
+                user.is_active = False
+            return user
         
-        return user
+        return await run_write(db, work)
     
     @staticmethod
     def create_token_for_user(user: User) -> str:
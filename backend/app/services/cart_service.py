@@ -0,0 +1,189 @@
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, literal, true, DateTime, Integer
+from sqlalchemy.dialects.sqlite import Insert, insert as sqlite_insert
+from app.core.session import run_write
+from app.db.models.cart import Cart
+from app.db.models.product import Product
+
+MAX_CART_LINES = 100
+MAX_LINE_QUANTITY = 1000
+
+CartLines = List[Tuple[int, int]]
+
+
+def pack_lines(lines: CartLines) -> str:
+    return json.dumps(lines, separators=(",", ":"))
+
+
+def unpack_lines(packed: str) -> CartLines:
+    return [(product_id, quantity) for product_id, quantity in json.loads(packed)]
+
+
+class CartService:
+    @staticmethod
+    def normalize_lines(lines: Iterable[Tuple[int, int]]) -> CartLines:
+        """Merge duplicates, drop non-positive quantities and enforce limits."""
+        quantities: Dict[int, int] = {}
+        for product_id, quantity in lines:
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        
+        normalized = [
+            (product_id, min(quantity, MAX_LINE_QUANTITY))
+            for product_id, quantity in quantities.items()
+            if quantity > 0
+        ]
+        return normalized[:MAX_CART_LINES]
+    
+    @staticmethod
+    async def get_lines(db: AsyncSession, user_id: int) -> CartLines:
+        """Get the raw (product_id, quantity) lines (one indexed lookup)."""
+        packed = await db.scalar(select(Cart.items).where(Cart.user_id == user_id))
+        return unpack_lines(packed) if packed else []
+    
+    @staticmethod
+    async def get_item_count(db: AsyncSession, user_id: int) -> int:
+        """Get the total quantity in the cart, for the navbar badge."""
+        count = await db.scalar(select(Cart.item_count).where(Cart.user_id == user_id))
+        return count or 0
+    
+    @staticmethod
+    async def get_priced_cart(db: AsyncSession, user_id: int) -> Dict[str, Any]:
+        """
+        Get the cart priced against current product data in one query.
+        
+        The packed lines are expanded with SQLite's json_each and joined to
+        products by primary key, so cost is one indexed cart lookup plus one
+        product seek per line, in a single round trip. Lines for products
+        that no longer exist drop out of the join.
+        """
+        line = func.json_each(Cart.items).table_valued("key", "value").alias("line")
+        product_id = func.json_extract(line.c.value, "$[0]").cast(Integer)
+        quantity = func.json_extract(line.c.value, "$[1]").cast(Integer)
+        
+        query = (
+            select(
+                Product.id,
+                Product.name,
+                Product.price,
+                Product.stock,
+                Product.image_url,
+                quantity.label("quantity"),
+            )
+            .select_from(Cart)
+            .join(line, true())
+            .join(Product, Product.id == product_id)
+            .where(Cart.user_id == user_id)
+            .order_by(line.c.key)
+        )
+        
+        result = await db.execute(query)
+        
+        items = []
+        subtotal = 0.0
+        item_count = 0
+        for row in result:
+            line_total = round(row.price * row.quantity, 2)
+            items.append({
+                "product_id": row.id,
+                "name": row.name,
+                "price": row.price,
+                "stock": row.stock,
+                "image_url": row.image_url,
+                "quantity": row.quantity,
+                "line_total": line_total,
+                "in_stock": row.stock >= row.quantity,
+            })
+            subtotal += line_total
+            item_count += row.quantity
+        
+        return {
+            "items": items,
+            "item_count": item_count,
+            "subtotal": round(subtotal, 2),
+        }
+    
+    @staticmethod
+    def _upsert(user_id: int, lines: CartLines, *conditions) -> Insert:
+        """Upsert the packed cart row, writing nothing unless `conditions` hold."""
+        now = datetime.utcnow()
+        row = select(
+            literal(user_id),
+            literal(pack_lines(lines)),
+            literal(sum(quantity for _, quantity in lines)),
+            literal(now, DateTime),
+            literal(now, DateTime),
+        ).where(*(conditions or (true(),)))  # SQLite needs a WHERE before ON CONFLICT
+        
+        stmt = sqlite_insert(Cart).from_select(
+            ["user_id", "items", "item_count", "created_at", "updated_at"], row
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[Cart.user_id],
+            set_={
+                "items": stmt.excluded["items"],
+                "item_count": stmt.excluded.item_count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+    
+    @staticmethod
+    async def _save_lines(db: AsyncSession, user_id: int, lines: CartLines) -> None:
+        """Drop lines for unknown products, then upsert the packed cart row."""
+        if lines:
+            known = set(await db.scalars(
+                select(Product.id).where(Product.id.in_([product_id for product_id, _ in lines]))
+            ))
+            lines = [line for line in lines if line[0] in known]
+        
+        await db.execute(CartService._upsert(user_id, lines))
+    
+    @staticmethod
+    async def replace_items(db: AsyncSession, user_id: int, lines: Iterable[Tuple[int, int]]) -> None:
+        """Replace the whole cart."""
+        lines = CartService.normalize_lines(lines)
+        
+        async def work(session: AsyncSession) -> None:
+            await CartService._save_lines(session, user_id, lines)
+        
+        await run_write(db, work)
+    
+    @staticmethod
+    async def set_item(db: AsyncSession, user_id: int, product_id: int, quantity: int) -> None:
+        """
+        Set one line's quantity (0 removes it).
+        
+        One read of the packed lines and one upsert; the product existence
+        check is the upsert's WHERE, so an unknown product writes nothing.
+        """
+        async def work(session: AsyncSession) -> None:
+            lines = dict(await CartService.get_lines(session, user_id))
+            lines[product_id] = quantity
+            conditions = (
+                (select(Product.id).where(Product.id == product_id).exists(),) if quantity > 0 else ()
+            )
+            await session.execute(
+                CartService._upsert(user_id, CartService.normalize_lines(lines.items()), *conditions)
+            )
+        
+        await run_write(db, work)
+    
+    @staticmethod
+    async def merge_items(db: AsyncSession, user_id: int, lines: Iterable[Tuple[int, int]]) -> None:
+        """Add an anonymous (localStorage) cart into the user's cart, summing quantities."""
+        incoming = list(lines)
+        
+        async def work(session: AsyncSession) -> None:
+            existing = await CartService.get_lines(session, user_id)
+            await CartService._save_lines(
+                session, user_id, CartService.normalize_lines(existing + incoming)
+            )
+        
+        await run_write(db, work)
+    
+    @staticmethod
+    async def clear(db: AsyncSession, user_id: int) -> None:
+        """Empty the cart."""
+        await CartService.replace_items(db, user_id, [])
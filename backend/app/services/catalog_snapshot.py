@@ -0,0 +1,221 @@
+"""
+In-process catalog snapshot.
+
+The whole product table is loaded into immutable records with by-id and
+by-category indexes so the browse endpoints can be answered without a
+database round trip. Write paths call ``catalog.reload()`` after they
+commit; the new snapshot is built off to the side and published with a
+single reference assignment, so readers never see a half-built catalog.
+"""
+import asyncio
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.session import ReadSessionLocal
+from app.db.models.product import Product
+
+
+class ProductRecord(NamedTuple):
+    """Read-only copy of a product row."""
+    id: int
+    sku: Optional[str]
+    name: str
+    description: Optional[str]
+    price: float
+    stock: int
+    image_url: Optional[str]
+    category: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_row(cls, product: Product) -> "ProductRecord":
+        return cls(
+            id=product.id,
+            sku=product.sku,
+            name=product.name,
+            description=product.description,
+            price=product.price,
+            stock=product.stock,
+            image_url=product.image_url,
+            category=product.category,
+            created_at=product.created_at,
+            updated_at=product.updated_at,
+        )
+
+
+class CatalogSnapshot:
+    """Immutable view of the catalog with lookup indexes."""
+
+    __slots__ = (
+        "products", "by_id", "by_category", "ids", "category_ids",
+        "last_modified", "version", "loaded_at", "_sorted",
+    )
+
+    def __init__(self, products: List[ProductRecord], version: int):
+        self.products: Tuple[ProductRecord, ...] = tuple(sorted(products, key=lambda p: p.id))
+        self.by_id: Dict[int, ProductRecord] = {p.id: p for p in self.products}
+
+        by_category: Dict[str, List[ProductRecord]] = {}
+        for product in self.products:
+            if product.category:
+                by_category.setdefault(product.category, []).append(product)
+        self.by_category: Dict[str, Tuple[ProductRecord, ...]] = {
+            category: tuple(items) for category, items in by_category.items()
+        }
+
+        # Sorted id lists for keyset seeks via bisect
+        self.ids: List[int] = [p.id for p in self.products]
+        self.category_ids: Dict[str, List[int]] = {
+            category: [p.id for p in items] for category, items in self.by_category.items()
+        }
+
+        self.last_modified: Optional[datetime] = max(
+            (p.updated_at for p in self.products), default=None
+        )
+        self.version = version
+        self.loaded_at = time.monotonic()
+        # (category, attribute) -> (records, keys) ascending by (value, id)
+        self._sorted: Dict[Tuple[Optional[str], str], Tuple[Tuple[ProductRecord, ...], List[tuple]]] = {}
+
+    def _sorted_by(self, category: Optional[str], attribute: str) -> Tuple[Tuple[ProductRecord, ...], List[tuple]]:
+        """Records ordered by (attribute, id) with their keys, built on first use."""
+        view = self._sorted.get((category, attribute))
+        if view is None:
+            rows = self.by_category.get(category, ()) if category else self.products
+            rows = tuple(sorted(rows, key=lambda p: (getattr(p, attribute), p.id)))
+            view = (rows, [(getattr(p, attribute), p.id) for p in rows])
+            self._sorted[(category, attribute)] = view
+        return view
+
+    def list_products(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        category: Optional[str] = None,
+        after_id: Optional[int] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock: Optional[bool] = None,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        after_key: Any = None
+    ) -> List[ProductRecord]:
+        """
+        Return a page of products in id order, or by (order_by, id).
+
+        Same semantics as ProductService.build_list_query: the keyset
+        position is (after_key, after_id), or after_id alone in id order.
+        """
+        if order_by is None:
+            if category:
+                rows = self.by_category.get(category, ())
+                keys = self.category_ids.get(category, [])
+            else:
+                rows = self.products
+                keys = self.ids
+            position = after_id
+        else:
+            rows, keys = self._sorted_by(category, order_by)
+            position = (after_key, after_id)
+
+        if descending:
+            end = len(rows) if after_id is None else bisect_left(keys, position)
+            indexes = range(end - 1, -1, -1)
+        else:
+            start = 0 if after_id is None else bisect_right(keys, position)
+            indexes = range(start, len(rows))
+
+        if min_price is None and max_price is None and in_stock is None:
+            return [rows[i] for i in indexes[skip:skip + limit]]
+
+        matches = (
+            p for p in map(rows.__getitem__, indexes)
+            if (min_price is None or p.price >= min_price)
+            and (max_price is None or p.price <= max_price)
+            and (in_stock is None or (p.stock > 0) == in_stock)
+        )
+        return list(islice(matches, skip, skip + limit))
+
+    def get_product(self, product_id: int) -> Optional[ProductRecord]:
+        """Return a single product by id."""
+        return self.by_id.get(product_id)
+
+    def get_products(self, product_ids: List[int]) -> Dict[int, ProductRecord]:
+        """Return the products that exist among product_ids, keyed by id."""
+        by_id = self.by_id
+        return {pid: by_id[pid] for pid in product_ids if pid in by_id}
+
+
+class CatalogCache:
+    """Holder for the current snapshot; swapped atomically on reload."""
+
+    def __init__(self):
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self._lock = asyncio.Lock()
+        self._version = 0
+        self._background_reload: Optional[asyncio.Task] = None
+        self._reload_requested = False
+
+    @property
+    def enabled(self) -> bool:
+        return settings.CATALOG_SNAPSHOT_ENABLED
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """Return the live snapshot, or None when snapshot mode is off or cold."""
+        snapshot = self.snapshot
+        if snapshot is None or not self.enabled:
+            return None
+
+        # Other workers may have written; refresh in the background once the
+        # snapshot is older than the configured TTL, serving the old one meanwhile.
+        age = time.monotonic() - snapshot.loaded_at
+        if age > settings.CATALOG_SNAPSHOT_TTL_SECONDS:
+            self._schedule_reload()
+
+        return snapshot
+
+    async def reload(self) -> None:
+        """Rebuild the snapshot from the database and publish it."""
+        if not self.enabled:
+            return
+
+        async with self._lock:
+            async with ReadSessionLocal() as db:
+                result = await db.execute(select(Product).order_by(Product.id))
+                records = [ProductRecord.from_row(p) for p in result.scalars()]
+
+            self._version += 1
+            self.snapshot = CatalogSnapshot(records, self._version)
+
+    def request_reload(self) -> None:
+        """
+        Reload in the background, coalescing bursts of writes.
+        
+        For high-frequency writers (stock changes) that shouldn't wait for a
+        rebuild: however many requests arrive while a reload runs, exactly
+        one more reload follows it.
+        """
+        if not self.enabled or self.snapshot is None:
+            return
+        self._reload_requested = True
+        self._schedule_reload()
+
+    def _schedule_reload(self) -> None:
+        if self._background_reload and not self._background_reload.done():
+            return
+        self._background_reload = asyncio.get_running_loop().create_task(self._reload_loop())
+
+    async def _reload_loop(self) -> None:
+        while True:
+            self._reload_requested = False
+            await self.reload()
+            if not self._reload_requested:
+                break
+
+
+catalog = CatalogCache()
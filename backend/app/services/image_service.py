@@ -0,0 +1,197 @@
+"""
+Product image pipeline.
+
+Uploads are validated in a worker process and stored under
+IMAGE_DIR/originals named by content hash, so an image URL never changes
+meaning and every response can be cached forever. Derivatives (a width from
+IMAGE_WIDTHS, as WebP or JPEG) are rendered on first request in a process
+pool, never on the event loop; concurrent requests for the same derivative
+share one render. They live in IMAGE_DIR/cache, an LRU directory bounded by
+IMAGE_CACHE_MAX_BYTES, and are re-rendered if evicted.
+"""
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.utils.disk_cache import DiskLRUCache
+from app.utils.images import probe_original, render_derivative
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+ORIGINAL_EXTENSIONS = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+MEDIA_TYPES = {"webp": "image/webp", "jpg": "image/jpeg"}
+
+
+class ImageNotFoundError(LookupError):
+    """Raised when no original exists for a digest."""
+
+
+class ImagePipelineBusyError(Exception):
+    """Raised when the render queue is full."""
+
+
+class ImagePipeline:
+    def __init__(
+        self,
+        directory: Path,
+        widths: List[int],
+        cache_max_bytes: int,
+        workers: int,
+        max_queue: int,
+        max_pixels: int,
+        quality: Dict[str, int]
+    ):
+        self.originals = directory / "originals"
+        self.cache = DiskLRUCache(directory / "cache", cache_max_bytes)
+        self.widths = widths
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_pixels = max_pixels
+        self.quality = quality
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._rendering: Dict[str, asyncio.Task] = {}
+        
+        self.uploads = 0
+        self.renders = 0
+        self.shared_renders = 0
+        self.rejected = 0
+        self.render_seconds = 0.0
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and DB threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+    
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a function in the process pool, or raise ImagePipelineBusyError."""
+        if self._in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise ImagePipelineBusyError("Image queue is full")
+        
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self._in_flight -= 1
+    
+    def snap_width(self, requested: Optional[int]) -> int:
+        """The smallest configured width >= requested (the largest if none is)."""
+        if requested is not None:
+            for width in self.widths:
+                if width >= requested:
+                    return width
+        return self.widths[-1]
+    
+    def url(self, digest: str) -> str:
+        return f"/api/v1/images/{digest}"
+    
+    def _original(self, digest: str) -> Optional[Path]:
+        for extension in ORIGINAL_EXTENSIONS.values():
+            path = self.originals / f"{digest}.{extension}"
+            if path.is_file():
+                return path
+        return None
+    
+    def _write_upload(self, data: bytes) -> Tuple[str, str]:
+        """Hash and spool an upload to a temp file (runs in a thread)."""
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        self.originals.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=self.originals, suffix=".tmp")
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.chmod(temp_path, 0o644)
+        return digest, temp_path
+    
+    async def ingest(self, data: bytes) -> str:
+        """
+        Validate and store an uploaded original; returns its digest.
+        
+        Raises InvalidImageError for anything Pillow can't safely decode.
+        Uploading the same bytes twice stores them once.
+        """
+        digest, temp_path = await asyncio.to_thread(self._write_upload, data)
+        try:
+            image_format, _, _ = await self._run(probe_original, temp_path, self.max_pixels)
+            if self._original(digest) is None:
+                os.replace(temp_path, self.originals / f"{digest}.{ORIGINAL_EXTENSIONS[image_format]}")
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+        self.uploads += 1
+        return digest
+    
+    async def derivative(self, digest: str, width: int, fmt: str) -> Path:
+        """Path of the `width`/`fmt` derivative, rendering it on a cache miss."""
+        name = f"{digest}-{width}-q{self.quality[fmt]}.{fmt}"
+        path = self.cache.get(name)
+        if path is not None:
+            return path
+        
+        task = self._rendering.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._render(name, digest, width, fmt))
+            self._rendering[name] = task
+            task.add_done_callback(lambda done: self._render_done(name, done))
+        else:
+            self.shared_renders += 1
+        # A disconnecting client must not cancel a render others are awaiting
+        return await asyncio.shield(task)
+    
+    def _render_done(self, name: str, task: asyncio.Task) -> None:
+        self._rendering.pop(name, None)
+        # Mark the error retrieved even if every waiter went away
+        if not task.cancelled():
+            task.exception()
+    
+    async def _render(self, name: str, digest: str, width: int, fmt: str) -> Path:
+        source = self._original(digest)
+        if source is None:
+            raise ImageNotFoundError(digest)
+        
+        target = self.cache.path(name)
+        started = time.perf_counter()
+        size = await self._run(render_derivative, str(source), str(target), width, fmt, self.quality[fmt])
+        self.render_seconds += time.perf_counter() - started
+        self.renders += 1
+        self.cache.add(name, size)
+        return target
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "uploads": self.uploads,
+            "renders": self.renders,
+            "shared_renders": self.shared_renders,
+            "rejected": self.rejected,
+            "render_seconds_total": round(self.render_seconds, 6),
+            "cache": self.cache.stats(),
+        }
+
+
+image_pipeline = ImagePipeline(
+    BACKEND_DIR / settings.IMAGE_DIR,
+    widths=settings.image_widths_list,
+    cache_max_bytes=settings.IMAGE_CACHE_MAX_BYTES,
+    workers=settings.IMAGE_POOL_WORKERS,
+    max_queue=settings.IMAGE_QUEUE_LIMIT,
+    max_pixels=settings.IMAGE_MAX_PIXELS,
+    quality={"webp": settings.IMAGE_WEBP_QUALITY, "jpg": settings.IMAGE_JPEG_QUALITY},
+)
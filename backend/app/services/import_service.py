@@ -0,0 +1,266 @@
+"""
+Streaming bulk product import.
+
+Records are parsed incrementally from CSV or NDJSON (a file on disk or an
+HTTP request body), validated in chunks, and written with one executemany
+per chunk inside a transaction per chunk. Rows with a `sku` are upserted on
+it (or skipped when it already exists and upsert is off); rows without one
+are plain inserts. Memory use is bounded by the chunk
+size, not the feed size.
+"""
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field, ValidationError, field_validator
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.models.product import Product
+from app.core.session import run_write
+from app.services.catalog_snapshot import catalog
+
+SUPPORTED_FORMATS = ("csv", "ndjson")
+MAX_REPORTED_ERRORS = 100
+
+_products = Product.__table__
+_UPSERT_COLUMNS = ("name", "description", "price", "stock", "image_url", "category")
+
+
+class ProductImportRow(BaseModel):
+    sku: Optional[str] = Field(None, max_length=64)
+    name: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    price: float = Field(..., ge=0)
+    stock: int = Field(0, ge=0)
+    image_url: Optional[str] = Field(None, max_length=500)
+    category: Optional[str] = Field(None, max_length=100)
+    
+    @field_validator("sku", "description", "image_url", "category", mode="before")
+    @classmethod
+    def blank_to_none(cls, value: Any) -> Any:
+        # CSV has no null; treat empty cells as missing
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    written: int = 0
+    skipped: int = 0
+    failed: int = 0
+    chunks: int = 0
+    elapsed_seconds: float = 0.0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    
+    @property
+    def rows_per_second(self) -> float:
+        return self.written / self.elapsed_seconds if self.elapsed_seconds else 0.0
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "written": self.written,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "chunks": self.chunks,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "errors": self.errors,
+        }
+
+
+async def iter_byte_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Split a stream of byte chunks into decoded text lines."""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8-sig").rstrip("\r")
+
+
+async def iter_file_lines(path: str, chunk_size: int = 1 << 20) -> AsyncIterator[str]:
+    """Stream text lines from a file on disk."""
+    async def chunks():
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    
+    async for line in iter_byte_lines(chunks()):
+        yield line
+
+
+async def iter_records(
+    lines: AsyncIterator[str],
+    fmt: str
+) -> AsyncIterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Parse lines into (line_no, record, error) tuples.
+    
+    CSV needs a header row; quoted fields may span lines.
+    """
+    if fmt == "ndjson":
+        line_no = 0
+        async for line in lines:
+            line_no += 1
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Expected a JSON object"
+                continue
+            yield line_no, record, None
+        return
+    
+    header: Optional[List[str]] = None
+    pending = ""
+    start_line = line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not pending:
+            start_line = line_no
+        pending = f"{pending}\n{line}" if pending else line
+        
+        # An odd number of quotes means a quoted field continues on the next line
+        if pending.count('"') % 2:
+            continue
+        
+        text, pending = pending, ""
+        if not text.strip():
+            continue
+        
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        
+        if len(values) != len(header):
+            yield start_line, None, f"Expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells fall back to the model defaults
+        yield start_line, {k: v for k, v in zip(header, values) if v != ""}, None
+    
+    if pending:
+        yield start_line, None, "Unterminated quoted field"
+
+
+class ProductImportService:
+    @staticmethod
+    async def import_products(
+        db: AsyncSession,
+        lines: AsyncIterator[str],
+        fmt: str = "ndjson",
+        chunk_size: int = 5000,
+        upsert: bool = True
+    ) -> ImportReport:
+        """Import products from a line stream in chunked transactions."""
+        if fmt not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported import format: {fmt}")
+        
+        report = ImportReport()
+        started = time.perf_counter()
+        chunk: List[Dict[str, Any]] = []
+        
+        async for line_no, record, error in iter_records(lines, fmt):
+            report.rows += 1
+            
+            if error is None:
+                try:
+                    chunk.append(ProductImportRow.model_validate(record).model_dump())
+                except ValidationError as e:
+                    error = "; ".join(
+                        f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+                    )
+            
+            if error is not None:
+                report.failed += 1
+                if len(report.errors) < MAX_REPORTED_ERRORS:
+                    report.errors.append({"line": line_no, "error": error})
+            
+            if len(chunk) >= chunk_size:
+                written = await ProductImportService.write_chunk(db, chunk, upsert)
+                report.written += written
+                report.skipped += len(chunk) - written
+                report.chunks += 1
+                chunk = []
+        
+        if chunk:
+            written = await ProductImportService.write_chunk(db, chunk, upsert)
+            report.written += written
+            report.skipped += len(chunk) - written
+            report.chunks += 1
+        
+        report.elapsed_seconds = time.perf_counter() - started
+        
+        if report.written:
+            await catalog.reload()
+        
+        return report
+    
+    @staticmethod
+    async def write_chunk(
+        db: AsyncSession,
+        rows: List[Dict[str, Any]],
+        upsert: bool = True
+    ) -> int:
+        """
+        Write one validated chunk with executemany in its own transaction.
+        
+        Returns the number of rows inserted or updated; with upsert off,
+        rows whose SKU already exists are skipped and not counted.
+        """
+        now = datetime.utcnow()
+        for row in rows:
+            row["created_at"] = now
+            row["updated_at"] = now
+        
+        keyed = [row for row in rows if row["sku"] is not None]
+        plain = [row for row in rows if row["sku"] is None]
+        
+        async def work(session: AsyncSession) -> int:
+            return await ProductImportService._execute_chunk(session, keyed, plain, upsert)
+        
+        return await run_write(db, work)
+    
+    @staticmethod
+    async def _execute_chunk(
+        db: AsyncSession,
+        keyed: List[Dict[str, Any]],
+        plain: List[Dict[str, Any]],
+        upsert: bool
+    ) -> int:
+        # executemany's rowcount sums the rows each execution changed, so
+        # ON CONFLICT DO NOTHING skips count 0 (trigger writes never count)
+        written = 0
+        if keyed:
+            stmt = sqlite_insert(_products)
+            if upsert:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=[_products.c.sku],
+                    set_={
+                        **{name: stmt.excluded[name] for name in _UPSERT_COLUMNS},
+                        "updated_at": stmt.excluded.updated_at,
+                    },
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=[_products.c.sku])
+            result = await db.execute(stmt, keyed)
+            written += result.rowcount
+        
+        if plain:
+            result = await db.execute(_products.insert(), plain)
+            written += result.rowcount
+        return written
@@ -0,0 +1,66 @@
+"""
+Customer notifications, sent from outbox handlers after the triggering
+transaction commits.
+
+There is no mail provider yet: EMAIL_BACKEND "console" prints messages and
+"null" discards them. Handlers may run more than once for an event (at-
+least-once delivery), which is acceptable for these messages.
+"""
+from typing import Any, Dict
+from app.core.config import settings
+from app.core.session import ReadSessionLocal
+from app.db.models.order import Order
+from app.db.models.user import User
+from app.services.outbox import outbox
+
+
+class NotificationService:
+    sent = 0
+
+    @staticmethod
+    async def send_email(to: str, subject: str, body: str) -> None:
+        """Deliver an email through the configured backend."""
+        if settings.EMAIL_BACKEND == "console":
+            print(f"📧 To: {to} | {subject}\n{body}")
+        NotificationService.sent += 1
+
+    @staticmethod
+    async def get_recipient(user_id: int) -> User:
+        async with ReadSessionLocal() as db:
+            user = await db.get(User, user_id)
+        if user is None:
+            raise LookupError(f"User {user_id} not found")
+        return user
+
+
+@outbox.handler("user.registered")
+async def send_welcome_email(payload: Dict[str, Any]) -> None:
+    await NotificationService.send_email(
+        payload["email"],
+        f"Welcome to {settings.APP_NAME}",
+        f"Hi {payload.get('full_name') or 'there'}, thanks for creating an account."
+    )
+
+
+@outbox.handler("order.placed")
+async def send_order_confirmation(payload: Dict[str, Any]) -> None:
+    user = await NotificationService.get_recipient(payload["user_id"])
+    await NotificationService.send_email(
+        user.email,
+        f"Order #{payload['order_id']} confirmed",
+        f"We received your order #{payload['order_id']} for {payload['total']:.2f}."
+    )
+
+
+@outbox.handler("payment.captured")
+async def send_payment_receipt(payload: Dict[str, Any]) -> None:
+    async with ReadSessionLocal() as db:
+        order = await db.get(Order, payload["order_id"])
+    if order is None:
+        raise LookupError(f"Order {payload['order_id']} not found")
+    user = await NotificationService.get_recipient(order.user_id)
+    await NotificationService.send_email(
+        user.email,
+        f"Receipt for order #{order.id}",
+        f"Payment {payload['gateway_ref']} of {payload['amount']:.2f} {payload['currency']} received."
+    )
@@ -0,0 +1,120 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from app.core.session import run_write
+from app.db.models.order import Order, OrderItem
+from app.db.models.product import Product
+from app.services.catalog_snapshot import catalog
+from app.services.outbox import enqueue
+
+
+class OrderError(Exception):
+    """Base class for order placement failures."""
+
+
+class ProductNotFoundError(OrderError):
+    def __init__(self, product_id: int):
+        self.product_id = product_id
+        super().__init__(f"Product {product_id} not found")
+
+
+class InsufficientStockError(OrderError):
+    def __init__(self, product_id: int, available: int):
+        self.product_id = product_id
+        self.available = available
+        super().__init__(f"Insufficient stock for product {product_id}")
+
+
+class OrderService:
+    @staticmethod
+    def normalize_lines(lines: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Merge duplicate products and sort by product id."""
+        quantities: Dict[int, int] = {}
+        for product_id, quantity in lines:
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        return sorted(quantities.items())
+    
+    @staticmethod
+    async def reserve_stock(db: AsyncSession, product_id: int, quantity: int) -> float:
+        """
+        Atomically take `quantity` units of a product and return its price.
+        
+        A single conditional UPDATE (stock >= quantity) both checks and
+        decrements, so concurrent checkouts can never oversell and no row is
+        read-then-written. Raises if the product is missing or short.
+        """
+        result = await db.execute(
+            update(Product)
+            .where(Product.id == product_id, Product.stock >= quantity)
+            .values(stock=Product.stock - quantity)
+            .returning(Product.price)
+            .execution_options(synchronize_session=False)
+        )
+        price = result.scalar_one_or_none()
+        
+        if price is None:
+            available = await db.scalar(select(Product.stock).where(Product.id == product_id))
+            if available is None:
+                raise ProductNotFoundError(product_id)
+            raise InsufficientStockError(product_id, available)
+        
+        return price
+    
+    @staticmethod
+    async def place_order(
+        db: AsyncSession,
+        user_id: int,
+        lines: Iterable[Tuple[int, int]]
+    ) -> Order:
+        """
+        Place an order for (product_id, quantity) lines in one transaction.
+        
+        Either every line's stock is decremented and the order is recorded,
+        or nothing is (raises OrderError).
+        """
+        lines = OrderService.normalize_lines(lines)
+        
+        async def work(session: AsyncSession) -> Order:
+            items = []
+            total = 0.0
+            # Fixed product order keeps lock acquisition consistent
+            for product_id, quantity in lines:
+                price = await OrderService.reserve_stock(session, product_id, quantity)
+                items.append(OrderItem(product_id=product_id, quantity=quantity, unit_price=price))
+                total += price * quantity
+            
+            order = Order(user_id=user_id, status="placed", total=round(total, 2), items=items)
+            session.add(order)
+            await session.flush()
+            enqueue(session, "order.placed", {"order_id": order.id, "user_id": user_id, "total": order.total})
+            return order
+        
+        order = await run_write(db, work)
+        catalog.request_reload()
+        
+        return order
+    
+    @staticmethod
+    async def get_orders_for_user(
+        db: AsyncSession,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 50
+    ) -> List[Order]:
+        """Get a user's orders, newest first."""
+        result = await db.execute(
+            select(Order)
+            .where(Order.user_id == user_id)
+            .order_by(Order.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return result.scalars().all()
+    
+    @staticmethod
+    async def get_order(db: AsyncSession, user_id: int, order_id: int) -> Optional[Order]:
+        """Get one of a user's orders by ID."""
+        result = await db.execute(
+            select(Order).where(Order.id == order_id, Order.user_id == user_id)
+        )
+        return result.scalar_one_or_none()
@@ -0,0 +1,267 @@
+"""
+Transactional outbox.
+
+Side effects (emails, reconciliation, index updates) are recorded with
+`enqueue(session, topic, payload)` inside the same transaction as the
+business change, so they commit or roll back together and the request
+never waits on them. A pool of background workers then runs the handler
+registered for each topic:
+
+- Claim: one UPDATE .. RETURNING takes up to OUTBOX_BATCH_SIZE due events
+  and pushes their `available_at` out by the lease. A worker that dies
+  mid-batch simply lets the lease run out and the events become due again,
+  so nothing is lost (handlers must tolerate running twice).
+- Ack: handled events are deleted in one statement; failed ones are
+  rescheduled with exponential backoff and jitter, and parked as "dead"
+  after OUTBOX_MAX_ATTEMPTS.
+
+Idle workers check for due events every OUTBOX_POLL_INTERVAL_SECONDS with
+a read-only query (claiming needs the write lock, so it only happens when
+something is due) and are woken right after any commit that enqueued
+events.
+"""
+import asyncio
+import json
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal, ReadSessionLocal, run_write
+from app.db.models.outbox import OutboxEvent
+
+Handler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+# Set on a session that enqueued events; its commit wakes the workers
+_ENQUEUED = "outbox_enqueued"
+
+
+def enqueue(session: AsyncSession, topic: str, payload: Dict[str, Any]) -> None:
+    """Record a side effect in the session's transaction (does not flush)."""
+    session.add(OutboxEvent(topic=topic, payload=json.dumps(payload), available_at=datetime.utcnow()))
+    session.info[_ENQUEUED] = True
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        read_session_factory: async_sessionmaker,
+        workers: int = 2,
+        batch_size: int = 50,
+        lease_seconds: float = 60.0,
+        handler_timeout: float = 30.0,
+        max_attempts: int = 8,
+        retry_base: float = 2.0,
+        retry_max: float = 600.0,
+        poll_interval: float = 1.0
+    ):
+        self.session_factory = session_factory
+        self.read_session_factory = read_session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.lease = timedelta(seconds=lease_seconds)
+        self.handler_timeout = handler_timeout
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.poll_interval = poll_interval
+        self._handlers: Dict[str, Handler] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+    
+        self.claimed = 0
+        self.succeeded = 0
+        self.retried = 0
+        self.dead = 0
+    
+    def handler(self, topic: str) -> Callable[[Handler], Handler]:
+        """Decorator registering the handler for a topic."""
+        def register(func: Handler) -> Handler:
+            self._handlers[topic] = func
+            return func
+        return register
+    
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+    
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker(f"worker-{n}")) for n in range(self.workers)]
+    
+    async def stop(self, timeout: float = 5.0) -> None:
+        """
+        Let workers finish their current batch, then stop them.
+    
+        Workers still busy after `timeout` are cancelled; their claimed
+        events become due again when the lease runs out.
+        """
+        if not self._tasks:
+            return
+        self._stopping = True
+        self.notify()
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+    
+    def notify(self) -> None:
+        """Wake idle workers (called after a commit that enqueued events)."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
+    async def _worker(self, name: str) -> None:
+        while not self._stopping:
+            try:
+                if await self._has_due():
+                    events = await self._claim(f"{name}:{uuid.uuid4().hex[:12]}")
+                    if events:
+                        await self._process(events)
+                        continue
+            except Exception as e:
+                print(f"⚠️ Outbox {name} failed: {e}")
+    
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+    
+    def _due(self, now: datetime):
+        return select(OutboxEvent.id).where(OutboxEvent.status == "pending", OutboxEvent.available_at <= now)
+    
+    async def _has_due(self) -> bool:
+        async with self.read_session_factory() as session:
+            return await session.scalar(self._due(datetime.utcnow()).limit(1)) is not None
+    
+    async def _claim(self, token: str) -> List[dict]:
+        """Lease up to batch_size due events to `token`."""
+        async def work(session: AsyncSession) -> List[dict]:
+            now = datetime.utcnow()
+            due = (
+                self._due(now)
+                .order_by(OutboxEvent.available_at, OutboxEvent.id)
+                .limit(self.batch_size)
+                .scalar_subquery()
+            )
+            result = await session.execute(
+                update(OutboxEvent)
+                .where(OutboxEvent.id.in_(due))
+                .values(
+                    available_at=now + self.lease,
+                    claimed_by=token,
+                    attempts=OutboxEvent.attempts + 1,
+                    updated_at=now
+                )
+                .returning(OutboxEvent.id, OutboxEvent.topic, OutboxEvent.payload, OutboxEvent.attempts)
+                .execution_options(synchronize_session=False)
+            )
+            return [{**row._mapping, "token": token} for row in result]
+    
+        async with self.session_factory() as session:
+            events = await run_write(session, work)
+        self.claimed += len(events)
+        return events
+    
+    async def _run_handler(self, outbox_event: dict) -> Optional[str]:
+        """Run one event's handler; returns an error message on failure."""
+        handler = self._handlers.get(outbox_event["topic"])
+        if handler is None:
+            return f"No handler for topic {outbox_event['topic']!r}"
+        try:
+            await asyncio.wait_for(handler(json.loads(outbox_event["payload"])), self.handler_timeout)
+        except asyncio.TimeoutError:
+            return f"Timed out after {self.handler_timeout}s"
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        return None
+    
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+    
+    async def _process(self, events: List[dict]) -> None:
+        errors = await asyncio.gather(*(self._run_handler(e) for e in events))
+        token = events[0]["token"]
+        done = [e["id"] for e, error in zip(events, errors) if error is None]
+        failed = [(e, error) for e, error in zip(events, errors) if error is not None]
+    
+        async def work(session: AsyncSession) -> None:
+            # Only ack events still leased to this batch
+            if done:
+                await session.execute(
+                    delete(OutboxEvent)
+                    .where(OutboxEvent.id.in_(done), OutboxEvent.claimed_by == token)
+                    .execution_options(synchronize_session=False)
+                )
+            now = datetime.utcnow()
+            for outbox_event, error in failed:
+                exhausted = outbox_event["attempts"] >= self.max_attempts
+                await session.execute(
+                    update(OutboxEvent)
+                    .where(OutboxEvent.id == outbox_event["id"], OutboxEvent.claimed_by == token)
+                    .values(
+                        status="dead" if exhausted else "pending",
+                        available_at=now + timedelta(seconds=self._backoff(outbox_event["attempts"])),
+                        claimed_by=None,
+                        last_error=error,
+                        updated_at=now
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+    
+        async with self.session_factory() as session:
+            await run_write(session, work)
+    
+        self.succeeded += len(done)
+        for outbox_event, error in failed:
+            if outbox_event["attempts"] >= self.max_attempts:
+                self.dead += 1
+                print(f"⚠️ Outbox event {outbox_event['id']} ({outbox_event['topic']}) is dead: {error}")
+            else:
+                self.retried += 1
+    
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "workers": len(self._tasks),
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "retried": self.retried,
+            "dead": self.dead,
+        }
+
+
+outbox = OutboxDispatcher(
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    workers=settings.OUTBOX_WORKERS,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    lease_seconds=settings.OUTBOX_LEASE_SECONDS,
+    handler_timeout=settings.OUTBOX_HANDLER_TIMEOUT_SECONDS,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS,
+    retry_base=settings.OUTBOX_RETRY_BASE_SECONDS,
+    retry_max=settings.OUTBOX_RETRY_MAX_SECONDS,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL_SECONDS,
+)
+
+
+@event.listens_for(Session, "after_commit")
+def _wake_outbox(session: Session) -> None:
+    if session.info.pop(_ENQUEUED, False):
+        outbox.notify()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_outbox_flag(session: Session) -> None:
+    session.info.pop(_ENQUEUED, None)
@@ -0,0 +1,82 @@
+"""
+Local stand-in for a hosted payment gateway.
+
+Issues payment references, hosts the checkout page (app.ui.payment) and,
+when a checkout completes, sends signed webhook events back to
+PAYMENT_WEBHOOK_URL the way a real gateway would: asynchronously, each
+event retried with backoff until it is acknowledged with a 2xx.
+"""
+import asyncio
+import secrets
+import time
+from typing import Dict, List, Set
+import orjson
+from app.core.config import settings
+from app.utils.webhooks import sign_payload
+
+SIGNATURE_HEADER = "X-Gateway-Signature"
+
+
+class LocalGateway:
+    def __init__(self, secret: str, webhook_url: str, max_attempts: int = 5):
+        self.secret = secret
+        self.webhook_url = webhook_url
+        self.max_attempts = max_attempts
+        self._deliveries: Set[asyncio.Task] = set()
+    
+    @staticmethod
+    def new_reference() -> str:
+        return f"pay_{secrets.token_hex(12)}"
+    
+    @staticmethod
+    def checkout_url(gateway_ref: str) -> str:
+        return f"/ui/payment/checkout/{gateway_ref}"
+    
+    @staticmethod
+    def build_event(gateway_ref: str, event_type: str, sequence: int) -> Dict:
+        return {
+            "id": f"evt_{secrets.token_hex(12)}",
+            "type": event_type,
+            "payment_id": gateway_ref,
+            "sequence": sequence,
+            "created": int(time.time()),
+        }
+    
+    def events_for(self, gateway_ref: str, succeed: bool) -> List[Dict]:
+        """The events a checkout outcome produces, in gateway order."""
+        if succeed:
+            return [
+                self.build_event(gateway_ref, "payment.authorized", 1),
+                self.build_event(gateway_ref, "payment.captured", 2),
+            ]
+        return [self.build_event(gateway_ref, "payment.failed", 1)]
+    
+    def sign(self, body: bytes) -> Dict[str, str]:
+        return {SIGNATURE_HEADER: sign_payload(self.secret, body), "Content-Type": "application/json"}
+    
+    async def deliver(self, events: List[Dict]) -> None:
+        """POST each event to the webhook URL, retrying until acknowledged."""
+        import httpx
+    
+        async with httpx.AsyncClient(timeout=5) as client:
+            for event in events:
+                body = orjson.dumps(event)
+                for attempt in range(self.max_attempts):
+                    try:
+                        response = await client.post(self.webhook_url, content=body, headers=self.sign(body))
+                        if response.is_success:
+                            break
+                    except httpx.HTTPError:
+                        pass
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+                else:
+                    print(f"⚠️ Gateway gave up delivering {event['id']} to {self.webhook_url}")
+    
+    def complete(self, gateway_ref: str, succeed: bool) -> None:
+        """Finish a checkout: send its webhook events in the background."""
+        task = asyncio.get_running_loop().create_task(self.deliver(self.events_for(gateway_ref, succeed)))
+        self._deliveries.add(task)
+        task.add_done_callback(self._deliveries.discard)
+
+
+gateway = LocalGateway(settings.PAYMENT_WEBHOOK_SECRET, settings.PAYMENT_WEBHOOK_URL)
@@ -0,0 +1,465 @@
+"""
+Payments and gateway webhook processing.
+
+Webhook requests only verify the signature, drop events already seen (an
+in-memory set of recent event ids) and enqueue the rest, so gateway
+retries are acknowledged in microseconds and never wait on the database.
+PaymentEventWorker drains the queue in batches: one transaction per batch
+records the events (the unique event_id index drops duplicates the
+in-memory set missed, e.g. across workers or restarts) and applies the
+new ones to their payments.
+
+Payment status only moves forward through TRANSITIONS, so redelivered or
+out-of-order events can never undo a capture or capture twice.
+"""
+import asyncio
+import json
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy import select, update, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app.core.config import settings
+from app.core.session import AsyncSessionLocal, run_write
+from app.db.models.order import Order
+from app.db.models.payment import Payment, PaymentEvent
+from app.services.order_service import OrderService
+from app.services.payment_gateway import gateway
+from app.services.outbox import enqueue
+from app.utils.lru import LRUCache
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+class GatewayEvent(NamedTuple):
+    event_id: str
+    event_type: str
+    gateway_ref: str
+    sequence: int
+
+
+class PaymentError(Exception):
+    """Base class for payment failures."""
+
+
+class OrderNotFoundError(PaymentError):
+    def __init__(self, order_id: int):
+        self.order_id = order_id
+        super().__init__(f"Order {order_id} not found")
+
+
+class OrderNotPayableError(PaymentError):
+    def __init__(self, order_id: int, status: str):
+        self.order_id = order_id
+        self.status = status
+        super().__init__(f"Order {order_id} is {status}")
+
+
+class PaymentQueueFullError(PaymentError):
+    """Raised when the webhook event queue is full (the gateway retries)."""
+
+
+# Gateway event type -> payment status it moves to
+EVENT_STATUS = {
+    "payment.authorized": "authorized",
+    "payment.captured": "captured",
+    "payment.failed": "failed",
+    "payment.refunded": "refunded",
+}
+
+# Status -> statuses it may move to. Nothing moves backwards, so a late
+# "authorized" after "captured" is ignored; a refund implies the capture.
+TRANSITIONS = {
+    "pending": {"authorized", "captured", "failed", "refunded"},
+    "authorized": {"captured", "failed", "refunded"},
+    "captured": {"refunded"},
+    "failed": set(),
+    "refunded": set(),
+}
+
+OPEN_STATUSES = ("pending", "authorized")
+
+# Order status set when its payment reaches a status
+ORDER_STATUS = {"captured": "paid", "refunded": "refunded"}
+
+
+class PaymentService:
+    @staticmethod
+    async def create_payment(db: AsyncSession, user_id: int, order_id: int) -> Payment:
+        """
+        Start (or resume) paying one of the user's placed orders.
+    
+        An order has at most one open payment; asking again returns it.
+        """
+        order = await OrderService.get_order(db, user_id, order_id)
+        if order is None:
+            raise OrderNotFoundError(order_id)
+        if order.status != "placed":
+            raise OrderNotPayableError(order_id, order.status)
+    
+        async def find_open(session: AsyncSession) -> Optional[Payment]:
+            return await session.scalar(
+                select(Payment).where(Payment.order_id == order_id, Payment.status.in_(OPEN_STATUSES))
+            )
+    
+        async def work(session: AsyncSession) -> Payment:
+            payment = await find_open(session)
+            if payment is None:
+                payment = Payment(
+                    order_id=order_id,
+                    user_id=user_id,
+                    gateway_ref=gateway.new_reference(),
+                    amount=order.total,
+                    currency=settings.PAYMENT_CURRENCY,
+                    status="pending",
+                    last_sequence=0,
+                )
+                session.add(payment)
+                await session.flush()
+            return payment
+    
+        try:
+            return await run_write(db, work)
+        except IntegrityError:
+            # A concurrent request opened one first (unique open-payment index)
+            payment = await find_open(db)
+            if payment is None:
+                raise OrderNotPayableError(order_id, "already paid")
+            return payment
+    
+    @staticmethod
+    async def get_payment(
+        db: AsyncSession,
+        gateway_ref: str,
+        user_id: Optional[int] = None
+    ) -> Optional[Payment]:
+        """Get a payment by gateway reference (optionally only the user's)."""
+        query = select(Payment).where(Payment.gateway_ref == gateway_ref)
+        if user_id is not None:
+            query = query.where(Payment.user_id == user_id)
+        return await db.scalar(query)
+    
+    @staticmethod
+    async def apply_events(session: AsyncSession, events: List[GatewayEvent]) -> Dict[str, int]:
+        """
+        Record a batch of webhook events and apply the new ones.
+    
+        Statement count is independent of the batch size apart from one
+        conditional UPDATE per payment that changes. Must not commit.
+        """
+        now = datetime.utcnow()
+        unique = {event.event_id: event for event in events}
+    
+        # Recording first also takes SQLite's write lock, so the statuses
+        # read below cannot change before this transaction commits
+        inserted = await session.execute(
+            sqlite_insert(PaymentEvent)
+            .values([
+                {
+                    "event_id": event.event_id,
+                    "gateway_ref": event.gateway_ref,
+                    "event_type": event.event_type,
+                    "sequence": event.sequence,
+                    "applied": False,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for event in unique.values()
+            ])
+            .on_conflict_do_nothing(index_elements=[PaymentEvent.event_id])
+            .returning(PaymentEvent.event_id)
+        )
+        new_events = [unique[event_id] for event_id in inserted.scalars()]
+        counts = {"new": len(new_events), "applied": 0, "stale": 0, "unknown": 0, "conflicts": 0}
+        if not new_events:
+            return counts
+    
+        rows = await session.execute(
+            select(
+                Payment.id, Payment.gateway_ref, Payment.order_id, Payment.status,
+                Payment.last_sequence, Payment.amount, Payment.currency
+            )
+            .where(Payment.gateway_ref.in_({event.gateway_ref for event in new_events}))
+        )
+        payments = {row.gateway_ref: dict(row._mapping) for row in rows}
+    
+        applied_ids = []
+        order_status: Dict[int, str] = {}
+        for event in sorted(new_events, key=lambda e: (e.gateway_ref, e.sequence)):
+            payment = payments.get(event.gateway_ref)
+            target = EVENT_STATUS.get(event.event_type)
+            if payment is None:
+                counts["unknown"] += 1
+                continue
+            if target not in TRANSITIONS[payment["status"]]:
+                counts["stale"] += 1
+                continue
+    
+            # Compare-and-set on the status read above
+            values = {"status": target, "last_sequence": max(payment["last_sequence"], event.sequence), "updated_at": now}
+            if target in ("captured", "refunded"):
+                values["captured_at"] = func.coalesce(Payment.captured_at, now)
+            result = await session.execute(
+                update(Payment)
+                .where(Payment.id == payment["id"], Payment.status == payment["status"])
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount != 1:
+                counts["conflicts"] += 1
+                continue
+    
+            payment.update(status=target, last_sequence=values["last_sequence"])
+            applied_ids.append(event.event_id)
+            if target in ORDER_STATUS:
+                order_status[payment["order_id"]] = ORDER_STATUS[target]
+            if target == "captured":
+                enqueue(session, "payment.captured", {
+                    "gateway_ref": event.gateway_ref,
+                    "order_id": payment["order_id"],
+                    "amount": payment["amount"],
+                    "currency": payment["currency"],
+                })
+    
+        if applied_ids:
+            await session.execute(
+                update(PaymentEvent)
+                .where(PaymentEvent.event_id.in_(applied_ids))
+                .values(applied=True)
+                .execution_options(synchronize_session=False)
+            )
+        # One UPDATE per final status; an order captured and refunded in
+        # the same batch ends up refunded
+        order_updates: Dict[str, List[int]] = {}
+        for order_id, status in order_status.items():
+            order_updates.setdefault(status, []).append(order_id)
+        for status, order_ids in order_updates.items():
+            await session.execute(
+                update(Order)
+                .where(Order.id.in_(order_ids))
+                .values(status=status, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+    
+        counts["applied"] = len(applied_ids)
+        return counts
+
+
+class PaymentEventWorker:
+    """
+    Background task that persists acknowledged webhook events in batches.
+    
+    Events are acknowledged before they are durable, so a failed batch must
+    not lose them:
+    
+    - Transient errors (OperationalError: the database is locked or
+      unreachable) are retried with capped exponential backoff, up to
+      max_attempts. Meanwhile the queue fills and webhooks get 503s, so the
+      gateway holds on to newer events.
+    - Any other error means some event in the batch cannot be applied. The
+      batch is split in halves and each half retried, so the good events
+      commit and the bad ones are isolated.
+    
+    Events that still fail are appended to the dead-letter file (JSON lines,
+    readable even when the database is down) and dropped from the dedup
+    set, so a redelivery is accepted again. stop() drains the queue for at
+    most stop_timeout seconds, then dead-letters whatever is left.
+    """
+    
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        max_batch: int = 256,
+        batch_window: float = 0.02,
+        queue_size: int = 10000,
+        dedup_size: int = 100000,
+        retry_base: float = 0.5,
+        retry_max: float = 30.0,
+        max_attempts: int = 5,
+        stop_timeout: float = 10.0,
+        dead_letter_path: Optional[Path] = None
+    ):
+        self.session_factory = session_factory
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.queue_size = queue_size
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.max_attempts = max_attempts
+        self.stop_timeout = stop_timeout
+        self.dead_letter_path = dead_letter_path
+        self._seen = LRUCache(maxsize=dedup_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._batch: List[GatewayEvent] = []
+    
+        self.totals = {
+            "accepted": 0, "duplicates": 0, "rejected": 0, "batches": 0, "failed_batches": 0, "retries": 0,
+            "dead_letters": 0, "new": 0, "applied": 0, "stale": 0, "unknown": 0, "conflicts": 0,
+        }
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+    
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def drain(self) -> None:
+        """Wait until every queued event has been persisted."""
+        if self.running:
+            await self._queue.join()
+    
+    async def stop(self) -> None:
+        """Persist queued events (for at most stop_timeout), then stop the worker task."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self.drain(), self.stop_timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+    
+        # Whatever could not be persisted in time: the batch in progress
+        # (parts of it may have committed; replays are idempotent) and the
+        # rest of the queue
+        left = list(self._batch)
+        while not self._queue.empty():
+            left.append(self._queue.get_nowait())
+            self._queue.task_done()
+        self._batch = []
+        if left:
+            await self._dead_letter(left, f"not persisted within {self.stop_timeout}s of shutdown")
+    
+    def forget_seen(self) -> None:
+        """Clear the in-memory dedup set (the unique index still applies)."""
+        self._seen.clear()
+    
+    def offer(self, event: GatewayEvent) -> bool:
+        """
+        Queue an event for persistence without waiting.
+    
+        Returns False for an event seen recently; raises
+        PaymentQueueFullError when the queue is full or not running.
+        """
+        if self._seen.get(event.event_id) is not None:
+            self.totals["duplicates"] += 1
+            return False
+        if not self.running or self._queue.full():
+            self.totals["rejected"] += 1
+            raise PaymentQueueFullError("Payment event queue is full")
+    
+        self._queue.put_nowait(event)
+        self._seen.set(event.event_id, True)
+        self.totals["accepted"] += 1
+        return True
+    
+    async def _run(self) -> None:
+        while True:
+            self._batch = [await self._queue.get()]
+    
+            # Let a burst of deliveries share one transaction
+            if self.batch_window:
+                await asyncio.sleep(self.batch_window)
+            while len(self._batch) < self.max_batch and not self._queue.empty():
+                self._batch.append(self._queue.get_nowait())
+    
+            batch = self._batch
+            try:
+                await self._persist(batch)
+                self._batch = []
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+    
+    async def _persist(self, batch: List[GatewayEvent]) -> None:
+        """Apply a batch; retry transient failures, isolate bad events."""
+        attempts = 0
+        while True:
+            try:
+                async with self.session_factory() as session:
+                    counts = await run_write(session, lambda s: PaymentService.apply_events(s, batch))
+            except OperationalError as e:
+                attempts += 1
+                if attempts == 1:
+                    self.totals["failed_batches"] += 1
+                if attempts >= self.max_attempts:
+                    await self._dead_letter(batch, f"{type(e).__name__}: {e}")
+                    return
+                self.totals["retries"] += 1
+                delay = self._backoff(attempts)
+                print(f"⚠️ Payment event batch of {len(batch)} failed (attempt {attempts}), retrying in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+                continue
+            except Exception as e:
+                self.totals["failed_batches"] += 1
+                if len(batch) == 1:
+                    await self._dead_letter(batch, f"{type(e).__name__}: {e}")
+                    return
+                middle = len(batch) // 2
+                await self._persist(batch[:middle])
+                await self._persist(batch[middle:])
+                return
+    
+            self.totals["batches"] += 1
+            for name, value in counts.items():
+                self.totals[name] += value
+            return
+    
+    async def _dead_letter(self, events: List[GatewayEvent], error: str) -> None:
+        self.totals["dead_letters"] += len(events)
+        for event in events:
+            self._seen.pop(event.event_id)
+        print(f"❌ {len(events)} payment events dead-lettered: {error}")
+        if self.dead_letter_path is None:
+            return
+    
+        failed_at = datetime.utcnow().isoformat()
+        lines = "".join(
+            json.dumps({**event._asdict(), "error": error, "failed_at": failed_at}) + "\n"
+            for event in events
+        )
+    
+        def append() -> None:
+            self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.dead_letter_path, "a") as handle:
+                handle.write(lines)
+    
+        await asyncio.to_thread(append)
+    
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "dedup_size": self._seen.stats()["size"],
+            **self.totals,
+        }
+
+
+payment_worker = PaymentEventWorker(
+    AsyncSessionLocal,
+    max_batch=settings.PAYMENT_EVENT_BATCH_SIZE,
+    batch_window=settings.PAYMENT_EVENT_BATCH_WINDOW_MS / 1000,
+    queue_size=settings.PAYMENT_EVENT_QUEUE_SIZE,
+    dedup_size=settings.PAYMENT_DEDUP_CACHE_SIZE,
+    retry_base=settings.PAYMENT_EVENT_RETRY_BASE_SECONDS,
+    retry_max=settings.PAYMENT_EVENT_RETRY_MAX_SECONDS,
+    max_attempts=settings.PAYMENT_EVENT_MAX_ATTEMPTS,
+    stop_timeout=settings.PAYMENT_EVENT_STOP_TIMEOUT_SECONDS,
+    dead_letter_path=BACKEND_DIR / settings.PAYMENT_DEAD_LETTER_FILE,
+)
@@ -0,0 +1,58 @@
+"""
+Pre-serialized product JSON.
+
+Product rows come from our own database (or the catalog snapshot built from
+it), so re-validating each one through ProductResponse and re-encoding it
+with the standard JSON encoder is wasted work on hot list endpoints. Each
+product is instead encoded once with orjson into a bytes fragment cached by
+(id, updated_at), and list responses are assembled by joining fragments.
+
+Any write bumps updated_at, so a changed product simply misses the cache;
+stale fragments age out of the LRU. Fragments must stay byte-compatible with
+ProductResponse, which remains the documented response_model.
+"""
+from typing import Iterable, List
+import orjson
+from fastapi import Response
+from app.core.config import settings
+from app.utils.lru import LRUCache
+
+# Same fields, in the same order, as ProductResponse
+PRODUCT_FIELDS = (
+    "id", "sku", "name", "description", "price", "stock", "image_url", "category", "created_at",
+)
+
+fragment_cache = LRUCache(maxsize=settings.PRODUCT_FRAGMENT_CACHE_SIZE)
+
+
+def product_fragment(product) -> bytes:
+    """Return the cached JSON encoding of a Product row or ProductRecord."""
+    key = (product.id, product.updated_at)
+    fragment = fragment_cache.get(key)
+    if fragment is None:
+        data = {field: getattr(product, field) for field in PRODUCT_FIELDS}
+        data["price"] = float(data["price"])
+        fragment = orjson.dumps(data)
+        fragment_cache.set(key, fragment)
+    return fragment
+
+
+def product_list_json(products: Iterable) -> bytes:
+    return b"[" + b",".join(product_fragment(product) for product in products) + b"]"
+
+
+def product_batch_json(products: Iterable, missing: List[int]) -> bytes:
+    return b'{"products":' + product_list_json(products) + b',"missing":' + orjson.dumps(missing) + b"}"
+
+
+def json_bytes_response(body: bytes, response: Response, status_code: int = 200) -> Response:
+    """
+    Wrap pre-encoded JSON in a Response, keeping headers (ETag, cursors)
+    already set on the endpoint's injected `response`.
+    """
+    return Response(
+        content=body,
+        status_code=status_code,
+        media_type="application/json",
+        headers=dict(response.headers),
+    )
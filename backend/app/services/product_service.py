@@ -1,33 +1,349 @@
-from typing import List, Optional
+import re
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, literal_column, and_, or_, tuple_
+from sqlalchemy.engine import Row
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.expression import UnaryExpression
+from sqlalchemy.sql.operators import custom_op
+from app.core.config import settings
+from app.core.session import ReadSessionLocal, run_write
 from app.db.models.product import Product
+from app.db.models.category_facet import CategoryFacet
+from app.db.fts import products_fts, BM25_WEIGHTS
+from app.services.catalog_snapshot import catalog
+from app.utils.single_flight import SingleFlight
+
+EXPORT_COLUMNS = (
+    "id", "sku", "name", "description", "price", "stock",
+    "image_url", "category", "created_at", "updated_at",
+)
+
+# Listing sorts: name -> (Product attribute, descending). Ties break on id,
+# so (value, id) is the keyset position; "id" sorts by id alone.
+PRODUCT_SORTS = {
+    "id": (None, False),
+    "price": ("price", False),
+    "newest": ("created_at", True),
+    "name": ("name", False),
+}
+
+
+# Concurrent identical catalog reads (a campaign burst on one product or
+# category page) share one DB query and its result. A follower can get a
+# result whose query started just before a write committed, so this is
+# only used for reads that are allowed to lag by one query's duration.
+read_flights = SingleFlight(max_wait=settings.SINGLE_FLIGHT_MAX_WAIT_SECONDS)
+
+
+def _unindexed(column):
+    """`+column`: the same value, but SQLite won't pick an index on it."""
+    return UnaryExpression(column, operator=custom_op("+"), type_=column.type)
+
+
+async def _coalesced(key: tuple, query: Callable[[], Awaitable[Any]]) -> Any:
+    """Run a read through read_flights (the result is shared: don't mutate it)."""
+    if not settings.SINGLE_FLIGHT_ENABLED:
+        return await query()
+    return await read_flights.do(key, query)
 
 
 class ProductService:
+    @staticmethod
+    def build_list_query(
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock: Optional[bool] = None,
+        sort: str = "id",
+        after_id: Optional[int] = None,
+        after_key: Any = None
+    ) -> Select:
+        """
+        Build the filtered, sorted product listing (without skip/limit).
+        
+        Each combination walks one index in sort order: (category, sort
+        column) or (sort column), with id as the tiebreak SQLite keeps in
+        every index. Other filters are checked on the rows walked. Price
+        bounds use the price index only when sorting by price; otherwise
+        they are written as `+price` so SQLite doesn't swap the ordered walk
+        for a price range scan plus a temp B-tree sort.
+        scripts/check_query_plans.py asserts this for every combination.
+        """
+        attribute, descending = PRODUCT_SORTS[sort]
+        price = Product.price if sort == "price" else _unindexed(Product.price)
+        query = select(Product)
+        
+        if category:
+            query = query.where(Product.category == category)
+        if min_price is not None:
+            query = query.where(price >= min_price)
+        if max_price is not None:
+            query = query.where(price <= max_price)
+        if in_stock is not None:
+            query = query.where(Product.stock > 0 if in_stock else Product.stock <= 0)
+        
+        if attribute is None:
+            if after_id is not None:
+                query = query.where(Product.id > after_id)
+            return query.order_by(Product.id)
+        
+        column = getattr(Product, attribute)
+        if after_id is not None:
+            position = tuple_(column, Product.id)
+            after = tuple_(after_key, after_id)
+            query = query.where(position < after if descending else position > after)
+        if descending:
+            return query.order_by(column.desc(), Product.id.desc())
+        return query.order_by(column, Product.id)
+    
     @staticmethod
     async def get_all_products(
         db: AsyncSession, 
         skip: int = 0, 
         limit: int = 100,
-        category: Optional[str] = None
+        category: Optional[str] = None,
+        after_id: Optional[int] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        in_stock: Optional[bool] = None,
+        sort: str = "id",
+        after_key: Any = None
     ) -> List[Product]:
-        """Get all products with optional filtering."""
-        query = select(Product)
+        """
+        Get products with optional filtering, in `sort` order (PRODUCT_SORTS).
         
-        if category:
-            query = query.where(Product.category == category)
+        Pass after_id (keyset pagination) instead of a large skip so deep
+        pages are an index seek rather than an OFFSET scan; for sorts other
+        than id, also pass the last row's sort value as after_key.
+        """
+        snapshot = catalog.current()
+        if snapshot is not None:
+            attribute, descending = PRODUCT_SORTS[sort]
+            return snapshot.list_products(
+                skip, limit, category, after_id,
+                min_price=min_price,
+                max_price=max_price,
+                in_stock=in_stock,
+                order_by=attribute,
+                descending=descending,
+                after_key=after_key
+            )
         
-        query = query.offset(skip).limit(limit)
-        result = await db.execute(query)
-        return result.scalars().all()
+        async def load() -> List[Product]:
+            query = ProductService.build_list_query(
+                category, min_price, max_price, in_stock, sort, after_id, after_key
+            )
+            query = query.offset(skip).limit(limit)
+            result = await db.execute(query)
+            return result.scalars().all()
+        
+        # Normalized like build_list_query: an empty category means all
+        key = ("list", category or None, min_price, max_price, in_stock, sort, after_id, after_key, skip, limit)
+        return await _coalesced(key, load)
     
     @staticmethod
     async def get_product_by_id(db: AsyncSession, product_id: int) -> Optional[Product]:
         """Get a single product by ID."""
-        result = await db.execute(select(Product).where(Product.id == product_id))
+        snapshot = catalog.current()
+        if snapshot is not None:
+            return snapshot.get_product(product_id)
+        
+        async def load() -> Optional[Product]:
+            result = await db.execute(select(Product).where(Product.id == product_id))
+            return result.scalar_one_or_none()
+        
+        return await _coalesced(("product", product_id), load)
+    
+    @staticmethod
+    async def get_products_by_ids(
+        db: AsyncSession,
+        product_ids: List[int]
+    ) -> Tuple[List[Product], List[int]]:
+        """
+        Resolve many product IDs with a single IN (...) query.
+        
+        Returns (products in request order, missing ids); duplicate ids are
+        collapsed to their first occurrence.
+        """
+        ordered_ids = list(dict.fromkeys(product_ids))
+        if not ordered_ids:
+            return [], []
+        
+        snapshot = catalog.current()
+        if snapshot is not None:
+            found: Dict[int, Product] = snapshot.get_products(ordered_ids)
+        else:
+            result = await db.execute(select(Product).where(Product.id.in_(ordered_ids)))
+            found = {product.id: product for product in result.scalars()}
+        
+        products = [found[pid] for pid in ordered_ids if pid in found]
+        missing = [pid for pid in ordered_ids if pid not in found]
+        return products, missing
+    
+    @staticmethod
+    async def get_product_by_sku(db: AsyncSession, sku: str) -> Optional[Product]:
+        """Get a single product by SKU."""
+        result = await db.execute(select(Product).where(Product.sku == sku))
         return result.scalar_one_or_none()
     
+    @staticmethod
+    def build_search_query(text: str) -> Optional[str]:
+        """
+        Turn free text into an FTS5 MATCH expression.
+        
+        Every word must match (implicit AND); the last word is a prefix so
+        partial input like "raw wildfl" still finds results. User input is
+        reduced to quoted word tokens, so FTS5 syntax can't be injected.
+        """
+        terms = re.findall(r"\w+", text.lower())
+        if not terms:
+            return None
+        
+        quoted = [f'"{term}"' for term in terms]
+        quoted[-1] += "*"
+        return " ".join(quoted)
+    
+    @staticmethod
+    async def search_products(
+        db: AsyncSession,
+        query_text: str,
+        limit: int = 20,
+        after: Optional[Tuple[float, int]] = None
+    ) -> List[Tuple[Product, float]]:
+        """
+        Full-text search ranked by bm25 (best match first).
+        
+        Returns (product, rank) pairs; pass the last pair's (rank, id) as
+        `after` to continue with the next page.
+        """
+        match = ProductService.build_search_query(query_text)
+        if match is None:
+            return []
+        
+        # Rank and page inside the FTS query so only `limit` rows are joined
+        # back to products, however many documents match.
+        fts = literal_column("products_fts")
+        rank = func.bm25(fts, *BM25_WEIGHTS)
+        matches = (
+            select(products_fts.c.rowid.label("id"), rank.label("rank"))
+            .select_from(products_fts)
+            .where(fts.op("MATCH")(match))
+            .order_by(rank, products_fts.c.rowid)
+            .limit(limit)
+        )
+        
+        if after is not None:
+            last_rank, last_id = after
+            matches = matches.where(
+                or_(
+                    rank > last_rank,
+                    and_(rank == last_rank, products_fts.c.rowid > last_id),
+                )
+            )
+        
+        matches = matches.subquery()
+        query = (
+            select(Product, matches.c.rank)
+            .join(matches, matches.c.id == Product.id)
+            .order_by(matches.c.rank, matches.c.id)
+        )
+        
+        result = await db.execute(query)
+        return [(product, rank) for product, rank in result.all()]
+    
+    @staticmethod
+    async def get_catalog_version(db: AsyncSession) -> Tuple[int, Optional[datetime]]:
+        """
+        Get (row count, last modification time) for the whole catalog.
+        
+        Answered from the snapshot when available; otherwise from two scalar
+        subqueries so SQLite can use the indexes instead of reading rows.
+        """
+        snapshot = catalog.current()
+        if snapshot is not None:
+            return len(snapshot.products), snapshot.last_modified
+        
+        async def load() -> Tuple[int, Optional[datetime]]:
+            query = select(
+                select(func.count(Product.id)).scalar_subquery(),
+                select(func.max(Product.updated_at)).scalar_subquery(),
+            )
+            result = await db.execute(query)
+            count, last_modified = result.one()
+            return count, last_modified
+        
+        return await _coalesced(("catalog_version",), load)
+    
+    @staticmethod
+    async def get_catalog_last_modified(db: AsyncSession) -> Optional[datetime]:
+        """Latest product modification time (one seek on ix_products_updated_at)."""
+        snapshot = catalog.current()
+        if snapshot is not None:
+            return snapshot.last_modified
+        
+        async def load() -> Optional[datetime]:
+            return await db.scalar(select(func.max(Product.updated_at)))
+        
+        return await _coalesced(("catalog_last_modified",), load)
+    
+    @staticmethod
+    async def get_category_facets(db: AsyncSession) -> List[CategoryFacet]:
+        """
+        Per-category counts and price ranges, ordered by category.
+        
+        Reads the trigger-maintained summary table, so the cost depends on
+        the number of categories, not products.
+        """
+        async def load() -> List[CategoryFacet]:
+            result = await db.execute(select(CategoryFacet).order_by(CategoryFacet.category))
+            return result.scalars().all()
+        
+        return await _coalesced(("facets",), load)
+    
+    @staticmethod
+    async def get_product_last_modified(db: AsyncSession, product_id: int) -> Optional[datetime]:
+        """Get a product's updated_at without loading the row (None if missing)."""
+        snapshot = catalog.current()
+        if snapshot is not None:
+            product = snapshot.get_product(product_id)
+            return product.updated_at if product else None
+        
+        async def load() -> Optional[datetime]:
+            result = await db.execute(select(Product.updated_at).where(Product.id == product_id))
+            return result.scalar_one_or_none()
+        
+        return await _coalesced(("last_modified", product_id), load)
+    
+    @staticmethod
+    async def stream_products(
+        updated_since: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Stream the catalog as batches of plain rows (EXPORT_COLUMNS).
+        
+        Uses its own session and a server-side cursor, so it can outlive the
+        request's session and memory stays at one batch regardless of size.
+        With updated_since, rows come in (updated_at, id) order for
+        incremental exports.
+        """
+        query = select(*(getattr(Product, name) for name in EXPORT_COLUMNS))
+        
+        if updated_since is not None:
+            query = query.where(Product.updated_at >= updated_since)
+            query = query.order_by(Product.updated_at, Product.id)
+        else:
+            query = query.order_by(Product.id)
+        
+        query = query.execution_options(yield_per=batch_size)
+        
+        async with ReadSessionLocal() as db:
+            result = await db.stream(query)
+            async for batch in result.partitions():
+                yield batch
+    
     @staticmethod
     async def create_product(
         db: AsyncSession,
@@ -36,20 +352,41 @@ class ProductService:
         price: float,
         stock: int,
         image_url: Optional[str] = None,
-        category: Optional[str] = None
+        category: Optional[str] = None,
+        sku: Optional[str] = None
     ) -> Product:
         """Create a new product."""
-        product = Product(
-            name=name,
-            description=description,
-            price=price,
-            stock=stock,
-            image_url=image_url,
-            category=category
-        )
+        async def work(session: AsyncSession) -> Product:
+            product = Product(
+                sku=sku,
+                name=name,
+                description=description,
+                price=price,
+                stock=stock,
+                image_url=image_url,
+                category=category
+            )
+            session.add(product)
+            await session.flush()
+            return product
+        
+        product = await run_write(db, work)
+        await catalog.reload()
+        
+        return product
+    
+    @staticmethod
+    async def set_product_image(db: AsyncSession, product_id: int, image_url: str) -> Optional[Product]:
+        """Point a product at a new image (None if the product is gone)."""
+        async def work(session: AsyncSession) -> Optional[Product]:
+            product = await session.get(Product, product_id)
+            if product is not None:
+                product.image_url = image_url
+                await session.flush()
+            return product
         
-        db.add(product)
-        await db.commit()
-        await db.refresh(product)
+        product = await run_write(db, work)
+        if product is not None:
+            await catalog.reload()
         
         return product
\ No newline at end of file
@@ -1,24 +1,24 @@
 from fastapi import APIRouter, Request, Depends, Form, Response
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from app.db.session import get_db
 from app.services.auth_service import AuthService
 from app.utils.cookies import set_auth_cookie
 from app.core.config import settings
+from app.core.templates import templates, render_page
+from app.core.login_throttle import check_login_allowed, LoginThrottledError
+from app.utils.hashing import HashingBusyError
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/ui/templates")
+
+BUSY_MESSAGE = "The server is busy. Please try again in a moment."
 
 
 @router.get("/login", response_class=HTMLResponse)
 async def login_page(request: Request):
-    """Render login page."""
-    return templates.TemplateResponse(
-        "login.html",
-        {"request": request}
-    )
+    """Render login page (served from the rendered-page cache)."""
+    return render_page("login.html", request=request)
 
 
 @router.post("/login")
@@ -30,7 +30,33 @@ async def login_submit(
     db: AsyncSession = Depends(get_db)
 ):
     """Process login form submission."""
-    user = await AuthService.authenticate_user(db, email, password)
+    try:
+        check_login_allowed(request, email)
+    except LoginThrottledError as exc:
+        return templates.TemplateResponse(
+            "login.html",
+            {
+                "request": request,
+                "error": "Too many login attempts. Please try again shortly.",
+                "email": email
+            },
+            status_code=429,
+            headers={"Retry-After": str(exc.retry_after)}
+        )
+    
+    try:
+        user = await AuthService.authenticate_user(db, email, password)
+    except HashingBusyError:
+        return templates.TemplateResponse(
+            "login.html",
+            {
+                "request": request,
+                "error": BUSY_MESSAGE,
+                "email": email
+            },
+            status_code=503,
+            headers={"Retry-After": "1"}
+        )
     
     if not user:
         return templates.TemplateResponse(
@@ -54,11 +80,8 @@ async def login_submit(
 
 @router.get("/register", response_class=HTMLResponse)
 async def register_page(request: Request):
-    """Render registration page."""
-    return templates.TemplateResponse(
-        "register.html",
-        {"request": request}
-    )
+    """Render registration page (served from the rendered-page cache)."""
+    return render_page("register.html", request=request)
 
 
 @router.post("/register")
@@ -98,12 +121,25 @@ async def register_submit(
         )
     
     # Create user
-    user = await AuthService.create_user(
-        db,
-        email=email,
-        password=password,
-        full_name=full_name
-    )
+    try:
+        user = await AuthService.create_user(
+            db,
+            email=email,
+            password=password,
+            full_name=full_name
+        )
+    except HashingBusyError:
+        return templates.TemplateResponse(
+            "register.html",
+            {
+                "request": request,
+                "error": BUSY_MESSAGE,
+                "email": email,
+                "full_name": full_name
+            },
+            status_code=503,
+            headers={"Retry-After": "1"}
+        )
     
     # Create token and set cookie
     token = AuthService.create_token_for_user(user)
@@ -0,0 +1,72 @@
+from fastapi import APIRouter, Request, Depends, Form, HTTPException
+from fastapi.responses import HTMLResponse, RedirectResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.session import get_read_db
+from app.db.models.payment import Payment
+from app.services.payment_service import PaymentService
+from app.services.payment_gateway import gateway
+from app.core.config import settings
+from app.core.templates import templates
+
+router = APIRouter()
+
+
+async def get_payment_or_404(
+    gateway_ref: str,
+    db: AsyncSession = Depends(get_read_db)
+) -> Payment:
+    """Look up a payment by its (unguessable) gateway reference."""
+    payment = await PaymentService.get_payment(db, gateway_ref)
+    if payment is None:
+        raise HTTPException(status_code=404, detail="Payment not found")
+    return payment
+
+
+def result_page(payment: Payment) -> RedirectResponse:
+    page = "failed" if payment.status == "failed" else "success"
+    return RedirectResponse(url=f"/ui/payment/{page}/{payment.gateway_ref}", status_code=303)
+
+
+@router.get("/checkout/{gateway_ref}", response_class=HTMLResponse)
+async def checkout_page(request: Request, payment: Payment = Depends(get_payment_or_404)):
+    """Render the stand-in gateway's hosted checkout page."""
+    if payment.status != "pending":
+        return result_page(payment)
+    
+    return templates.TemplateResponse("checkout.html", {"request": request, "payment": payment})
+
+
+@router.post("/checkout/{gateway_ref}")
+async def checkout_submit(
+    outcome: str = Form(...),
+    payment: Payment = Depends(get_payment_or_404)
+):
+    """Complete the checkout; the gateway reports the result by webhook."""
+    if payment.status == "pending":
+        succeed = outcome == "pay"
+        gateway.complete(payment.gateway_ref, succeed)
+        page = "success" if succeed else "failed"
+        return RedirectResponse(url=f"/ui/payment/{page}/{payment.gateway_ref}", status_code=303)
+    
+    return result_page(payment)
+
+
+@router.get("/success/{gateway_ref}", response_class=HTMLResponse)
+async def success_page(request: Request, payment: Payment = Depends(get_payment_or_404)):
+    """Render the payment result (refreshes until the capture is recorded)."""
+    if payment.status == "failed":
+        return result_page(payment)
+    
+    return templates.TemplateResponse(
+        "success.html",
+        {"request": request, "payment": payment, "frontend_url": settings.FRONTEND_URL}
+    )
+
+
+@router.get("/failed/{gateway_ref}", response_class=HTMLResponse)
+async def failed_page(request: Request, payment: Payment = Depends(get_payment_or_404)):
+    """Render the declined-payment page."""
+    return templates.TemplateResponse(
+        "failed.html",
+        {"request": request, "payment": payment, "frontend_url": settings.FRONTEND_URL}
+    )
@@ -0,0 +1,86 @@
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+
+class DiskLRUCache:
+    """
+    Size-bounded directory of generated files with least-recently-used eviction.
+    
+    The in-memory index (name -> size) is rebuilt from the directory on first
+    use, oldest mtime first, and hits bump the file's mtime so recency
+    survives restarts. Several workers may share the directory: each evicts
+    against its own view, and a file another worker removed is simply a miss.
+    Not thread-safe; intended for use from the event loop.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def _load(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, entry.name, stat.st_size))
+            self._index = OrderedDict((name, size) for _, name, size in sorted(entries))
+            self.total_bytes = sum(self._index.values())
+        return self._index
+    
+    def path(self, name: str) -> Path:
+        return self.directory / name
+    
+    def get(self, name: str) -> Optional[Path]:
+        """Return the cached file's path, or None on a miss."""
+        index = self._load()
+        path = self.directory / name
+        try:
+            os.utime(path)
+            size = index[name] if name in index else path.stat().st_size
+        except FileNotFoundError:
+            if name in index:
+                self.total_bytes -= index.pop(name)
+            self.misses += 1
+            return None
+        
+        if name not in index:
+            # Written by another worker
+            self.total_bytes += size
+        index[name] = size
+        index.move_to_end(name)
+        self.hits += 1
+        return path
+    
+    def add(self, name: str, size: int) -> None:
+        """Record a file just written at path(name), evicting to fit."""
+        index = self._load()
+        self.total_bytes += size - index.pop(name, 0)
+        index[name] = size
+        
+        while self.total_bytes > self.max_bytes and len(index) > 1:
+            victim, victim_size = index.popitem(last=False)
+            self.total_bytes -= victim_size
+            self.evictions += 1
+            try:
+                os.unlink(self.directory / victim)
+            except FileNotFoundError:
+                pass
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "files": len(self._index or ()),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -0,0 +1,92 @@
+"""
+Bounded executor for password hashing.
+
+bcrypt is deliberately slow (~100-300 ms per call). Running it inline would
+stall the event loop, so calls go through a small dedicated thread pool
+(bcrypt releases the GIL). Admission is capped: once every worker is busy
+and the wait queue is full, new calls fail fast with HashingBusyError rather
+than piling up behind a login burst.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class HashingBusyError(Exception):
+    """Raised when the hashing queue is full."""
+
+
+class HashingPool:
+    def __init__(
+        self,
+        max_workers: int,
+        max_queue: int,
+        on_complete: Optional[Callable[[str, float, float], None]] = None,
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        # Called on the event loop with (function name, queue wait, hash time)
+        self.on_complete = on_complete
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._in_flight = 0
+        
+        self.calls = 0
+        self.rejected = 0
+        self.queue_wait_seconds = 0.0
+        self.hash_seconds = 0.0
+        self.max_queue_wait_seconds = 0.0
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="hashing",
+            )
+        return self._executor
+    
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a hashing function in the pool, or raise HashingBusyError."""
+        if self._in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HashingBusyError("Password hashing queue is full")
+        
+        def timed_call():
+            started = time.perf_counter()
+            result = func(*args)
+            return result, started, time.perf_counter()
+        
+        self._in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(self._get_executor(), timed_call)
+        finally:
+            self._in_flight -= 1
+        
+        queue_wait = started - submitted
+        self.calls += 1
+        self.queue_wait_seconds += queue_wait
+        self.hash_seconds += finished - started
+        self.max_queue_wait_seconds = max(self.max_queue_wait_seconds, queue_wait)
+        if self.on_complete is not None:
+            self.on_complete(func.__name__, queue_wait, finished - started)
+        
+        return result
+    
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.max_workers,
+            "queue_limit": self.max_queue,
+            "in_flight": self._in_flight,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "queue_wait_seconds_total": round(self.queue_wait_seconds, 6),
+            "queue_wait_seconds_max": round(self.max_queue_wait_seconds, 6),
+            "hash_seconds_total": round(self.hash_seconds, 6),
+        }
@@ -0,0 +1,75 @@
+"""
+Image decoding and resizing, run in worker processes.
+
+Kept free of app imports so spawned workers start quickly. Both functions
+take file paths rather than bytes so images never cross the process
+boundary; results are written next to the target and renamed into place,
+so readers never see a partial file.
+"""
+import os
+import tempfile
+from typing import Tuple
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Pillow formats accepted for originals (animated GIFs keep their first frame)
+ACCEPTED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+
+SAVE_OPTIONS = {
+    "webp": {"format": "WEBP", "method": 4},
+    "jpg": {"format": "JPEG", "optimize": True, "progressive": True},
+}
+
+
+class InvalidImageError(ValueError):
+    """Raised when an upload is not a usable image."""
+
+
+def probe_original(path: str, max_pixels: int) -> Tuple[str, int, int]:
+    """Validate an uploaded file; returns (format, width, height)."""
+    try:
+        with Image.open(path) as image:
+            if image.format not in ACCEPTED_FORMATS:
+                raise InvalidImageError(f"Unsupported image format: {image.format}")
+            width, height = image.size
+            if width * height > max_pixels:
+                raise InvalidImageError(f"Image too large: {width}x{height}")
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError) as e:
+        raise InvalidImageError(f"Not a valid image: {e}") from None
+    return image.format, width, height
+
+
+def render_derivative(source: str, target: str, width: int, fmt: str, quality: int) -> int:
+    """
+    Write `source` scaled down to `width` (never up) as `fmt` to `target`.
+    
+    Returns the size in bytes of the written file.
+    """
+    with Image.open(source) as image:
+        # Let JPEG decode at a reduced scale instead of full size; both sides
+        # stay >= width, so an EXIF rotation can't leave it too narrow
+        image.draft("RGB", (width, width))
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            image.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        
+        has_alpha = image.mode in ("RGBA", "LA", "PA") or "transparency" in image.info
+        if fmt == "jpg" and has_alpha:
+            # JPEG has no alpha channel: flatten onto white, not black
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, "white")
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        elif image.mode not in ("RGB", "RGBA") or (fmt == "jpg" and image.mode != "RGB"):
+            image = image.convert("RGBA" if has_alpha else "RGB")
+        
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(target), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                image.save(handle, quality=quality, **SAVE_OPTIONS[fmt])
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, target)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+    return os.path.getsize(target)
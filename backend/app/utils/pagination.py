@@ -0,0 +1,20 @@
+import base64
+import json
+from typing import Any, Dict, Optional
+
+
+def encode_cursor(data: Dict[str, Any]) -> str:
+    """Encode keyset position as an opaque, URL-safe cursor."""
+    raw = json.dumps(data, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Dict[str, Any]]:
+    """Decode a cursor produced by encode_cursor (None if malformed)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    
+    return data if isinstance(data, dict) else None
@@ -0,0 +1,51 @@
+"""
+Token-bucket rate limiting with bounded memory.
+
+Buckets live in an LRUCache capped at `max_keys`, so an attacker rotating
+IPs or emails can only evict old buckets, never grow memory. A bucket left
+idle long enough to refill completely is equivalent to no bucket, so
+entries also expire after that refill time.
+"""
+import time
+from typing import Dict, Hashable, Tuple
+from app.utils.lru import LRUCache
+
+
+class TokenBucketLimiter:
+    def __init__(self, rate_per_second: float, burst: int, max_keys: int):
+        self.rate = rate_per_second
+        self.burst = burst
+        self._buckets = LRUCache(maxsize=max_keys, ttl=burst / rate_per_second)
+        self.allowed = 0
+        self.throttled = 0
+
+    def acquire(self, key: Hashable) -> Tuple[bool, float]:
+        """
+        Take one token for `key`.
+
+        Returns (allowed, retry_after_seconds); retry_after is 0 when allowed.
+        """
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            tokens = float(self.burst)
+        else:
+            tokens, updated = bucket
+            tokens = min(float(self.burst), tokens + (now - updated) * self.rate)
+
+        if tokens < 1:
+            self._buckets.set(key, (tokens, now))
+            self.throttled += 1
+            return False, (1 - tokens) / self.rate
+
+        self._buckets.set(key, (tokens - 1, now))
+        self.allowed += 1
+        return True, 0.0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "keys": self._buckets.stats()["size"],
+            "max_keys": self._buckets.maxsize,
+            "allowed": self.allowed,
+            "throttled": self.throttled,
+        }
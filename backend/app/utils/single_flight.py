@@ -0,0 +1,82 @@
+"""
+Single-flight coalescing of identical concurrent async calls.
+
+When many requests ask for the same thing at the same instant, the first
+caller for a key (the leader) runs the call and every caller arriving while
+it is in flight (a follower) awaits the leader's result instead of running
+its own. Results are not cached: once the leader finishes, the next caller
+starts a new flight.
+
+- An exception raised by the leader is raised in every follower too.
+- Followers wait at most `max_wait` seconds, then run the call themselves.
+- If the leader is cancelled (its client went away), its followers start
+  a new flight rather than failing with it.
+
+Followers receive the very same result object, so callers must treat it
+as read-only. Not thread-safe; intended for use from the event loop.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """Set on a flight whose leader was cancelled before finishing."""
+
+
+class SingleFlight:
+    def __init__(self, max_wait: float):
+        self.max_wait = max_wait
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+        self.timeouts = 0
+        self.errors = 0
+    
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Run `func()` unless an identical call (same key) is in flight."""
+        flight = self._flights.get(key)
+        if flight is not None:
+            self.followers += 1
+            # asyncio.wait never cancels the flight, even if this caller is
+            done, _ = await asyncio.wait((flight,), timeout=self.max_wait)
+            if not done:
+                self.timeouts += 1
+                return await func()
+            try:
+                return flight.result()
+            except _LeaderCancelled:
+                # Start (or join) a fresh flight
+                return await self.do(key, func)
+        
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.leaders += 1
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            flight.set_exception(_LeaderCancelled())
+            raise
+        except Exception as e:
+            self.errors += 1
+            flight.set_exception(e)
+            raise
+        else:
+            flight.set_result(result)
+            return result
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            # Mark the exception retrieved even if nobody was following
+            if flight.done() and not flight.cancelled():
+                flight.exception()
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+        }
@@ -0,0 +1,44 @@
+"""
+HMAC-SHA256 webhook signatures.
+
+The signature header has the form `t=<unix time>,v1=<hex digest>`, where
+the digest covers `<t>.<raw body>`. Binding the timestamp into the digest
+lets receivers reject replays of old deliveries.
+"""
+import hashlib
+import hmac
+import time
+from typing import Optional
+
+
+def sign_payload(secret: str, body: bytes, timestamp: Optional[int] = None) -> str:
+    """Return the signature header value for `body`."""
+    timestamp = int(time.time()) if timestamp is None else timestamp
+    digest = hmac.new(secret.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def verify_signature(
+    secret: str,
+    body: bytes,
+    header: Optional[str],
+    tolerance_seconds: int,
+    now: Optional[float] = None
+) -> bool:
+    """Check a signature header against `body` in constant time."""
+    if not header:
+        return False
+    
+    parts = dict(item.split("=", 1) for item in header.split(",") if "=" in item)
+    try:
+        timestamp = int(parts["t"])
+        signature = parts["v1"]
+    except (KeyError, ValueError):
+        return False
+    
+    now = time.time() if now is None else now
+    if abs(now - timestamp) > tolerance_seconds:
+        return False
+    
+    expected = sign_payload(secret, body, timestamp).split("v1=", 1)[1]
+    return hmac.compare_digest(expected, signature)
@@ -0,0 +1,282 @@
+"""
+In-process load test and regression benchmark for the HTTP API.
+
+Runs the real `app.main:app` through httpx's ASGI transport (no network,
+no server) against a throwaway, seeded SQLite database, and reports
+throughput and p50/p95/p99 latency per scenario:
+
+    products_list_20 / _100    GET /api/v1/products?limit=...
+    products_list_category     GET /api/v1/products?category=...
+    product_detail             GET /api/v1/products/{id}
+    login                      POST /api/v1/auth/login
+    me                         GET /api/v1/auth/me (valid cookie)
+    register                   POST /api/v1/auth/register
+
+Save a run and compare later runs against it; the script exits 1 when a
+scenario's throughput drops or p95 grows by more than --threshold percent.
+
+    python scripts/bench_api.py --output bench.json
+    python scripts/bench_api.py --baseline bench.json --threshold 10
+
+Engine/cache settings come from the environment as usual, e.g.
+DB_ENGINE_PROFILE=production or CATALOG_SNAPSHOT_ENABLED=True.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Point the app at a scratch database before anything reads settings
+_db_dir = tempfile.mkdtemp(prefix="bench_api_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+os.environ.setdefault("EMAIL_BACKEND", "null")
+os.environ.setdefault("COOKIE_DOMAIN", "localhost")
+# Every request comes from one client; measure login cost, not the throttle
+os.environ.setdefault("LOGIN_THROTTLE_ENABLED", "False")
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import insert
+from app.main import app
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.db.models.product import Product
+from app.db.models.user import User
+from app.core.security import get_password_hash
+
+CATEGORIES = ["Raw Honey", "Premium Honey", "Specialty", "Processed Honey", "Gift Sets"]
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "benchmark-password"
+
+
+class Scenario:
+    def __init__(
+        self,
+        name: str,
+        method: str,
+        path: Callable[[random.Random], str],
+        body: Optional[Callable[[random.Random], dict]] = None,
+        authenticated: bool = False,
+        cost: int = 1,
+    ):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.authenticated = authenticated
+        # bcrypt-bound scenarios run `requests // cost` requests
+        self.cost = cost
+
+
+def build_scenarios(product_count: int) -> List[Scenario]:
+    emails = itertools.count()
+    return [
+        Scenario("products_list_20", "GET", lambda rng: "/api/v1/products/?limit=20"),
+        Scenario("products_list_100", "GET", lambda rng: "/api/v1/products/?limit=100"),
+        Scenario(
+            "products_list_category", "GET",
+            lambda rng: f"/api/v1/products/?limit=20&category={rng.choice(CATEGORIES)}",
+        ),
+        Scenario(
+            "product_detail", "GET",
+            lambda rng: f"/api/v1/products/{rng.randint(1, product_count)}",
+        ),
+        Scenario(
+            "login", "POST", lambda rng: "/api/v1/auth/login",
+            body=lambda rng: {"email": BENCH_EMAIL, "password": BENCH_PASSWORD},
+            cost=10,
+        ),
+        Scenario("me", "GET", lambda rng: "/api/v1/auth/me", authenticated=True),
+        Scenario(
+            "register", "POST", lambda rng: "/api/v1/auth/register",
+            body=lambda rng: {"email": f"bench-{next(emails)}@example.com", "password": BENCH_PASSWORD},
+            cost=10,
+        ),
+    ]
+
+
+async def seed(product_count: int) -> None:
+    """Seed products across categories and the login user."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            "name": f"Benchmark Honey {i}",
+            "description": "Seeded by bench_api.py",
+            "price": round(5 + (i % 400) * 0.25, 2),
+            "stock": 100,
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(product_count)
+    ]
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Product), rows)
+        db.add(User(email=BENCH_EMAIL, hashed_password=get_password_hash(BENCH_PASSWORD)))
+        await db.commit()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    auth_cookies: httpx.Cookies,
+) -> Dict[str, Any]:
+    transport = httpx.ASGITransport(app=app)
+    cookies = auth_cookies if scenario.authenticated else None
+    latencies: List[float] = []
+    errors = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://localhost", cookies=cookies) as client:
+        async def one(rng: random.Random, record: bool) -> None:
+            nonlocal errors
+            body = scenario.body(rng) if scenario.body else None
+            started = time.perf_counter()
+            response = await client.request(scenario.method, scenario.path(rng), json=body)
+            elapsed = time.perf_counter() - started
+            if response.status_code >= 400:
+                errors += 1
+            if record:
+                latencies.append(elapsed)
+
+        async def worker(n: int, count: int, record: bool) -> None:
+            rng = random.Random(n)
+            for _ in range(count):
+                await one(rng, record)
+
+        def split(total: int) -> List[int]:
+            return [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+
+        await asyncio.gather(*(worker(n, count, False) for n, count in enumerate(split(warmup))))
+        errors = 0
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n, count, True) for n, count in enumerate(split(requests))))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Return a description of every scenario that regressed beyond the threshold."""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - threshold / 100):
+            regressions.append(
+                f"{name}: throughput {previous['throughput_rps']} -> {current['throughput_rps']} rps"
+            )
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold / 100):
+            regressions.append(f"{name}: p95 {previous['p95_ms']} -> {current['p95_ms']} ms")
+    return regressions
+
+
+async def main_async(args) -> Dict[str, Any]:
+    scenarios = build_scenarios(args.products)
+    if args.scenarios:
+        unknown = set(args.scenarios) - {s.name for s in scenarios}
+        if unknown:
+            raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+        scenarios = [s for s in scenarios if s.name in args.scenarios]
+
+    results = {}
+    async with app.router.lifespan_context(app):
+        await seed(args.products)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            response = await client.post(
+                "/api/v1/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD}
+            )
+            response.raise_for_status()
+            auth_cookies = httpx.Cookies(client.cookies)
+
+        for scenario in scenarios:
+            requests = max(args.requests // scenario.cost, args.concurrency)
+            warmup = max(args.warmup // scenario.cost, 1)
+            results[scenario.name] = await run_scenario(
+                scenario, requests, args.concurrency, warmup, auth_cookies
+            )
+            r = results[scenario.name]
+            print(
+                f"{scenario.name:<24} {r['throughput_rps']:>9.1f} {r['p50_ms']:>9.2f} "
+                f"{r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['errors']:>7}"
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=5000, help="Products to seed")
+    parser.add_argument("--requests", type=int, default=2000, help="Measured requests per scenario")
+    parser.add_argument("--warmup", type=int, default=200, help="Unmeasured requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--scenarios", nargs="*", help="Only run these scenarios")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against a previous --output file")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Allowed regression in percent")
+    args = parser.parse_args()
+
+    print(f"{'scenario':<24} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    results = asyncio.run(main_async(args))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "db_engine_profile": settings.DB_ENGINE_PROFILE,
+            "catalog_snapshot": settings.CATALOG_SNAPSHOT_ENABLED,
+            "products": args.products,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"\n❌ Regressions beyond {args.threshold}%:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold}% against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
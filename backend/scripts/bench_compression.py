@@ -0,0 +1,165 @@
+"""
+Benchmark negotiated response compression.
+
+Runs the real app in-process (httpx ASGI transport) against a seeded
+scratch database and, for each payload (product list pages, a product,
+facets, the login page), reports the bytes sent with no compression, gzip
+and Brotli, and the CPU each coding adds to a request: compressing the
+body (a cache miss) versus reusing cached compressed bytes (a hit), next
+to the CPU of a whole uncompressed request. Also checks that every body of
+at least COMPRESSION_MIN_BYTES is compressed and decodes to the identity
+body, and that smaller bodies go out as they are. Exits 1 on any failure.
+
+    python scripts/bench_compression.py --products 2000 --requests 300
+"""
+import argparse
+import asyncio
+import gzip
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Point the app at a scratch database before anything reads settings
+_db_dir = tempfile.mkdtemp(prefix="bench_compression_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+os.environ.setdefault("EMAIL_BACKEND", "null")
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import brotli
+import httpx
+from sqlalchemy import insert
+from app.main import app
+from app.core.compression import compressor
+from app.db.session import AsyncSessionLocal, init_db
+from app.db.models.product import Product
+
+CATEGORIES = ["Raw Honey", "Premium Honey", "Specialty", "Processed Honey", "Gift Sets"]
+PAYLOADS = {
+    "products_list_100": "/api/v1/products/?limit=100",
+    "products_list_20": "/api/v1/products/?limit=20",
+    "product_detail": "/api/v1/products/1",
+    "facets": "/api/v1/products/facets",
+    "login_page": "/ui/auth/login",
+}
+CODINGS = ("identity", "gzip", "br")
+DECODERS = {"gzip": gzip.decompress, "br": brotli.decompress}
+
+
+async def seed(product_count: int) -> None:
+    now = datetime.utcnow()
+    rows = [
+        {
+            "sku": f"BENCH-{i:06d}",
+            "name": f"Benchmark Honey {i}",
+            "description": "Raw wildflower honey, cold extracted and unfiltered. Seeded by bench_compression.py",
+            "price": round(5 + (i % 400) * 0.25, 2),
+            "stock": i % 50,
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(product_count)
+    ]
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Product), rows)
+        await db.commit()
+
+
+async def cpu_per_request(client: httpx.AsyncClient, path: str, requests: int) -> float:
+    started = time.process_time()
+    for _ in range(requests):
+        await client.get(path, headers={"accept-encoding": "identity"})
+    return (time.process_time() - started) / requests
+
+
+def cpu_per_call(func, repeat: int) -> float:
+    started = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - started) / repeat
+
+
+async def check_bodies(client: httpx.AsyncClient) -> list:
+    failures = []
+    for name, path in PAYLOADS.items():
+        identity = await client.get(path, headers={"accept-encoding": "identity"})
+        if len(identity.content) < compressor.min_bytes:
+            continue
+        for coding, decode in DECODERS.items():
+            async with client.stream("GET", path, headers={"accept-encoding": coding}) as response:
+                raw = b"".join([chunk async for chunk in response.aiter_raw()])
+            if response.headers.get("content-encoding") != coding:
+                failures.append(f"{name}: {coding} requested, got {response.headers.get('content-encoding')}")
+            elif decode(raw) != identity.content:
+                failures.append(f"{name}: {coding} body does not decode to the identity body")
+
+    tiny = await client.get("/", headers={"accept-encoding": "br"})
+    if len(tiny.content) >= compressor.min_bytes or "content-encoding" in tiny.headers:
+        failures.append(f"{len(tiny.content)}-byte body should not be compressed")
+    return failures
+
+
+async def main_async(args) -> int:
+    await init_db()
+    await seed(args.products)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        failures = await check_bodies(client)
+
+        print(f"{args.products} products; bytes sent, and CPU µs added per request by compression\n")
+        print(
+            f"  {'payload':<18} {'identity':>9} {'gzip':>15} {'br':>15}"
+            f" {'gzip miss':>10} {'br miss':>9} {'hit':>6} {'request':>9}"
+        )
+        for name, path in PAYLOADS.items():
+            sizes = {}
+            for coding in CODINGS:
+                response = await client.get(path, headers={"accept-encoding": coding})
+                sizes[coding] = int(response.headers["content-length"])
+            body = (await client.get(path, headers={"accept-encoding": "identity"})).content
+
+            request_cpu = await cpu_per_request(client, path, args.requests)
+            if len(body) >= compressor.min_bytes:
+                gzip_cpu = cpu_per_call(lambda: compressor._compress(body, "gzip"), args.requests)
+                br_cpu = cpu_per_call(lambda: compressor._compress(body, "br"), args.requests)
+                hit_cpu = cpu_per_call(lambda: compressor.compress(body, "br", shared=True), args.requests)
+                costs = f"{gzip_cpu * 1e6:>10.0f} {br_cpu * 1e6:>9.0f} {hit_cpu * 1e6:>6.0f}"
+            else:
+                costs = f"{'(under COMPRESSION_MIN_BYTES)':>27}"
+
+            def sent(coding: str) -> str:
+                return f"{sizes[coding]:,} (-{100 - sizes[coding] * 100 / sizes['identity']:.0f}%)"
+
+            print(
+                f"  {name:<18} {sizes['identity']:>9,} {sent('gzip'):>15} {sent('br'):>15}"
+                f" {costs} {request_cpu * 1e6:>9.0f}"
+            )
+
+    print(f"\n   compression: {compressor.stats()}")
+    print(f"   compressed-body cache: {compressor.cache.stats()}")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Compressed bodies decode to the identity bodies; small bodies are sent uncompressed")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--requests", type=int, default=300, help="Requests and compressions timed per payload")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Check and benchmark the trigger-maintained category facets.
+
+Seeds a scratch catalog, then applies a random mix of writes through the
+paths the app uses (inserts, import upserts, price/category changes, stock
+reservations crossing zero, deletes) and after each round compares
+`category_facets` with a full GROUP BY over `products`. Then times
+reading the facets table against that GROUP BY, and the /facets endpoint
+(through the real app) for full responses and 304 revalidations. The
+endpoint must not scan `products` for its validators, and its ETag must
+change with a price change but not with a stock decrement that leaves the
+in-stock counts alone. Exits 1 on any failure.
+
+    python scripts/bench_facets.py --products 100000 --rounds 20
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Point the app at a scratch database before anything reads settings
+_db_dir = tempfile.mkdtemp(prefix="bench_facets_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+os.environ.setdefault("EMAIL_BACKEND", "null")
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import delete, event, func, insert, select, text, update
+from app.main import app
+from app.core.session import engine, read_engine
+from app.db.session import AsyncSessionLocal, init_db
+from app.db.models.product import Product
+from app.db.models.category_facet import CategoryFacet
+from app.services.import_service import ProductImportService
+
+CATEGORIES = ["Raw Honey", "Premium Honey", "Specialty", "Processed Honey", "Gift Sets", None]
+
+
+def random_row(rng: random.Random, now: datetime, sku: str) -> dict:
+    return {
+        "sku": sku,
+        "name": f"Facet Honey {sku}",
+        "price": round(rng.uniform(1, 200), 2),
+        "stock": rng.choice([0, 0, 1, 5, 50]),
+        "category": rng.choice(CATEGORIES),
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+def grouped_query():
+    key = func.coalesce(Product.category, "")
+    return (
+        select(
+            key,
+            func.count(),
+            func.sum(func.iif(Product.stock > 0, 1, 0)),
+            func.min(Product.price),
+            func.max(Product.price),
+        )
+        .group_by(key)
+        .order_by(key)
+    )
+
+
+async def mismatches(db) -> list:
+    expected = [tuple(row) for row in (await db.execute(grouped_query())).all()]
+    actual = [
+        (f.category, f.product_count, f.in_stock_count, f.min_price, f.max_price)
+        for f in (await db.execute(select(CategoryFacet).order_by(CategoryFacet.category))).scalars()
+    ]
+    return [] if expected == actual else [("expected", expected), ("actual", actual)]
+
+
+async def mutate(db, rng: random.Random, max_id: int, sku_counter) -> None:
+    now = datetime.utcnow()
+    ids = lambda n: [rng.randint(1, max_id) for _ in range(n)]
+
+    await db.execute(insert(Product), [random_row(rng, now, f"SKU-{next(sku_counter)}") for _ in range(50)])
+    # Import upserts: existing SKUs get new prices/categories/stock
+    rows = [random_row(rng, now, f"SKU-{rng.randint(0, max_id)}") for _ in range(50)]
+    await ProductImportService.write_chunk(db, rows, upsert=True)
+    for product_id in ids(50):
+        await db.execute(
+            update(Product).where(Product.id == product_id)
+            .values(price=round(rng.uniform(1, 200), 2))
+        )
+    for product_id in ids(20):
+        await db.execute(update(Product).where(Product.id == product_id).values(category=rng.choice(CATEGORIES)))
+    for product_id in ids(200):
+        # Order-style reservations and restocks, often crossing zero
+        await db.execute(
+            update(Product).where(Product.id == product_id, Product.stock >= 1)
+            .values(stock=Product.stock - 1)
+        )
+        await db.execute(update(Product).where(Product.id == product_id, Product.stock == 0).values(stock=3))
+    await db.execute(delete(Product).where(Product.id.in_(ids(20))))
+    await db.commit()
+
+
+async def timed(db, statement, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        (await db.execute(statement)).all()
+    return (time.perf_counter() - started) / repeat
+
+
+async def endpoint_checks(db, repeat: int) -> list:
+    failures = []
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    for bound_engine in {engine, read_engine}:
+        event.listen(bound_engine.sync_engine, "before_cursor_execute", record)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/api/v1/products/facets")
+        etag = response.headers["etag"]
+        for bound_engine in {engine, read_engine}:
+            event.remove(bound_engine.sync_engine, "before_cursor_execute", record)
+
+        for statement, parameters in statements:
+            plan = (await db.execute(text(f"EXPLAIN QUERY PLAN {statement}"), parameters)).all()
+            if any(row[-1].startswith("SCAN products") for row in plan):
+                failures.append(f"/facets scans products: {statement.strip()}")
+
+        timings = {}
+        for name, headers in (("200 full", {}), ("304 revalidated", {"if-none-match": etag})):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                response = await client.get("/api/v1/products/facets", headers=headers)
+            timings[name] = (time.perf_counter() - started) / repeat
+            if response.status_code != int(name[:3]):
+                failures.append(f"/facets with {headers} returned {response.status_code}")
+        print(f"  GET /facets, 200       {timings['200 full'] * 1000:>9.3f} ms")
+        print(f"  GET /facets, 304       {timings['304 revalidated'] * 1000:>9.3f} ms")
+
+        product_id = await db.scalar(select(Product.id).where(Product.stock > 1).limit(1))
+        await db.execute(
+            update(Product).where(Product.id == product_id)
+            .values(stock=Product.stock - 1, updated_at=datetime.utcnow())
+        )
+        await db.commit()
+        response = await client.get("/api/v1/products/facets", headers={"if-none-match": etag})
+        if response.status_code != 304:
+            failures.append(f"a stock decrement changed the facets ETag ({response.status_code})")
+
+        await db.execute(
+            update(Product).where(Product.id == product_id)
+            .values(price=Product.price + 1000, updated_at=datetime.utcnow())
+        )
+        await db.commit()
+        response = await client.get("/api/v1/products/facets", headers={"if-none-match": etag})
+        if response.status_code != 200:
+            failures.append(f"a new max price left the facets ETag unchanged ({response.status_code})")
+    return failures
+
+
+async def main_async(args) -> int:
+    await init_db()
+    rng = random.Random(args.seed)
+    sku_counter = iter(range(10 ** 9))
+    now = datetime.utcnow()
+
+    async with AsyncSessionLocal() as db:
+        for start in range(0, args.products, 10000):
+            rows = [random_row(rng, now, f"SKU-{next(sku_counter)}") for _ in range(min(10000, args.products - start))]
+            await db.execute(insert(Product), rows)
+        await db.commit()
+
+        failures = await mismatches(db)
+        for round_number in range(args.rounds):
+            if failures:
+                break
+            max_id = await db.scalar(select(func.max(Product.id)))
+            await mutate(db, rng, max_id, sku_counter)
+            failures = await mismatches(db)
+
+        if failures:
+            print(f"❌ Facets diverged from GROUP BY after round {round_number + 1}:")
+            for label, rows in failures:
+                print(f"  {label}: {rows}")
+            return 1
+        print(f"✅ Facets matched GROUP BY after seeding and {args.rounds} rounds of mixed writes")
+
+        facets_seconds = await timed(db, select(CategoryFacet).order_by(CategoryFacet.category), 200)
+        grouped_seconds = await timed(db, grouped_query(), 5)
+        count = await db.scalar(select(func.count()).select_from(Product))
+        print(f"\nRead facets over {count} products:")
+        print(f"  category_facets table  {facets_seconds * 1000:>9.3f} ms")
+        print(f"  GROUP BY products      {grouped_seconds * 1000:>9.3f} ms")
+
+        failures = await endpoint_checks(db, 200)
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("\n✅ /facets revalidates without scanning products, and its ETag follows the facets")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=10, help="Rounds of mixed writes, each checked")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
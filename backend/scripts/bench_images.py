@@ -0,0 +1,144 @@
+"""
+Check and benchmark the product image pipeline.
+
+Uploads synthetic camera-sized photos through the real app (httpx ASGI
+transport, scratch database and image directory), then for each grid width
+compares the bytes a client downloads against the original and times a cold
+request (rendered in the process pool) against a warm one (streamed from the
+disk cache). Also fires a burst of identical cold requests, which must share
+one render, and checks derivative sizes and revalidation (304). Exits 1 on
+any failure.
+
+    python scripts/bench_images.py --images 8 --width 320
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Point the app at a scratch database and image directory before anything reads settings
+_db_dir = tempfile.mkdtemp(prefix="bench_images_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+os.environ["IMAGE_DIR"] = f"{_db_dir}/images"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+os.environ.setdefault("EMAIL_BACKEND", "null")
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from PIL import Image, ImageDraw, ImageFilter
+from app.main import app
+from app.db.session import init_db
+from app.services.image_service import image_pipeline
+
+
+def photo(rng: random.Random, width: int, height: int) -> bytes:
+    """A JPEG with gradients, shapes and grain, so it compresses like a photo."""
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = rng.randrange(width), rng.randrange(height)
+        radius = rng.randrange(40, 400)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=color)
+    image = image.filter(ImageFilter.GaussianBlur(6))
+    grain = Image.effect_noise((width, height), 24).convert("RGB")
+    image = Image.blend(image, grain, 0.12)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=92)
+    return buffer.getvalue()
+
+
+async def timed_get(client: httpx.AsyncClient, url: str, **kwargs):
+    started = time.perf_counter()
+    response = await client.get(url, **kwargs)
+    return response, time.perf_counter() - started
+
+
+async def main_async(args) -> int:
+    await init_db()
+    rng = random.Random(args.seed)
+    failures = []
+    webp = {"accept": "image/webp,*/*"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        urls, original_bytes = [], 0
+        for i in range(args.images):
+            data = photo(rng, 3000, 2000)
+            original_bytes += len(data)
+            product = await client.post("/api/v1/products/", json={"name": f"Photo Honey {i}", "price": 10, "stock": 5})
+            response = await client.put(
+                f"/api/v1/products/{product.json()['id']}/image",
+                files={"file": (f"photo{i}.jpg", data, "image/jpeg")}
+            )
+            if response.status_code != 200:
+                print(f"❌ Upload failed: {response.status_code} {response.text}")
+                return 1
+            urls.append(response.json()["image_url"])
+
+        print(f"Grid of {args.images} products, originals 3000x2000 JPEG:")
+        print(f"  {'variant':<22} {'grid bytes':>12} {'cold p50':>10} {'warm p50':>10}")
+        print(f"  {'original':<22} {original_bytes:>12,}")
+        width = image_pipeline.snap_width(args.width)
+        for fmt, headers in (("webp", webp), ("jpg", {"accept": "image/jpeg"})):
+            total, cold, warm = 0, [], []
+            for url in urls:
+                response, seconds = await timed_get(client, f"{url}?w={args.width}", headers=headers)
+                cold.append(seconds)
+                total += len(response.content)
+                size = Image.open(io.BytesIO(response.content)).size
+                if response.status_code != 200 or size[0] != width:
+                    failures.append(f"{fmt} derivative of {url} is {response.status_code} {size}, expected width {width}")
+                response, seconds = await timed_get(client, f"{url}?w={args.width}", headers=headers)
+                warm.append(seconds)
+
+                revalidated = await client.get(
+                    f"{url}?w={args.width}", headers=dict(headers, **{"if-none-match": response.headers["etag"]})
+                )
+                if revalidated.status_code != 304:
+                    failures.append(f"{fmt} revalidation of {url} returned {revalidated.status_code}")
+            print(
+                f"  {f'{width}px {fmt}':<22} {total:>12,} "
+                f"{statistics.median(cold) * 1000:>8.1f}ms {statistics.median(warm) * 1000:>8.1f}ms"
+            )
+            if total * 10 > original_bytes:
+                failures.append(f"{fmt} grid is {total:,} bytes, over a tenth of the originals")
+
+        renders = image_pipeline.renders
+        burst = await asyncio.gather(*(client.get(f"{urls[0]}?w=640", headers=webp) for _ in range(args.burst)))
+        if {response.status_code for response in burst} != {200} or image_pipeline.renders - renders != 1:
+            failures.append(f"{args.burst} identical cold requests made {image_pipeline.renders - renders} renders")
+        else:
+            print(f"\n✅ {args.burst} concurrent requests for one cold derivative shared a single render")
+
+    image_pipeline.shutdown()
+    print(f"   pipeline: {image_pipeline.stats()}")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Derivatives have the requested width, revalidate with 304 and are a fraction of the originals")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=8, help="Products in the grid")
+    parser.add_argument("--width", type=int, default=320, help="Requested grid thumbnail width")
+    parser.add_argument("--burst", type=int, default=50, help="Concurrent requests for one cold derivative")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark the bulk import pipeline against per-row create_product commits.
+
+Generates a CSV or NDJSON feed in a temp directory, imports it twice (the
+second pass exercises the SKU upsert path), and times a small sample of the
+old one-commit-per-product path for comparison.
+
+    python scripts/bench_import.py --rows 1000000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Point the app at a scratch database before anything reads settings
+_work_dir = tempfile.mkdtemp(prefix="bench_import_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_work_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+os.environ["CATALOG_SNAPSHOT_ENABLED"] = "False"
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db.session import init_db, AsyncSessionLocal
+from app.services.import_service import ProductImportService, iter_file_lines
+from app.services.product_service import ProductService
+
+CATEGORIES = ["Raw Honey", "Premium Honey", "Specialty", "Processed Honey", "Gift Sets"]
+
+
+def generate_feed(path: str, rows: int, fmt: str) -> None:
+    rng = random.Random(7)
+    with open(path, "w", encoding="utf-8") as f:
+        if fmt == "csv":
+            f.write("sku,name,description,price,stock,category\n")
+        for i in range(rows):
+            record = {
+                "sku": f"SKU-{i:08d}",
+                "name": f"Honey Product {i}",
+                "description": f"Generated supplier item {i}",
+                "price": round(rng.uniform(5, 60), 2),
+                "stock": rng.randint(0, 200),
+                "category": rng.choice(CATEGORIES),
+            }
+            if fmt == "csv":
+                f.write(",".join(str(record[k]) for k in record) + "\n")
+            else:
+                f.write(json.dumps(record) + "\n")
+
+
+async def run_import(path: str, fmt: str, chunk_size: int, label: str) -> None:
+    async with AsyncSessionLocal() as db:
+        report = await ProductImportService.import_products(
+            db, iter_file_lines(path), fmt=fmt, chunk_size=chunk_size
+        )
+    print(
+        f"{label:<22} {report.written:>10,} rows {report.elapsed_seconds:>8.1f}s "
+        f"{report.rows_per_second:>12,.0f} rows/sec"
+    )
+
+
+async def run_per_row(rows: int) -> None:
+    async with AsyncSessionLocal() as db:
+        start = time.perf_counter()
+        for i in range(rows):
+            await ProductService.create_product(
+                db, name=f"Per-row {i}", description=None, price=9.99, stock=1, category="Specialty"
+            )
+        elapsed = time.perf_counter() - start
+    print(f"{'per-row commits':<22} {rows:>10,} rows {elapsed:>8.1f}s {rows / elapsed:>12,.0f} rows/sec")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--per-row-sample", type=int, default=1000)
+    args = parser.parse_args()
+
+    feed = os.path.join(_work_dir, f"feed.{args.format}")
+    print(f"Generating {args.rows:,}-row {args.format} feed...")
+    generate_feed(feed, args.rows, args.format)
+
+    await init_db()
+    await run_import(feed, args.format, args.chunk_size, "bulk insert")
+    await run_import(feed, args.format, args.chunk_size, "bulk upsert (re-run)")
+    if args.per_row_sample:
+        await run_per_row(args.per_row_sample)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
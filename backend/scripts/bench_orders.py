@@ -0,0 +1,131 @@
+"""
+Oversell check and order throughput benchmark.
+
+1. Fires hundreds of simultaneous single-unit orders at the 15-unit Honeycomb
+   product and checks that exactly 15 succeed and stock ends at 0.
+2. Measures orders/sec with concurrent multi-line orders against well-stocked
+   products.
+
+    python scripts/bench_orders.py --concurrency 500
+    DB_ENGINE_PROFILE=production python scripts/bench_orders.py
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+# Point the app at a scratch database before anything reads settings
+_db_dir = tempfile.mkdtemp(prefix="bench_orders_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+os.environ.setdefault("EMAIL_BACKEND", "null")
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import func, select
+from app.core.session import PRODUCTION_PROFILE
+from app.db.session import init_db, write_queue, AsyncSessionLocal
+from app.db.models.order import Order
+from app.db.models.product import Product
+from app.db.models.user import User
+from app.services.order_service import OrderService, OrderError
+
+
+async def setup() -> int:
+    async with AsyncSessionLocal() as db:
+        db.add(User(email="bench@example.com", hashed_password="x", is_active=True))
+        db.add(Product(name="Honeycomb", price=24.99, stock=15, category="Specialty"))
+        for i in range(10):
+            db.add(Product(name=f"Bulk Honey {i}", price=9.99, stock=1_000_000, category="Raw Honey"))
+        await db.commit()
+        return await db.scalar(select(User.id))
+
+
+async def place(user_id: int, lines) -> bool:
+    async with AsyncSessionLocal() as db:
+        try:
+            await OrderService.place_order(db, user_id, lines)
+            return True
+        except OrderError:
+            return False
+
+
+async def oversell_check(user_id: int, concurrency: int) -> bool:
+    results = await asyncio.gather(
+        *(place(user_id, [(1, 1)]) for _ in range(concurrency)), return_exceptions=True
+    )
+    succeeded = sum(1 for r in results if r is True)
+    errors = [r for r in results if isinstance(r, Exception)]
+
+    async with AsyncSessionLocal() as db:
+        stock = await db.scalar(select(Product.stock).where(Product.id == 1))
+        orders = await db.scalar(select(func.count(Order.id)))
+
+    ok = succeeded == 15 and stock == 0 and orders == 15
+    print(
+        f"Oversell check: {concurrency} concurrent orders for 15 units -> "
+        f"{succeeded} placed, {len(errors)} errored, final stock {stock}, {orders} orders "
+        f"{'✅' if ok else '❌'}"
+    )
+    for error in errors[:3]:
+        print(f"   {type(error).__name__}: {str(error).splitlines()[0]}")
+    return ok
+
+
+async def throughput(user_id: int, concurrency: int, total: int) -> None:
+    queue = asyncio.Queue()
+    for i in range(total):
+        queue.put_nowait([(2 + i % 10, 1), (2 + (i + 3) % 10, 2)])
+    placed = 0
+    errors: Dict[str, int] = {}
+
+    async def worker():
+        nonlocal placed
+        while not queue.empty():
+            try:
+                ok = await place(user_id, queue.get_nowait())
+                placed += ok
+            except Exception as e:
+                # e.g. "database is locked" in the default profile (a 503 over HTTP)
+                message = f"{type(e).__name__}: {str(e).splitlines()[0]}"
+                errors[message] = errors.get(message, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    print(
+        f"Throughput: {total} two-line orders in {elapsed:.2f}s -> {placed} placed "
+        f"({placed / elapsed:,.0f} orders/sec), {sum(errors.values())} errored"
+    )
+    for message, count in errors.items():
+        print(f"   {count}x {message}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--orders", type=int, default=2000)
+    args = parser.parse_args()
+
+    await init_db()
+    if PRODUCTION_PROFILE:
+        write_queue.start()
+    print(f"Engine profile: {'production' if PRODUCTION_PROFILE else 'default'}")
+
+    user_id = await setup()
+    ok = await oversell_check(user_id, args.concurrency)
+    await throughput(user_id, min(args.concurrency, 64), args.orders)
+    await write_queue.stop()
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""
+Benchmark OFFSET vs keyset (cursor) pagination on the products table.
+
+Seeds a throwaway SQLite database at increasing sizes and times fetching the
+last page with `skip` and with `after_id`. Keyset latency should stay flat as
+the table grows, while OFFSET latency grows with page depth.
+
+    python scripts/bench_pagination.py --sizes 10000 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Point the app at a scratch database before anything reads settings
+_db_dir = tempfile.mkdtemp(prefix="bench_pagination_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+os.environ["CATALOG_SNAPSHOT_ENABLED"] = "False"
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert, func, select
+from app.db.session import init_db, AsyncSessionLocal
+from app.db.models.product import Product
+from app.services.product_service import ProductService
+
+CATEGORIES = ["Raw Honey", "Premium Honey", "Specialty", "Processed Honey", "Gift Sets"]
+BATCH_SIZE = 10_000
+PAGE_SIZE = 100
+
+
+async def seed_to(target: int) -> None:
+    """Grow the products table to `target` rows."""
+    async with AsyncSessionLocal() as db:
+        current = (await db.execute(select(func.count(Product.id)))).scalar_one()
+        now = datetime.utcnow()
+        while current < target:
+            batch = min(BATCH_SIZE, target - current)
+            rows = [
+                {
+                    "name": f"Product {current + i}",
+                    "description": "Benchmark product",
+                    "price": 5 + (current + i) % 50,
+                    "stock": 10,
+                    "category": CATEGORIES[(current + i) % len(CATEGORIES)],
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(batch)
+            ]
+            await db.execute(insert(Product), rows)
+            await db.commit()
+            current += batch
+
+
+async def time_call(coro_factory, repeat: int) -> float:
+    """Median wall time in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coro_factory()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def measure(size: int, repeat: int) -> dict:
+    async with AsyncSessionLocal() as db:
+        deep_skip = size - PAGE_SIZE
+        last_id = (await db.execute(select(func.max(Product.id)))).scalar_one() - PAGE_SIZE
+
+        offset_ms = await time_call(
+            lambda: ProductService.get_all_products(db, skip=deep_skip, limit=PAGE_SIZE), repeat
+        )
+        keyset_ms = await time_call(
+            lambda: ProductService.get_all_products(db, limit=PAGE_SIZE, after_id=last_id), repeat
+        )
+        keyset_category_ms = await time_call(
+            lambda: ProductService.get_all_products(
+                db, limit=PAGE_SIZE, category=CATEGORIES[0], after_id=last_id - PAGE_SIZE * 5
+            ),
+            repeat,
+        )
+
+    return {
+        "rows": size,
+        "offset_ms": offset_ms,
+        "keyset_ms": keyset_ms,
+        "keyset_category_ms": keyset_category_ms,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--max-growth", type=float, default=3.0,
+        help="Fail if deepest keyset page is this many times slower than the smallest table"
+    )
+    args = parser.parse_args()
+
+    await init_db()
+
+    print(f"{'rows':>10} {'offset (ms)':>12} {'keyset (ms)':>12} {'keyset+cat (ms)':>16}")
+    results = []
+    for size in sorted(args.sizes):
+        await seed_to(size)
+        result = await measure(size, args.repeat)
+        results.append(result)
+        print(
+            f"{result['rows']:>10} {result['offset_ms']:>12.3f} "
+            f"{result['keyset_ms']:>12.3f} {result['keyset_category_ms']:>16.3f}"
+        )
+
+    growth = results[-1]["keyset_ms"] / max(results[0]["keyset_ms"], 1e-6)
+    print(f"\nKeyset deep-page growth: {growth:.2f}x")
+    if growth > args.max_growth:
+        print("❌ Keyset pagination latency grew with table size")
+        sys.exit(1)
+    print("✅ Keyset pagination latency is flat")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
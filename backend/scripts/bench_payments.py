@@ -0,0 +1,288 @@
+"""
+Webhook storm load test for payment ingestion.
+
+Seeds orders with pending payments in a scratch database, then plays the
+gateway: each payment is captured, declined or captured and then refunded,
+and every event is redelivered several times and shuffled, so duplicates
+arrive concurrently and captures and refunds often arrive before the
+events that preceded them. Webhooks go through the real app over httpx's ASGI
+transport.
+
+The first --fail-batches batch commits fail as if the database were
+locked, so acknowledged events must survive a failed batch. A poison event
+(a sequence SQLite cannot store) is slipped into the storm and must end up
+in the dead-letter file without holding back the rest, and the webhook must
+reject such a sequence outright. Finally the app is shut down with the
+database failing every write, and shutdown must finish within the stop
+timeout with the unpersisted event dead-lettered.
+A second round replays every event after clearing the in-memory dedup set
+(as after a restart), so only the unique event_id index stops them.
+
+Reports webhook acknowledgement latency and worker batching, then checks
+the invariants and exits 1 if any fails:
+
+- every payment ends in the status its events lead to, and so does its order
+- no payment has more than one capture applied
+- every distinct event is stored once; replays insert nothing
+
+    python scripts/bench_payments.py --payments 2000 --duplicates 3
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Point the app at a scratch database before anything reads settings
+_db_dir = tempfile.mkdtemp(prefix="bench_payments_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+os.environ.setdefault("EMAIL_BACKEND", "null")
+os.environ["PAYMENT_DEAD_LETTER_FILE"] = f"{_db_dir}/dead_letters.jsonl"
+os.environ["PAYMENT_EVENT_STOP_TIMEOUT_SECONDS"] = "2"
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import sqlite3
+import httpx
+import orjson
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import OperationalError
+from app.main import app
+from app.db.session import AsyncSessionLocal
+from app.db.models.order import Order
+from app.db.models.payment import Payment, PaymentEvent
+from app.db.models.user import User
+from app.services.payment_gateway import gateway
+from app.services.payment_service import GatewayEvent, PaymentService, payment_worker
+
+
+async def seed(count: int) -> List[str]:
+    """Create `count` placed orders, each with a pending payment."""
+    now = datetime.utcnow()
+    async with AsyncSessionLocal() as db:
+        user = User(email="bench@example.com", hashed_password="unused")
+        db.add(user)
+        await db.flush()
+        await db.execute(insert(Order), [
+            {"user_id": user.id, "status": "placed", "total": 10.0, "created_at": now, "updated_at": now}
+            for _ in range(count)
+        ])
+        order_ids = (await db.execute(select(Order.id).order_by(Order.id))).scalars().all()
+        refs = [gateway.new_reference() for _ in order_ids]
+        await db.execute(insert(Payment), [
+            {
+                "order_id": order_id, "user_id": user.id, "gateway_ref": ref, "amount": 10.0,
+                "currency": "USD", "status": "pending", "last_sequence": 0,
+                "created_at": now, "updated_at": now,
+            }
+            for order_id, ref in zip(order_ids, refs)
+        ])
+        await db.commit()
+    return refs
+
+
+OUTCOMES = ["captured", "failed", "refunded"]
+ORDER_STATUS = {"captured": "paid", "failed": "placed", "refunded": "refunded"}
+
+
+def build_storm(refs: List[str], duplicates: int, rng: random.Random) -> Tuple[List[dict], Dict[str, int]]:
+    """Shuffled, duplicated deliveries and the expected payment status counts."""
+    events = []
+    expected = dict.fromkeys(OUTCOMES, 0)
+    for ref in refs:
+        outcome = rng.choices(OUTCOMES, weights=[7, 2, 1])[0]
+        expected[outcome] += 1
+        events.extend(gateway.events_for(ref, succeed=outcome != "failed"))
+        if outcome == "refunded":
+            events.append(gateway.build_event(ref, "payment.refunded", 3))
+    storm = [event for event in events for _ in range(duplicates)]
+    rng.shuffle(storm)
+    return storm, expected
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+async def deliver(client: httpx.AsyncClient, events: List[dict], concurrency: int) -> dict:
+    latencies: List[float] = []
+    statuses = {}
+    queue = iter(events)
+
+    async def worker() -> None:
+        for event in queue:
+            body = orjson.dumps(event)
+            started = time.perf_counter()
+            response = await client.post("/api/v1/payments/webhook", content=body, headers=gateway.sign(body))
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "statuses": statuses,
+    }
+
+
+async def check(expected: Dict[str, int], distinct_events: int) -> List[str]:
+    """Return a description of every violated invariant."""
+    async with AsyncSessionLocal() as db:
+        payments = dict((await db.execute(select(Payment.status, func.count()).group_by(Payment.status))).all())
+        orders = dict((await db.execute(select(Order.status, func.count()).group_by(Order.status))).all())
+        uncaptured = await db.scalar(
+            select(func.count()).where(Payment.status.in_(["captured", "refunded"]), Payment.captured_at.is_(None))
+        )
+        stored = await db.scalar(select(func.count()).select_from(PaymentEvent))
+        double = await db.scalar(
+            select(func.count()).select_from(
+                select(PaymentEvent.gateway_ref)
+                .where(PaymentEvent.event_type == "payment.captured", PaymentEvent.applied.is_(True))
+                .group_by(PaymentEvent.gateway_ref)
+                .having(func.count() > 1)
+                .subquery()
+            )
+        )
+
+    failures = []
+    for outcome, count in expected.items():
+        if payments.get(outcome, 0) != count:
+            failures.append(f"{payments.get(outcome, 0)} payments {outcome}, expected {count}")
+        order_status = ORDER_STATUS[outcome]
+        if orders.get(order_status, 0) != count:
+            failures.append(f"{orders.get(order_status, 0)} orders {order_status}, expected {count}")
+    if uncaptured:
+        failures.append(f"{uncaptured} captured payments without captured_at")
+    if stored != distinct_events:
+        failures.append(f"{stored} events stored, expected {distinct_events}")
+    if double:
+        failures.append(f"{double} payments captured more than once")
+    return failures
+
+
+# Batch commits still to fail with a transient error
+injected_failures = {"remaining": 0}
+
+
+def inject_failures() -> None:
+    """Make the worker's next injected_failures["remaining"] batch commits raise."""
+    apply_events = PaymentService.apply_events
+
+    async def failing_apply_events(session, events):
+        if injected_failures["remaining"] > 0:
+            injected_failures["remaining"] -= 1
+            raise OperationalError("INSERT INTO payment_events", {}, sqlite3.OperationalError("database is locked"))
+        return await apply_events(session, events)
+
+    PaymentService.apply_events = staticmethod(failing_apply_events)
+
+
+def dead_letters() -> List[dict]:
+    path = payment_worker.dead_letter_path
+    if not path.exists():
+        return []
+    return [orjson.loads(line) for line in path.read_text().splitlines()]
+
+
+async def main_async(args) -> int:
+    rng = random.Random(args.seed)
+    inject_failures()
+    injected_failures["remaining"] = args.fail_batches
+    failures = []
+    async with app.router.lifespan_context(app):
+        refs = await seed(args.payments)
+        storm, expected = build_storm(refs, args.duplicates, rng)
+        distinct = len({event["id"] for event in storm})
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            print(f"Storm: {len(storm)} deliveries of {distinct} events for {args.payments} payments")
+            payment_worker.offer(GatewayEvent("evt_poison", "payment.captured", refs[0], 2 ** 64))
+            storm_result = await deliver(client, storm, args.concurrency)
+            await payment_worker.drain()
+            after_storm = payment_worker.stats()
+
+            # Replay everything with a cold in-memory set (as after a restart)
+            payment_worker.forget_seen()
+            replay = list({event["id"]: event for event in storm}.values())
+            rng.shuffle(replay)
+            replay_result = await deliver(client, replay, args.concurrency)
+            await payment_worker.drain()
+            stats = payment_worker.stats()
+
+            oversized = gateway.build_event(refs[0], "payment.captured", 2 ** 64)
+            body = json.dumps(oversized).encode()  # orjson refuses ints above 64 bits
+            response = await client.post("/api/v1/payments/webhook", content=body, headers=gateway.sign(body))
+            if response.status_code != 400:
+                failures.append(f"webhook with a 2**64 sequence returned {response.status_code}, expected 400")
+
+        for name, result in (("storm", storm_result), ("cold replay", replay_result)):
+            print(
+                f"{name:<12} {result['requests']:>7} req {result['throughput_rps']:>9.1f} req/s "
+                f"p50 {result['p50_ms']:>7.3f} ms  p99 {result['p99_ms']:>7.3f} ms  {result['statuses']}"
+            )
+        print(
+            f"worker       {stats['batches']} batches, {stats['new']} new, {stats['applied']} applied, "
+            f"{stats['stale']} stale, {stats['conflicts']} conflicts, "
+            f"{stats['failed_batches']} failed and retried {stats['retries']} times, "
+            f"{stats['dead_letters']} dead-lettered"
+        )
+
+        failures += await check(expected, distinct)
+        if stats["new"] != after_storm["new"]:
+            failures.append(f"cold replay inserted {stats['new'] - after_storm['new']} events")
+        if [letter["event_id"] for letter in dead_letters()] != ["evt_poison"]:
+            failures.append(f"dead letters {dead_letters()}, expected only the poison event")
+
+        # Shut down while every write fails: stop() must give up in time
+        injected_failures["remaining"] = 10 ** 9
+        payment_worker.max_attempts = 10 ** 9
+        payment_worker.offer(GatewayEvent("evt_stranded", "payment.captured", refs[0], 9))
+        shutdown_started = time.perf_counter()
+    shutdown_seconds = time.perf_counter() - shutdown_started
+    print(f"shutdown     {shutdown_seconds:.1f}s with the database failing every write")
+    if shutdown_seconds > payment_worker.stop_timeout + 5:
+        failures.append(f"shutdown took {shutdown_seconds:.1f}s (stop timeout {payment_worker.stop_timeout}s)")
+    if "evt_stranded" not in [letter["event_id"] for letter in dead_letters()]:
+        failures.append("the event left in the queue at shutdown was not dead-lettered")
+
+    if failures:
+        print("\n❌ Invariants violated:")
+        for line in failures:
+            print(f"  - {line}")
+        return 1
+    print("\n✅ Every payment settled once; duplicates, reordering, replays, failed batches and a poison event had no effect")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payments", type=int, default=2000)
+    parser.add_argument("--duplicates", type=int, default=3, help="Deliveries of every event")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--fail-batches", type=int, default=2, help="Batch commits made to fail at the start")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark full-text product search (SQLite FTS5 + bm25).
+
+Seeds a throwaway database with generated products (the FTS index is kept
+in sync by triggers during the load) and times first and second pages for
+a few representative queries at each size.
+
+    python scripts/bench_search.py --sizes 100000 1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Point the app at a scratch database before anything reads settings
+_db_dir = tempfile.mkdtemp(prefix="bench_search_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert, func, select
+from app.db.session import init_db, AsyncSessionLocal
+from app.db.models.product import Product
+from app.services.product_service import ProductService
+
+FLORAL = ["wildflower", "manuka", "acacia", "buckwheat", "clover", "orange blossom", "lavender", "heather"]
+STYLE = ["raw", "creamed", "infused", "organic", "unfiltered", "whipped"]
+CATEGORIES = ["Raw Honey", "Premium Honey", "Specialty", "Processed Honey", "Gift Sets"]
+QUERIES = ["manuka", "raw wildflower", "organic lav", "creamed clover honey", "batch 4242"]
+BATCH_SIZE = 10_000
+
+
+async def seed_to(target: int, rng: random.Random) -> None:
+    """Grow the products table to `target` rows."""
+    async with AsyncSessionLocal() as db:
+        current = (await db.execute(select(func.count(Product.id)))).scalar_one()
+        now = datetime.utcnow()
+        while current < target:
+            batch = min(BATCH_SIZE, target - current)
+            rows = []
+            for i in range(batch):
+                floral, style = rng.choice(FLORAL), rng.choice(STYLE)
+                rows.append({
+                    "name": f"{style.title()} {floral.title()} Honey #{current + i}",
+                    "description": f"{style} {floral} honey, {rng.choice(FLORAL)} notes, batch {current + i}",
+                    "price": rng.randint(5, 60),
+                    "stock": rng.randint(0, 100),
+                    "category": rng.choice(CATEGORIES),
+                    "created_at": now,
+                    "updated_at": now,
+                })
+            await db.execute(insert(Product), rows)
+            await db.commit()
+            current += batch
+
+
+async def median_ms(coro_factory, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coro_factory()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    await init_db()
+    rng = random.Random(42)
+
+    print(f"{'rows':>10}  {'query':<22} {'page 1 (ms)':>12} {'page 2 (ms)':>12}")
+    for size in sorted(args.sizes):
+        await seed_to(size, rng)
+        async with AsyncSessionLocal() as db:
+            for query in QUERIES:
+                first = await ProductService.search_products(db, query, args.limit)
+                after = (first[-1][1], first[-1][0].id) if first else None
+                page1 = await median_ms(
+                    lambda: ProductService.search_products(db, query, args.limit), args.repeat
+                )
+                page2 = await median_ms(
+                    lambda: ProductService.search_products(db, query, args.limit, after), args.repeat
+                )
+                print(f"{size:>10}  {query:<22} {page1:>12.2f} {page2:>12.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""
+Benchmark product list serialization: response_model vs cached fragments.
+
+Compares the default FastAPI path (validate each row through
+ProductResponse, then json.dumps) with the pre-serialized orjson fragments
+used by the product endpoints, cold (empty cache) and warm, on 100-item
+pages. Also checks that both paths produce the same JSON.
+
+    python scripts/bench_serialization.py --pages 2000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pydantic import TypeAdapter
+from app.api.v1.products import ProductResponse
+from app.services.catalog_snapshot import ProductRecord
+from app.services.product_fragments import product_list_json, fragment_cache
+
+PAGE_SIZE = 100
+
+
+def make_products(count: int) -> List[ProductRecord]:
+    now = datetime(2024, 1, 1, 12, 0, 0, 123456)
+    return [
+        ProductRecord(
+            id=i,
+            sku=f"SKU-{i:06d}",
+            name=f"Himalayan Wild Honey {i}",
+            description="Raw, unfiltered honey harvested from high-altitude wild hives. " * 2,
+            price=round(5 + (i % 400) * 0.25, 2),
+            stock=i % 120,
+            image_url=f"https://example.com/images/{i}.jpg",
+            category="Raw Honey",
+            created_at=now + timedelta(seconds=i),
+            updated_at=now + timedelta(seconds=i),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=2000, help="Pages to serialize per run")
+    parser.add_argument("--catalog", type=int, default=5000, help="Distinct products to page through")
+    args = parser.parse_args()
+
+    products = make_products(args.catalog)
+    pages = [
+        products[(i * PAGE_SIZE) % args.catalog:][:PAGE_SIZE]
+        for i in range(args.pages)
+    ]
+    adapter = TypeAdapter(List[ProductResponse])
+
+    def response_model_path(page) -> bytes:
+        # What FastAPI does for response_model=List[ProductResponse]
+        content = adapter.dump_python(adapter.validate_python(page, from_attributes=True), mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    assert json.loads(response_model_path(pages[0])) == json.loads(product_list_json(pages[0])), \
+        "fragment JSON differs from ProductResponse JSON"
+
+    def timed(fn) -> float:
+        started = time.perf_counter()
+        for page in pages:
+            fn(page)
+        return time.perf_counter() - started
+
+    baseline = timed(response_model_path)
+    fragment_cache.clear()
+    cold = timed(product_list_json)
+    warm = timed(product_list_json)
+
+    print(f"{'path':<24} {'pages/s':>10} {'us/page':>10} {'speedup':>8}")
+    for name, elapsed in (("response_model", baseline), ("fragments (cold)", cold), ("fragments (warm)", warm)):
+        print(
+            f"{name:<24} {args.pages / elapsed:>10.0f} {elapsed / args.pages * 1e6:>10.1f} "
+            f"{baseline / elapsed:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Stress test for single-flight catalog reads.
+
+Runs the real app in-process (httpx ASGI transport) against a seeded
+scratch database and fires bursts of identical concurrent requests at a
+product page, a category listing and the facets, first with
+SINGLE_FLIGHT_ENABLED off and then on. It counts the catalog SQL statements
+each burst executes and reports burst time and p50/p99 latency.
+
+With single-flight on, a burst must cost the same number of statements as
+one lone request (one per distinct query, however many clients), and every
+response must equal the lone request's. Before the bursts, SingleFlight
+itself is checked: a leader's error reaches every follower, followers
+stop waiting after max_wait, and a cancelled leader hands over to a new
+one. Exits 1 on any failure.
+
+    python scripts/bench_single_flight.py --concurrency 200 --bursts 10
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Point the app at a scratch database before anything reads settings
+_db_dir = tempfile.mkdtemp(prefix="bench_single_flight_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/bench.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+os.environ.setdefault("EMAIL_BACKEND", "null")
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+from sqlalchemy import event, insert
+from app.main import app
+from app.core.config import settings
+from app.core.session import engine, read_engine
+from app.db.session import AsyncSessionLocal, init_db
+from app.db.models.product import Product
+from app.services.product_service import read_flights
+from app.utils.single_flight import SingleFlight
+
+CATEGORIES = ["Raw Honey", "Premium Honey", "Specialty", "Processed Honey", "Gift Sets"]
+SCENARIOS = {
+    "product_detail": "/api/v1/products/42",
+    "category_list": "/api/v1/products/?category=Raw%20Honey&limit=20&sort=price",
+    "facets": "/api/v1/products/facets",
+}
+
+catalog_statements = 0
+
+
+def count_catalog_statements(conn, cursor, statement, parameters, context, executemany):
+    # Only product reads: background workers (outbox) poll other tables
+    global catalog_statements
+    if "FROM products" in statement or "FROM category_facets" in statement:
+        catalog_statements += 1
+
+
+async def seed(product_count: int) -> None:
+    now = datetime.utcnow()
+    rows = [
+        {
+            "name": f"Campaign Honey {i}",
+            "description": "Seeded by bench_single_flight.py",
+            "price": round(5 + (i % 400) * 0.25, 2),
+            "stock": i % 7,
+            "category": CATEGORIES[i % len(CATEGORIES)],
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(product_count)
+    ]
+    async with AsyncSessionLocal() as db:
+        await db.execute(insert(Product), rows)
+        await db.commit()
+
+
+async def check_semantics() -> list:
+    failures = []
+    flights = SingleFlight(max_wait=0.2)
+    calls = 0
+
+    async def query(result=1, delay=0.05, error=None):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    results = await asyncio.gather(
+        *(flights.do("error", lambda: query(error=ValueError("boom"))) for _ in range(20)),
+        return_exceptions=True
+    )
+    if calls != 1 or not all(isinstance(result, ValueError) for result in results):
+        failures.append(f"leader error: {calls} calls, results {set(map(repr, results))}")
+
+    calls = 0
+    results = await asyncio.gather(*(flights.do("slow", lambda: query(delay=0.5)) for _ in range(5)))
+    if results != [1] * 5 or flights.timeouts != 4:
+        failures.append(f"max_wait: results {results}, {flights.timeouts} timeouts (expected 4)")
+
+    calls = 0
+    leader = asyncio.ensure_future(flights.do("cancel", lambda: query(delay=0.1)))
+    await asyncio.sleep(0)
+    followers = [asyncio.ensure_future(flights.do("cancel", lambda: query(result=2, delay=0.01))) for _ in range(5)]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+    results = await asyncio.gather(*followers)
+    if results != [2] * 5 or calls != 2:
+        failures.append(f"cancelled leader: results {results}, {calls} calls (expected 2)")
+    return failures
+
+
+async def burst(client: httpx.AsyncClient, path: str, concurrency: int):
+    async def timed_get():
+        started = time.perf_counter()
+        response = await client.get(path)
+        return response, time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(timed_get() for _ in range(concurrency)))
+    return results, time.perf_counter() - started
+
+
+async def main_async(args) -> int:
+    global catalog_statements
+    await init_db()
+    await seed(args.products)
+    for bound_engine in {engine, read_engine}:
+        event.listen(bound_engine.sync_engine, "before_cursor_execute", count_catalog_statements)
+
+    failures = await check_semantics()
+    if not failures:
+        print("✅ Leader errors reach every follower, max_wait caps waiting, a cancelled leader hands over")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"\n{args.bursts} bursts of {args.concurrency} identical requests:")
+        print(f"  {'scenario':<16} {'single-flight':<14} {'stmts/burst':>12} {'burst ms':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for name, path in SCENARIOS.items():
+            catalog_statements = 0
+            lone = await client.get(path)
+            per_request = catalog_statements
+
+            for enabled in (False, True):
+                settings.SINGLE_FLIGHT_ENABLED = enabled
+                statements, burst_seconds, latencies = [], [], []
+                for _ in range(args.bursts):
+                    catalog_statements = 0
+                    results, seconds = await burst(client, path, args.concurrency)
+                    statements.append(catalog_statements)
+                    burst_seconds.append(seconds)
+                    latencies.extend(latency for _, latency in results)
+                    if any(response.content != lone.content for response, _ in results):
+                        failures.append(f"{name}: a burst response differs from a lone request's")
+
+                latencies.sort()
+                print(
+                    f"  {name:<16} {'on' if enabled else 'off':<14} {max(statements):>12} "
+                    f"{sum(burst_seconds) / len(burst_seconds) * 1000:>9.1f} "
+                    f"{latencies[len(latencies) // 2] * 1000:>8.1f} {latencies[int(len(latencies) * 0.99)] * 1000:>8.1f}"
+                )
+                if enabled and max(statements) != per_request:
+                    failures.append(
+                        f"{name}: up to {max(statements)} statements per burst, a lone request runs {per_request}"
+                    )
+
+    print(f"\n   single-flight: {read_flights.stats()}")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+    print("✅ Every burst ran the same statements as one request")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200, help="Identical requests per burst")
+    parser.add_argument("--bursts", type=int, default=10)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
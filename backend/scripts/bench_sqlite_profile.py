@@ -0,0 +1,129 @@
+"""
+Concurrent read/write benchmark: default vs production SQLite engine profile.
+
+Each profile runs in its own process against a fresh seeded database. Reader
+tasks page through products while writer tasks create products; the report
+shows reads/sec, writes/sec and failed operations (e.g. `database is locked`).
+
+    python scripts/bench_sqlite_profile.py --readers 32 --writers 8 --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROFILES = ("default", "production")
+
+
+async def run_profile(args) -> dict:
+    # Add parent directory to path
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+
+    from sqlalchemy import insert
+    from app.db.session import init_db, write_queue, AsyncSessionLocal, ReadSessionLocal
+    from app.core.session import PRODUCTION_PROFILE
+    from app.db.models.product import Product
+    from app.services.product_service import ProductService
+
+    await init_db()
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            insert(Product),
+            [{"name": f"Seed {i}", "price": 10.0, "stock": 5, "category": "Raw Honey"} for i in range(args.seed_rows)],
+        )
+        await db.commit()
+
+    if PRODUCTION_PROFILE:
+        write_queue.start()
+
+    counts = {"reads": 0, "writes": 0, "read_errors": 0, "write_errors": 0}
+    deadline = time.perf_counter() + args.seconds
+
+    async def reader(rng: random.Random):
+        while time.perf_counter() < deadline:
+            try:
+                async with ReadSessionLocal() as db:
+                    await ProductService.get_all_products(
+                        db, limit=20, after_id=rng.randint(0, args.seed_rows)
+                    )
+                counts["reads"] += 1
+            except Exception:
+                counts["read_errors"] += 1
+
+    async def writer(n: int):
+        i = 0
+        while time.perf_counter() < deadline:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await ProductService.create_product(
+                        db, name=f"Writer {n}-{i}", description=None, price=12.5, stock=3
+                    )
+                counts["writes"] += 1
+            except Exception:
+                counts["write_errors"] += 1
+            i += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(reader(random.Random(n)) for n in range(args.readers)),
+        *(writer(n) for n in range(args.writers)),
+    )
+    elapsed = time.perf_counter() - started
+    await write_queue.stop()
+
+    return {
+        **counts,
+        "reads_per_sec": counts["reads"] / elapsed,
+        "writes_per_sec": counts["writes"] / elapsed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=32)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--seed-rows", type=int, default=10_000)
+    parser.add_argument("--profile", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.profile:
+        # Child process: settings are read from the environment at import time
+        print(json.dumps(asyncio.run(run_profile(args))))
+        return
+
+    results = {}
+    for profile in PROFILES:
+        db_dir = tempfile.mkdtemp(prefix=f"bench_{profile}_")
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite+aiosqlite:///{db_dir}/bench.db",
+            "DB_ENGINE_PROFILE": profile,
+            "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark-secret"),
+            "DEBUG": "False",
+            "CATALOG_SNAPSHOT_ENABLED": "False",
+        }
+        child = subprocess.run(
+            [sys.executable, __file__, "--profile", profile,
+             "--readers", str(args.readers), "--writers", str(args.writers),
+             "--seconds", str(args.seconds), "--seed-rows", str(args.seed_rows)],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        results[profile] = json.loads(child.stdout.strip().splitlines()[-1])
+
+    print(f"{'profile':<12} {'reads/s':>10} {'writes/s':>10} {'read errs':>10} {'write errs':>11}")
+    for profile, r in results.items():
+        print(
+            f"{profile:<12} {r['reads_per_sec']:>10.0f} {r['writes_per_sec']:>10.0f} "
+            f"{r['read_errors']:>10} {r['write_errors']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
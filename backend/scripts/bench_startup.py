@@ -0,0 +1,86 @@
+"""
+Measure worker cold-start time.
+
+Starts fresh Python processes that import `app.main` and run its startup
+(lifespan) against a scratch database, the way a new uvicorn worker does,
+and reports import + startup time. The first run migrates the empty
+database; the following runs hit the fast path (schema already current).
+
+    python scripts/bench_startup.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+CHILD = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app, startup_stats
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        pass
+
+asyncio.run(boot())
+print(json.dumps({
+    "import_seconds": imported - started,
+    "schema_seconds": startup_stats["schema_seconds"],
+    "ready_seconds": startup_stats["ready_seconds"],
+}))
+"""
+
+
+def run_once(env) -> dict:
+    started = time.perf_counter()
+    child = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    result = json.loads(child.stdout.strip().splitlines()[-1])
+    result["process_seconds"] = time.perf_counter() - started
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Warm-start runs after the first (migrating) run")
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix="bench_startup_")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{db_dir}/bench.db",
+        "SECRET_KEY": os.environ.get("SECRET_KEY", "benchmark-secret"),
+        "DEBUG": "False",
+        "PYTHONPATH": str(BACKEND_DIR),
+    }
+
+    first = run_once(env)
+    runs = [run_once(env) for _ in range(args.runs)]
+
+    def ms(value: float) -> str:
+        return f"{value * 1000:>9.1f}"
+
+    print(f"{'':<22} {'import':>9} {'schema':>9} {'ready':>9} {'process':>9}  (ms)")
+    print(
+        f"{'first (migrates)':<22} {ms(first['import_seconds'])} {ms(first['schema_seconds'])} "
+        f"{ms(first['ready_seconds'])} {ms(first['process_seconds'])}"
+    )
+    medians = {key: statistics.median(r[key] for r in runs) for key in first}
+    print(
+        f"{f'median of {args.runs} (current)':<22} {ms(medians['import_seconds'])} "
+        f"{ms(medians['schema_seconds'])} {ms(medians['ready_seconds'])} {ms(medians['process_seconds'])}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Query plan regression check for the product listing.
+
+Runs `EXPLAIN QUERY PLAN` on ProductService.build_list_query for every
+filter/sort combination (category, min/max price, in_stock, each sort, with
+and without a keyset cursor) and fails if any plan
+
+- sorts with a temp B-tree instead of walking an index in order,
+- scans the table other than in id (rowid) order, or
+- drives the query from a different index than the one meant for it.
+
+Plans are checked on an empty catalog (no statistics, as in production),
+then again after seeding and ANALYZE. Finally every combination is paged
+through twice, once from SQL and once from the in-process catalog snapshot,
+and the pages must match. Exits 1 on any failure.
+
+    python scripts/check_query_plans.py --products 20000
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Point the app at a scratch database before anything reads settings
+_db_dir = tempfile.mkdtemp(prefix="check_query_plans_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/check.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ["DEBUG"] = "False"
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert, text
+from sqlalchemy.dialects import sqlite
+from app.db.session import AsyncSessionLocal, init_db
+from app.db.models.product import Product
+from app.services.catalog_snapshot import CatalogSnapshot, ProductRecord
+from app.services.product_service import ProductService, PRODUCT_SORTS
+
+CATEGORIES = ["Raw Honey", "Premium Honey", "Specialty", "Gift Sets", None]
+CATEGORY = "Raw Honey"
+
+# sort -> (index without category, index with category); None is the rowid
+EXPECTED_INDEX = {
+    "id": (None, "ix_products_category_id"),
+    "price": ("ix_products_price", "ix_products_category_price"),
+    "newest": ("ix_products_created_at", "ix_products_category_created_at"),
+    "name": ("ix_products_name", "ix_products_category_name"),
+}
+CURSOR_KEYS = {None: None, "price": 20.0, "created_at": datetime(2026, 1, 1), "name": "M"}
+
+# Compile with named parameters so the SQL can be prefixed and re-executed
+NAMED = sqlite.dialect(paramstyle="named")
+
+
+def combinations():
+    for category, min_price, max_price, in_stock, sort, cursor in itertools.product(
+        [None, CATEGORY], [None, 10.0], [None, 50.0], [None, True, False], PRODUCT_SORTS, [False, True]
+    ):
+        yield {
+            "category": category,
+            "min_price": min_price,
+            "max_price": max_price,
+            "in_stock": in_stock,
+            "sort": sort,
+            "after_id": 100 if cursor else None,
+            "after_key": CURSOR_KEYS[PRODUCT_SORTS[sort][0]] if cursor else None,
+        }
+
+
+def plan_problems(case: dict, plan: list) -> list:
+    problems = []
+    if any("TEMP B-TREE" in step for step in plan):
+        problems.append("sorts with a temp B-tree")
+
+    expected = EXPECTED_INDEX[case["sort"]][1 if case["category"] else 0]
+    used = [match for step in plan for match in re.findall(r"USING (?:COVERING )?INDEX (\w+)", step)]
+    if expected is None:
+        if used or not any("INTEGER PRIMARY KEY" in step or step == "SCAN products" for step in plan):
+            problems.append("does not walk products in rowid order")
+    elif used != [expected]:
+        problems.append(f"uses {used or 'a table scan'}, expected {expected}")
+    return problems
+
+
+async def check_plans(db, label: str) -> int:
+    failures = 0
+    for case in combinations():
+        query = ProductService.build_list_query(**case).limit(20)
+        compiled = query.compile(dialect=NAMED)
+        rows = await db.execute(text(f"EXPLAIN QUERY PLAN {compiled}"), compiled.params)
+        plan = [row[3] for row in rows]
+        problems = plan_problems(case, plan)
+        if problems:
+            failures += 1
+            shown = {name: value for name, value in case.items() if value is not None}
+            print(f"❌ [{label}] {shown}: {'; '.join(problems)}")
+            for step in plan:
+                print(f"     {step}")
+    return failures
+
+
+async def seed(db, count: int, rng: random.Random) -> None:
+    start = datetime(2025, 1, 1)
+    rows = [
+        {
+            "name": f"{rng.choice(['Raw', 'Creamed', 'Manuka', 'Clover'])} Honey {i}",
+            "price": rng.choice([9.99, 15.0, 24.5, rng.uniform(1, 100)]),
+            "stock": rng.choice([0, 0, 3, 40]),
+            "category": rng.choice(CATEGORIES),
+            # Batches share a timestamp so ties on created_at are common
+            "created_at": start + timedelta(minutes=i // 50),
+            "updated_at": start,
+        }
+        for i in range(count)
+    ]
+    for batch in range(0, count, 10000):
+        await db.execute(insert(Product), rows[batch:batch + 10000])
+    await db.commit()
+
+
+async def check_pages(db, snapshot: CatalogSnapshot, page_size: int = 25) -> int:
+    """Page through every combination from SQL and the snapshot; pages must match."""
+    failures = 0
+    for case in combinations():
+        if case["after_id"] is not None:
+            continue
+        attribute, descending = PRODUCT_SORTS[case["sort"]]
+        after_id = after_key = None
+        for page in range(3):
+            listing = dict(case, after_id=after_id, after_key=after_key)
+            query = ProductService.build_list_query(**listing).limit(page_size)
+            from_db = [product.id for product in (await db.execute(query)).scalars()]
+            from_snapshot = [
+                record.id for record in snapshot.list_products(
+                    0, page_size, case["category"], after_id,
+                    min_price=case["min_price"],
+                    max_price=case["max_price"],
+                    in_stock=case["in_stock"],
+                    order_by=attribute,
+                    descending=descending,
+                    after_key=after_key
+                )
+            ]
+            if from_db != from_snapshot:
+                failures += 1
+                shown = {name: value for name, value in listing.items() if value is not None}
+                print(f"❌ page {page + 1} differs for {shown}:\n     sql      {from_db}\n     snapshot {from_snapshot}")
+                break
+            if len(from_db) < page_size:
+                break
+            last = snapshot.get_product(from_db[-1])
+            after_id = last.id
+            after_key = getattr(last, attribute) if attribute else None
+    return failures
+
+
+async def main_async(args) -> int:
+    await init_db()
+    rng = random.Random(args.seed)
+    total = len(list(combinations()))
+
+    async with AsyncSessionLocal() as db:
+        failures = await check_plans(db, "no statistics")
+        await seed(db, args.products, rng)
+        await db.execute(text("ANALYZE"))
+        failures += await check_plans(db, "after ANALYZE")
+
+        products = (await db.execute(Product.__table__.select())).all()
+        snapshot = CatalogSnapshot([ProductRecord(**row._mapping) for row in products], version=1)
+        page_failures = await check_pages(db, snapshot)
+
+    if failures or page_failures:
+        print(f"\n❌ {failures} bad plans ({total} combinations x 2), {page_failures} page mismatches")
+        return 1
+    print(f"✅ {total} listing combinations use their index in order, with and without statistics")
+    print("✅ SQL and snapshot listings page identically")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=20000, help="Rows seeded before ANALYZE")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
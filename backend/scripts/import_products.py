@@ -0,0 +1,60 @@
+"""
+Bulk product import from a CSV or NDJSON file.
+Streams the file in chunks and upserts by SKU, printing rows/sec at the end.
+
+    python scripts/import_products.py supplier_feed.csv
+    python scripts/import_products.py feed.ndjson --no-upsert --chunk-size 10000
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.config import settings
+from app.db.session import init_db, AsyncSessionLocal
+from app.services.import_service import ProductImportService, iter_file_lines, SUPPORTED_FORMATS
+
+
+def detect_format(path: str) -> str:
+    suffix = Path(path).suffix.lower().lstrip(".")
+    return "ndjson" if suffix in ("ndjson", "jsonl") else "csv"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="CSV (with header) or NDJSON file")
+    parser.add_argument("--format", choices=SUPPORTED_FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    parser.add_argument("--no-upsert", action="store_true", help="Skip rows whose SKU already exists")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+
+    print("🚀 Initializing database...")
+    await init_db()
+
+    print(f"📦 Importing {args.path} ({fmt}, chunks of {args.chunk_size})...")
+    async with AsyncSessionLocal() as db:
+        report = await ProductImportService.import_products(
+            db,
+            iter_file_lines(args.path),
+            fmt=fmt,
+            chunk_size=args.chunk_size,
+            upsert=not args.no_upsert,
+        )
+
+    for error in report.errors:
+        print(f"⚠️  line {error['line']}: {error['error']}")
+
+    print(
+        f"\n✨ Imported {report.written} of {report.rows} rows "
+        f"({report.skipped} skipped, {report.failed} failed) in {report.elapsed_seconds:.1f}s "
+        f"— {report.rows_per_second:,.0f} rows/sec"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,107 +1,162 @@
 """
 Database initialization script with sample data.
-Run this to create tables and populate with sample products.
+Run this to migrate the schema and make sure the sample products exist.
+
+Safe to run on every deploy: migrations only run when the database is
+behind, and sample products are upserted by SKU (missing ones are inserted,
+existing ones are left untouched), so restarts never duplicate data.
+Databases seeded by the old script, which inserted the samples again on
+every run, keep the oldest copy of each sample and lose the others.
 """
 import asyncio
 import sys
+import time
 from pathlib import Path
+from typing import Tuple
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from sqlalchemy import delete, select, update, func
 from app.db.session import init_db, AsyncSessionLocal
-from app.services.product_service import ProductService
+from app.db.models.product import Product
+from app.db.models.order import OrderItem
+from app.services.import_service import ProductImportService, ProductImportRow
+
+SAMPLE_PRODUCTS = [
+    {
+        "sku": "HONEY-WILDFLOWER",
+        "name": "Wildflower Honey",
+        "description": "Pure, raw wildflower honey harvested from local wildflower meadows. Rich, complex flavor with floral notes.",
+        "price": 12.99,
+        "stock": 50,
+        "category": "Raw Honey",
+        "image_url": "https://images.unsplash.com/photo-1587049352846-4a222e784d38?w=500"
+    },
+    {
+        "sku": "HONEY-MANUKA",
+        "name": "Manuka Honey",
+        "description": "Premium Manuka honey from New Zealand with MGO 400+. Known for its unique health properties.",
+        "price": 49.99,
+        "stock": 25,
+        "category": "Premium Honey",
+        "image_url": "https://images.unsplash.com/photo-1599940824399-b87987ceb72a?w=500"
+    },
+    {
+        "sku": "HONEY-ACACIA",
+        "name": "Acacia Honey",
+        "description": "Light, delicate acacia honey. Stays liquid longer and has a mild, sweet taste.",
+        "price": 15.99,
+        "stock": 40,
+        "category": "Raw Honey",
+        "image_url": "https://images.unsplash.com/photo-1558642891-54be180ea339?w=500"
+    },
+    {
+        "sku": "HONEY-BUCKWHEAT",
+        "name": "Buckwheat Honey",
+        "description": "Dark, robust buckwheat honey with a strong, malty flavor. High in antioxidants.",
+        "price": 13.99,
+        "stock": 30,
+        "category": "Raw Honey",
+        "image_url": "https://images.unsplash.com/photo-1471943038103-4d0cb4c1f29e?w=500"
+    },
+    {
+        "sku": "HONEY-COMB",
+        "name": "Honeycomb",
+        "description": "Pure honeycomb straight from the hive. Edible wax filled with raw honey.",
+        "price": 24.99,
+        "stock": 15,
+        "category": "Specialty",
+        "image_url": "https://images.unsplash.com/photo-1600671708877-379f7ca534f5?w=500"
+    },
+    {
+        "sku": "HONEY-CREAMED",
+        "name": "Creamed Honey",
+        "description": "Smooth, spreadable creamed honey. Perfect for toast and baking.",
+        "price": 11.99,
+        "stock": 60,
+        "category": "Processed Honey",
+        "image_url": "https://images.unsplash.com/photo-1587049633312-d628ae50a8ae?w=500"
+    },
+    {
+        "sku": "HONEY-ORANGE-BLOSSOM",
+        "name": "Orange Blossom Honey",
+        "description": "Citrus-scented honey from orange groves. Light color with a fresh, fruity taste.",
+        "price": 14.99,
+        "stock": 35,
+        "category": "Raw Honey",
+        "image_url": "https://images.unsplash.com/photo-1568486447706-98e1ba40c4f5?w=500"
+    },
+    {
+        "sku": "HONEY-GIFT-SET",
+        "name": "Honey Gift Set",
+        "description": "Curated selection of 4 different honey varieties in 8oz jars. Perfect gift!",
+        "price": 39.99,
+        "stock": 20,
+        "category": "Gift Sets",
+        "image_url": "https://images.unsplash.com/photo-1607024875535-c8dd6fda9cd9?w=500"
+    }
+]
 
 
-async def create_sample_products():
-    """Create sample honey products."""
+async def seed_sample_products() -> Tuple[int, int]:
+    """
+    Insert any sample products that are missing (matched by SKU).
+    
+    Returns (created, duplicates removed).
+    """
+    removed = 0
     async with AsyncSessionLocal() as db:
-        sample_products = [
-            {
-                "name": "Wildflower Honey",
-                "description": "Pure, raw wildflower honey harvested from local wildflower meadows. Rich, complex flavor with floral notes.",
-                "price": 12.99,
-                "stock": 50,
-                "category": "Raw Honey",
-                "image_url": "https://images.unsplash.com/photo-1587049352846-4a222e784d38?w=500"
-            },
-            {
-                "name": "Manuka Honey",
-                "description": "Premium Manuka honey from New Zealand with MGO 400+. Known for its unique health properties.",
-                "price": 49.99,
-                "stock": 25,
-                "category": "Premium Honey",
-                "image_url": "https://images.unsplash.com/photo-1599940824399-b87987ceb72a?w=500"
-            },
-            {
-                "name": "Acacia Honey",
-                "description": "Light, delicate acacia honey. Stays liquid longer and has a mild, sweet taste.",
-                "price": 15.99,
-                "stock": 40,
-                "category": "Raw Honey",
-                "image_url": "https://images.unsplash.com/photo-1558642891-54be180ea339?w=500"
-            },
-            {
-                "name": "Buckwheat Honey",
-                "description": "Dark, robust buckwheat honey with a strong, malty flavor. High in antioxidants.",
-                "price": 13.99,
-                "stock": 30,
-                "category": "Raw Honey",
-                "image_url": "https://images.unsplash.com/photo-1471943038103-4d0cb4c1f29e?w=500"
-            },
-            {
-                "name": "Honeycomb",
-                "description": "Pure honeycomb straight from the hive. Edible wax filled with raw honey.",
-                "price": 24.99,
-                "stock": 15,
-                "category": "Specialty",
-                "image_url": "https://images.unsplash.com/photo-1600671708877-379f7ca534f5?w=500"
-            },
-            {
-                "name": "Creamed Honey",
-                "description": "Smooth, spreadable creamed honey. Perfect for toast and baking.",
-                "price": 11.99,
-                "stock": 60,
-                "category": "Processed Honey",
-                "image_url": "https://images.unsplash.com/photo-1587049633312-d628ae50a8ae?w=500"
-            },
-            {
-                "name": "Orange Blossom Honey",
-                "description": "Citrus-scented honey from orange groves. Light color with a fresh, fruity taste.",
-                "price": 14.99,
-                "stock": 35,
-                "category": "Raw Honey",
-                "image_url": "https://images.unsplash.com/photo-1568486447706-98e1ba40c4f5?w=500"
-            },
-            {
-                "name": "Honey Gift Set",
-                "description": "Curated selection of 4 different honey varieties in 8oz jars. Perfect gift!",
-                "price": 39.99,
-                "stock": 20,
-                "category": "Gift Sets",
-                "image_url": "https://images.unsplash.com/photo-1607024875535-c8dd6fda9cd9?w=500"
-            }
-        ]
-        
-        print("Creating sample products...")
-        for product_data in sample_products:
-            product = await ProductService.create_product(db, **product_data)
-            print(f"✅ Created: {product.name}")
+        # Rows seeded before SKUs existed: claim the oldest copy of each
+        # sample so it is matched instead of inserted again, then drop the
+        # copies piled up by earlier restarts (unless an order refers to one)
+        for product_data in SAMPLE_PRODUCTS:
+            oldest = (
+                select(func.min(Product.id))
+                .where(Product.name == product_data["name"], Product.sku.is_(None))
+                .scalar_subquery()
+            )
+            await db.execute(
+                update(Product).where(Product.id == oldest).values(sku=product_data["sku"])
+            )
+            result = await db.execute(
+                delete(Product).where(
+                    Product.sku.is_(None),
+                    Product.name == product_data["name"],
+                    Product.description == product_data["description"],
+                    Product.id.not_in(select(OrderItem.product_id)),
+                )
+            )
+            removed += result.rowcount
+        await db.commit()
         
-        print(f"\n🎉 Successfully created {len(sample_products)} sample products!")
+        existing = set(await db.scalars(
+            select(Product.sku).where(Product.sku.in_([p["sku"] for p in SAMPLE_PRODUCTS]))
+        ))
+        rows = [
+            ProductImportRow(**product_data).model_dump()
+            for product_data in SAMPLE_PRODUCTS
+            if product_data["sku"] not in existing
+        ]
+        created = await ProductImportService.write_chunk(db, rows, upsert=False) if rows else 0
+        return created, removed
 
 
 async def main():
     """Main initialization function."""
     print("🚀 Initializing database...")
-    await init_db()
-    print("✅ Database tables created")
+    started = time.perf_counter()
+    schema_state = await init_db()
+    print(f"✅ Database schema {schema_state} ({(time.perf_counter() - started) * 1000:.1f} ms)")
     
-    print("\n📦 Creating sample products...")
-    await create_sample_products()
+    print("\n📦 Seeding sample products...")
+    created, removed = await seed_sample_products()
+    print(f"✅ {created} created, {len(SAMPLE_PRODUCTS) - created} already present")
+    if removed:
+        print(f"🧹 Removed {removed} duplicate sample products left by earlier runs")
     
     print("\n✨ Database initialization complete!")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -3,6 +3,7 @@
 import { useState, useEffect } from 'react';
 import Link from 'next/link';
 import { Trash2, Plus, Minus, ShoppingBag, ArrowRight } from 'lucide-react';
+import { imageUrl } from '@/lib/api';
 import { cart } from '@/lib/cart';
 import { CartItem } from '@/lib/types';
 
@@ -12,6 +13,7 @@ export default function CartPage() {
 
   useEffect(() => {
     updateCart();
+    cart.refresh().catch(() => {});
     const handleCartChange = () => updateCart();
     window.addEventListener('cartChange', handleCartChange);
     return () => window.removeEventListener('cartChange', handleCartChange);
@@ -95,7 +97,7 @@ export default function CartPage() {
                                 border-4 border-amber-300 dark:border-amber-700">
                     {item.product.image_url ? (
                       <img
-                        src={item.product.image_url}
+                        src={imageUrl(item.product.image_url, 320)}
                         alt={item.product.name}
                         className="w-full h-full object-cover"
                       />
@@ -4,7 +4,7 @@ import { useState, useEffect } from 'react';
 import { useParams } from 'next/navigation';
 import Link from 'next/link';
 import { Star, ShoppingCart, Heart, Share2, Minus, Plus, ArrowLeft, Check } from 'lucide-react';
-import { api } from '@/lib/api';
+import { api, imageUrl, imageSrcSet } from '@/lib/api';
 import { cart } from '@/lib/cart';
 import { Product } from '@/lib/types';
 
@@ -93,7 +93,9 @@ export default function ProductDetailPage() {
                           dark:from-amber-900 dark:to-zinc-800 relative group">
               {product.image_url ? (
                 <img
-                  src={product.image_url}
+                  src={imageUrl(product.image_url, 1024)}
+                  srcSet={imageSrcSet(product.image_url)}
+                  sizes="(min-width: 1024px) 50vw, 100vw"
                   alt={product.name}
                   className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-500"
                 />
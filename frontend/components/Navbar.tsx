@@ -22,7 +22,16 @@ export default function Navbar() {
   }, []);
 
   useEffect(() => {
-    api.getCurrentUser().then(setUser);
+    api.getCurrentUser().then(async currentUser => {
+      setUser(currentUser);
+      if (!currentUser) return;
+      // Merge the browser cart once after login; afterwards the server
+      // cart is authoritative and the badge only needs its count
+      if (cart.syncedUserId() !== String(currentUser.id)) {
+        await cart.syncWithServer(currentUser.id);
+      }
+      setCartCount(await api.getCartCount());
+    }).catch(() => {});
   }, []);
 
   useEffect(() => {
@@ -33,6 +42,8 @@ export default function Navbar() {
 
   const handleLogout = async () => {
     await api.logout();
+    cart.forgetServerSync();
+    cart.clear();
     window.location.href = '/';
   };
 
@@ -4,6 +4,7 @@ import { useState } from 'react';
 import Link from 'next/link';
 import { ShoppingCart, Star } from 'lucide-react';
 import { Product } from '@/lib/types';
+import { imageUrl, imageSrcSet } from '@/lib/api';
 import { cart } from '@/lib/cart';
 
 interface ProductCardProps {
@@ -58,7 +59,10 @@ export default function ProductCard({ product }: ProductCardProps) {
                       dark:from-amber-900 dark:to-zinc-800">
           {product.image_url ? (
             <img
-              src={product.image_url}
+              src={imageUrl(product.image_url, 320)}
+              srcSet={imageSrcSet(product.image_url)}
+              sizes="(min-width: 1280px) 25vw, (min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+              loading="lazy"
               alt={product.name}
               className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-500"
             />
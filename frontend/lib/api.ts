@@ -1,7 +1,27 @@
-import { Product, User } from './types';
+import { Product, User, ServerCart } from './types';
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
 
+// Uploaded product images are served by the API (image_url is a relative
+// /api/v1/images/ path) in the backend's IMAGE_WIDTHS; other URLs are
+// external and used as they are.
+const IMAGE_PATH = '/api/v1/images/';
+const IMAGE_WIDTHS = [160, 320, 640, 1024, 1600];
+
+export function imageUrl(url: string, width: number): string {
+  if (!url.startsWith(IMAGE_PATH)) {
+    return url;
+  }
+  return `${API_BASE_URL}${url}?w=${width}`;
+}
+
+export function imageSrcSet(url: string): string | undefined {
+  if (!url.startsWith(IMAGE_PATH)) {
+    return undefined;
+  }
+  return IMAGE_WIDTHS.map((width) => `${imageUrl(url, width)} ${width}w`).join(', ');
+}
+
 export const api = {
   // Products
   async getProducts(category?: string): Promise<Product[]> {
@@ -11,7 +31,7 @@ export const api = {
     
     const response = await fetch(url, {
       credentials: 'include',
-      cache: 'no-store',
+      cache: 'no-cache', // revalidate with ETag, 304 when unchanged
     });
     
     if (!response.ok) {
@@ -24,7 +44,7 @@ export const api = {
   async getProduct(id: number): Promise<Product> {
     const response = await fetch(`${API_BASE_URL}/api/v1/products/${id}`, {
       credentials: 'include',
-      cache: 'no-store',
+      cache: 'no-cache', // revalidate with ETag, 304 when unchanged
     });
     
     if (!response.ok) {
@@ -34,6 +54,82 @@ export const api = {
     return response.json();
   },
 
+  async getProductsBatch(ids: number[]): Promise<{ products: Product[]; missing: number[] }> {
+    const response = await fetch(`${API_BASE_URL}/api/v1/products/batch`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      credentials: 'include',
+      cache: 'no-store',
+      body: JSON.stringify({ ids }),
+    });
+    
+    if (!response.ok) {
+      throw new Error('Failed to fetch products');
+    }
+    
+    return response.json();
+  },
+
+  // Server-side cart (signed-in users)
+  async getCart(): Promise<ServerCart> {
+    const response = await fetch(`${API_BASE_URL}/api/v1/cart/`, {
+      credentials: 'include',
+      cache: 'no-store',
+    });
+    
+    if (!response.ok) {
+      throw new Error('Failed to fetch cart');
+    }
+    
+    return response.json();
+  },
+
+  async getCartCount(): Promise<number> {
+    const response = await fetch(`${API_BASE_URL}/api/v1/cart/count`, {
+      credentials: 'include',
+      cache: 'no-store',
+    });
+    
+    if (!response.ok) {
+      throw new Error('Failed to fetch cart count');
+    }
+    
+    const data = await response.json();
+    return data.item_count;
+  },
+
+  async setCartItem(productId: number, quantity: number): Promise<ServerCart> {
+    const response = await fetch(`${API_BASE_URL}/api/v1/cart/items/${productId}`, {
+      method: 'PUT',
+      headers: { 'Content-Type': 'application/json' },
+      credentials: 'include',
+      cache: 'no-store',
+      body: JSON.stringify({ quantity }),
+    });
+    
+    if (!response.ok) {
+      throw new Error('Failed to update cart');
+    }
+    
+    return response.json();
+  },
+
+  async mergeCart(items: { product_id: number; quantity: number }[]): Promise<ServerCart> {
+    const response = await fetch(`${API_BASE_URL}/api/v1/cart/merge`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      credentials: 'include',
+      cache: 'no-store',
+      body: JSON.stringify({ items }),
+    });
+    
+    if (!response.ok) {
+      throw new Error('Failed to merge cart');
+    }
+    
+    return response.json();
+  },
+
   // Authentication
   async getCurrentUser(): Promise<User | null> {
     try {
@@ -1,6 +1,12 @@
-import { Product, CartItem } from './types';
+import { Product, CartItem, ServerCart } from './types';
+import { api } from './api';
 
 const CART_KEY = 'honey_cart';
+const SYNCED_USER_KEY = 'honey_cart_synced_user';
+
+// Line updates for a signed-in user, sent one after another so the server
+// applies them in the order they were made
+let pendingPush: Promise<unknown> = Promise.resolve();
 
 export const cart = {
   getItems(): CartItem[] {
@@ -26,6 +32,7 @@ export const cart = {
     }
 
     this.setItems(items);
+    this.pushLine(product.id, existingIndex >= 0 ? items[existingIndex].quantity : quantity);
   },
 
   updateQuantity(productId: number, quantity: number): void {
@@ -39,12 +46,88 @@ export const cart = {
         items[index].quantity = quantity;
       }
       this.setItems(items);
+      this.pushLine(productId, Math.max(quantity, 0));
     }
   },
 
   removeItem(productId: number): void {
     const items = this.getItems().filter(item => item.product.id !== productId);
     this.setItems(items);
+    this.pushLine(productId, 0);
+  },
+
+  // Once the browser cart has been merged into a signed-in user's server
+  // cart, every line change is also sent to the server (0 removes it).
+  pushLine(productId: number, quantity: number): void {
+    if (this.syncedUserId() === null) return;
+    pendingPush = pendingPush
+      .then(() => api.setCartItem(productId, quantity))
+      .catch(() => {});
+  },
+
+  syncedUserId(): string | null {
+    if (typeof window === 'undefined') return null;
+    return localStorage.getItem(SYNCED_USER_KEY);
+  },
+
+  // Refresh stored product snapshots (price, stock) and drop items whose
+  // product no longer exists: from the server cart when signed in,
+  // otherwise with one batch request.
+  async refresh(): Promise<void> {
+    const userId = this.syncedUserId();
+    if (userId !== null) {
+      await this.syncWithServer(Number(userId));
+      return;
+    }
+
+    const items = this.getItems();
+    if (items.length === 0) return;
+
+    const { products } = await api.getProductsBatch(items.map(item => item.product.id));
+    const byId = new Map(products.map(product => [product.id, product]));
+
+    this.setItems(
+      items
+        .filter(item => byId.has(item.product.id))
+        .map(item => ({ ...item, product: byId.get(item.product.id)! }))
+    );
+  },
+
+  // On the first sync after login, merge the browser cart into the user's
+  // server cart; afterwards the server cart is loaded (local changes have
+  // already been sent with pushLine). Either way the server's cart is
+  // mirrored into localStorage.
+  async syncWithServer(userId: number): Promise<void> {
+    let serverCart: ServerCart;
+    if (this.syncedUserId() === String(userId)) {
+      await pendingPush;
+      serverCart = await api.getCart();
+    } else {
+      const lines = this.getItems().map(item => ({ product_id: item.product.id, quantity: item.quantity }));
+      serverCart = await api.mergeCart(lines);
+      localStorage.setItem(SYNCED_USER_KEY, String(userId));
+    }
+
+    const known = new Map(this.getItems().map(item => [item.product.id, item.product]));
+    const missing = serverCart.items.filter(line => !known.has(line.product_id));
+    if (missing.length > 0) {
+      const { products } = await api.getProductsBatch(missing.map(line => line.product_id));
+      products.forEach(product => known.set(product.id, product));
+    }
+
+    this.setItems(
+      serverCart.items
+        .filter(line => known.has(line.product_id))
+        .map(line => ({
+          product: { ...known.get(line.product_id)!, price: line.price, stock: line.stock },
+          quantity: line.quantity,
+        }))
+    );
+  },
+
+  forgetServerSync(): void {
+    if (typeof window === 'undefined') return;
+    localStorage.removeItem(SYNCED_USER_KEY);
   },
 
   clear(): void {
@@ -1,5 +1,6 @@
 export interface Product {
   id: number;
+  sku?: string;
   name: string;
   description: string;
   price: number;
@@ -21,6 +22,23 @@ export interface CartItem {
   quantity: number;
 }
 
+export interface ServerCartItem {
+  product_id: number;
+  name: string;
+  price: number;
+  stock: number;
+  image_url?: string;
+  quantity: number;
+  line_total: number;
+  in_stock: boolean;
+}
+
+export interface ServerCart {
+  items: ServerCartItem[];
+  item_count: number;
+  subtotal: number;
+}
+
 export interface ApiResponse<T> {
   data?: T;
   error?: string;